@@ -0,0 +1,155 @@
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from Core.attendance_matrix import DecodedAttendance, create_attendance_matrix
+from Benchmarks.synthetic_data import generate_dataset
+from Core.attendance_store import AttendanceStore
+from Core.shading import shade_levels, shade_window
+from Core.streaming import CHUNK_ROWS, iter_attendance_chunks, stream_attendance_percent
+
+DEFAULT_STUDENTS = [1_000, 10_000, 100_000]
+FULL_STUDENTS = [1_000, 10_000, 100_000, 1_000_000]
+DEFAULT_DAYS = [30, 90, 180, 365]
+
+# Rendering a bar chart with one bar per student stops making sense past this size
+CHART_MAX_STUDENTS = 10_000
+
+
+# Run fn repeat times and keep every wall-clock timing
+def timed(fn, repeat):
+    runs = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        runs.append(time.perf_counter() - start)
+    return runs
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "HEAD"], text=True, stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+# The hot paths of the dashboard scripts, timed on one synthetic dataset
+# The file is read in chunks and packed into one store, so the 1M-student datasets never
+# sit in memory as a DataFrame; the frame-based cases use the first chunk (the whole file
+# up to CHUNK_ROWS students)
+def benchmark_dataset(data_dir, students, days, repeat, with_charts):
+    daily_csv = os.path.join(data_dir, "attendance_daily.csv")
+    store = AttendanceStore.concat(list(iter_attendance_chunks(daily_csv)))
+    df = pd.read_csv(daily_csv, nrows=CHUNK_ROWS)
+    dates = list(df.columns[2:])
+    cases = {}
+
+    # CSV_Input/student_data_app.py: decode the upload once, then a 10 students x 10 dates heatmap matrix
+    decoded = DecodedAttendance(df)
+    cases["decode_attendance"] = lambda: DecodedAttendance(df)
+    cases["create_attendance_matrix"] = lambda: create_attendance_matrix(df, 1, 10, dates[:10], decoded=decoded)
+    # Graphs/heatmap.py: 3-day shading over the whole roster, then one navigation click
+    levels = shade_levels(store.absent_matrix())
+    cases["shade_levels"] = lambda: shade_levels(store.absent_matrix())
+    cases["shade_window"] = lambda: shade_window(levels, store.rows_between(1, 10), max(0, days - 7), days)
+    # HACKSA/test.py: attendance_daily.csv -> attendance_percent.csv
+    out_csv = os.path.join(data_dir, "attendance_percent.csv")
+    cases["attendance_percent"] = lambda: stream_attendance_percent(daily_csv, out_csv)
+    # Graphs/attendance_graphs.py: all six charts, uncached
+    if with_charts:
+        from Core.charts import attendance_chart_specs, render_png
+        specs = attendance_chart_specs(store)
+        cases["render_charts"] = lambda: [render_png(spec) for spec in specs]
+
+    results = []
+    for case, fn in cases.items():
+        runs = timed(fn, repeat)
+        results.append({
+            "case": case,
+            "students": students,
+            "days": days,
+            "best_seconds": min(runs),
+            "mean_seconds": sum(runs) / len(runs),
+            "runs": runs,
+        })
+        print(f"{case:<26} {students:>9} x {days:<4} best {min(runs):.4f}s")
+    return results
+
+
+# Cold start: a fresh interpreter importing every Core module the dashboard scripts use
+# Plotting and model libraries are lazy, so this should stay well under a second
+def benchmark_startup(repeat):
+    core_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Core")
+    modules = sorted(f"Core.{name[:-3]}" for name in os.listdir(core_dir) if name.endswith(".py") and name != "__init__.py")
+    command = [sys.executable, "-c", "import " + ", ".join(modules)]
+    cwd = os.path.dirname(core_dir)
+    runs = timed(lambda: subprocess.run(command, cwd=cwd, check=True), repeat)
+    print(f"{'cold_import_core':<26} {'-':>9} x {'-':<4} best {min(runs):.4f}s")
+    return [{"case": "cold_import_core", "students": 0, "days": 0, "best_seconds": min(runs),
+             "mean_seconds": sum(runs) / len(runs), "runs": runs}]
+
+
+# Print the ratio of new to old best time for every case present in both files
+def compare(old_path, results):
+    with open(old_path) as f:
+        old = {(r["case"], r["students"], r["days"]): r["best_seconds"] for r in json.load(f)["results"]}
+    print("\ncase                        students x days   old -> new (ratio)")
+    for r in results:
+        key = (r["case"], r["students"], r["days"])
+        if key in old:
+            print(f"{r['case']:<26} {r['students']:>9} x {r['days']:<4} "
+                  f"{old[key]:.4f}s -> {r['best_seconds']:.4f}s ({r['best_seconds'] / old[key]:.2f}x)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the attendance hot paths on synthetic data")
+    parser.add_argument("--students", type=int, nargs="+", help=f"roster sizes (default {DEFAULT_STUDENTS})")
+    parser.add_argument("--days", type=int, nargs="+", default=DEFAULT_DAYS, help="days of attendance per dataset")
+    parser.add_argument("--full", action="store_true", help="include the 1M-student datasets")
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per case")
+    parser.add_argument("--seed", type=int, default=0, help="synthetic data seed")
+    parser.add_argument("--no-charts", action="store_true", help="skip chart rendering")
+    parser.add_argument("--data-dir", help="keep generated datasets here instead of a temp dir")
+    parser.add_argument("--output", default="benchmark_results.json", help="JSON results file")
+    parser.add_argument("--compare", help="earlier results file to compare against")
+    args = parser.parse_args()
+
+    students_list = args.students or (FULL_STUDENTS if args.full else DEFAULT_STUDENTS)
+    base_dir = args.data_dir or tempfile.mkdtemp(prefix="attendance_bench_")
+
+    results = benchmark_startup(args.repeat)
+    for students in students_list:
+        for days in args.days:
+            data_dir = os.path.join(base_dir, f"{students}x{days}")
+            if not os.path.exists(os.path.join(data_dir, "attendance_daily.csv")):
+                generate_dataset(data_dir, students, days, seed=args.seed)
+            with_charts = not args.no_charts and students <= CHART_MAX_STUDENTS
+            results.extend(benchmark_dataset(data_dir, students, days, args.repeat, with_charts))
+
+    report = {
+        "commit": git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "seed": args.seed,
+        "results": results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nSaved {len(results)} results to {args.output}")
+
+    if args.compare:
+        compare(args.compare, results)
+
+
+if __name__ == "__main__":
+    main()
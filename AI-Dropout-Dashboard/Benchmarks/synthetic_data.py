@@ -0,0 +1,71 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+# Rows written per block when generating attendance_daily.csv
+WRITE_CHUNK_ROWS = 50_000
+
+COURSES = ["CE-1", "CE-2", "ME-1", "ME-2", "EE-1", "CS-1"]
+FIRST_DATE = "2025-01-01"
+
+
+# Deterministic synthetic data in the CSV layouts under CSV/
+# Every file for the same (students, days, seed) is byte-identical across runs
+def generate_dataset(out_dir, students, days, seed=0):
+    os.makedirs(out_dir, exist_ok=True)
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range(FIRST_DATE, periods=days).strftime("%Y-%m-%d")
+
+    # Each student has their own attendance rate, so percentages are spread out
+    rates = rng.beta(6, 2, size=students)
+    write_attendance_daily(os.path.join(out_dir, "attendance_daily.csv"), rates, dates, rng)
+
+    # Rosters number students S1001.. for daily sheet IDs 1..; join them with
+    # STUDENT_ID_PREFIX_OFFSETS="S=1000"
+    student_ids = np.char.add("S", (1000 + np.arange(1, students + 1)).astype(str))
+    names = np.char.add("Student_", np.arange(1, students + 1).astype(str))
+    pd.DataFrame({
+        "student_id": student_ids,
+        "name": names,
+        "course": rng.choice(COURSES, size=students),
+        "mentor": np.char.add("mentor_", rng.integers(0, max(1, students // 30), size=students).astype(str)),
+        "attendance_percent": np.round(rates * 100, 1),
+    }).to_csv(os.path.join(out_dir, "attendance.csv"), index=False)
+
+    paid_days_ago = rng.integers(0, 120, size=students)
+    pd.DataFrame({
+        "student_id": student_ids,
+        "total_fee_due": rng.choice([0, 0, 0, 2500, 5000, 10000], size=students),
+        "last_payment_date": (pd.Timestamp("2025-09-01") - pd.to_timedelta(paid_days_ago, unit="D")).strftime("%Y-%m-%d"),
+    }).to_csv(os.path.join(out_dir, "fees.csv"), index=False)
+
+    assessments = np.clip(rng.normal(60, 15, size=(students, 3)), 0, 100).round().astype(int)
+    pd.DataFrame({
+        "student_id": student_ids,
+        "assessment_1": assessments[:, 0],
+        "assessment_2": assessments[:, 1],
+        "assessment_3": assessments[:, 2],
+        "failed_attempts": rng.poisson(0.5, size=students),
+        "avg_score": assessments.mean(axis=1).round(1),
+    }).to_csv(os.path.join(out_dir, "scores.csv"), index=False)
+    return out_dir
+
+
+# Write the wide ID,Name,<dates> P/A file directly as bytes, one block of rows at a time
+def write_attendance_daily(path, rates, dates, rng):
+    students, days = len(rates), len(dates)
+    with open(path, "wb") as f:
+        f.write(("ID,Name," + ",".join(dates) + "\n").encode())
+        for start in range(0, students, WRITE_CHUNK_ROWS):
+            stop = min(start + WRITE_CHUNK_ROWS, students)
+            present = rng.random((stop - start, days)) < rates[start:stop, None]
+            # Interleave ",P"/",A" cells and finish each row with a newline
+            cells = np.empty((stop - start, 2 * days + 1), dtype=np.uint8)
+            cells[:, 0:-1:2] = ord(",")
+            cells[:, 1:-1:2] = np.where(present, ord("P"), ord("A"))
+            cells[:, -1] = ord("\n")
+            for i, row in enumerate(cells):
+                student = start + i + 1
+                f.write(f"{student},Student_{student}".encode())
+                f.write(row.tobytes())
@@ -1,19 +1,45 @@
 
+import os
+import sys
 import streamlit as st
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
 import numpy as np
 from datetime import datetime, timedelta
-import io
-
-# Configure the page
-st.set_page_config(
+from streamlit import runtime
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from Core.alerts import AlertLog, send_alerts
+from Core.attendance_db import DB_PATH, AttendanceDB
+from Core.attendance_matrix import DecodedAttendance, create_attendance_matrix
+from Core.data_viewer import FrameViewer
+from Core.exports import EXPORT_FORMATS, ExportCache
+from Core.instrumentation import MetricsHistory, render_debug_panel
+from Core.ml_model import latest_model_path, outcome_labels, save_model, score_probabilities, train_model
+from Core.parse_cache import ParseCache
+from Core.risk import DEFAULT_RULES, rules_with_thresholds, score_students
+from Core.rollup import GROUP_COLUMNS, GROUP_METRICS, RollupCube
+from Core.schemas import (SchemaError, attendance_date_columns, is_daily_attendance, read_upload, upload_attendance_store,
+                          upload_key)
+from Core.shared_store import get_process_store
+from Core.startup import mark_first_paint, setup_page
+from Core.student_join import StudentJoin
+from Core.tiles import PRESENCE_PALETTE, TileCache, cell_size, render_tile
+
+# Configure the page, with per-stage timings for this rerun; open the app with ?debug=1
+# (or set DASHBOARD_DEBUG=1) to show the performance panel, which also samples peak memory per stage
+profiler, debug_panel = setup_page(
+    "student_data_app",
     page_title="Student Data Management System",
     page_icon="📊",
     layout="wide"
 )
 
+# Rolling history of per-rerun metrics, shared across sessions
+@st.cache_resource
+def get_metrics_history():
+    return MetricsHistory()
+
 # Initialize session state for storing uploaded data
 if 'attendance_data' not in st.session_state:
     st.session_state.attendance_data = None
@@ -23,77 +49,240 @@ if 'fee_payment_data' not in st.session_state:
     st.session_state.fee_payment_data = None
 if 'test_marks_data' not in st.session_state:
     st.session_state.test_marks_data = None
+if 'student_join' not in st.session_state:
+    st.session_state.student_join = StudentJoin()
+if 'rollup' not in st.session_state:
+    st.session_state.rollup = RollupCube()
+    st.session_state.rollup_versions = None
+
+# Parsed uploads keyed by file content hash; the frames also go into the shared store,
+# so only the last few are kept here (re-uploading a recent file skips the parse)
+# Set PARSE_CACHE_DIR to also keep parsed frames in a Parquet sidecar directory
+@st.cache_resource
+def get_parse_cache():
+    return ParseCache(max_entries=4, spill_dir=os.environ.get("PARSE_CACHE_DIR"))
+
+# One memory-mapped copy of each distinct dataset for all sessions (SHARED_DATA_DIR)
+@st.cache_resource
+def get_shared_store():
+    return get_process_store()
+
+# The browser session running this script holds references in the shared store
+def current_session_id():
+    ctx = get_script_run_ctx()
+    return ctx.session_id if ctx is not None else "local"
+
+def session_alive(session_id):
+    try:
+        return runtime.get_instance().is_active_session(session_id)
+    except Exception:
+        return True
+
+if 'shared_keys' not in st.session_state:
+    st.session_state.shared_keys = {}
+# Datasets held only by closed sessions are unmapped
+get_shared_store().prune(session_alive)
+
+# Date columns of a daily attendance upload decoded to 1/0 codes once per uploaded file
+@st.cache_resource(max_entries=8)
+def get_decoded_attendance(content_hash, _df):
+    return DecodedAttendance(_df[attendance_date_columns(_df)])
+
+# Daily attendance packed to present/absent bits once per uploaded file, for the rollups;
+# None for summary sheets without date columns
+@st.cache_resource(max_entries=8)
+def get_attendance_store(content_hash, _df):
+    return upload_attendance_store(_df)
+
+# Rendered heatmap tiles shared across reruns
+@st.cache_resource
+def get_tile_cache():
+    return TileCache()
+
+# Optional SQLite attendance history (set ATTENDANCE_DB), shared across sessions
+@st.cache_resource
+def get_attendance_db(path):
+    return AttendanceDB(path)
+
+# Attendance history straight from the database: only the visible window and the
+# range aggregates are queried, so years of history never have to be loaded
+def render_attendance_history(db):
+    dates = db.dates()
+    min_id, max_id, n_students = db.id_range()
+    if not dates:
+        st.info(f"{DB_PATH} has no attendance yet. Upload a file and save it to the database.")
+        return
+    st.caption(f"{n_students} students and {len(dates)} dates in {DB_PATH}")
+
+    col1, col2 = st.columns(2)
+    with col1:
+        start_id = st.number_input("Start Student ID", min_value=min_id, max_value=max_id, value=min_id, key="hist_start")
+        end_id = st.number_input("End Student ID", min_value=start_id, max_value=max_id,
+                                 value=min(start_id + 9, max_id), key="hist_end")
+    with col2:
+        first_date, last_date = st.select_slider("Date range", options=dates,
+                                                 value=(dates[max(0, len(dates) - 10)], dates[-1]), key="hist_dates")
+
+    with profiler.stage("query attendance window"):
+        window = db.window(start_id, end_id, first_date, last_date)
+    if window.n_students and window.n_days:
+        tile_key = ("db", os.path.getmtime(DB_PATH), start_id, end_id, first_date, last_date)
+        with profiler.stage("render heatmap"):
+            tile = get_tile_cache().get(tile_key, lambda: render_tile(
+                window.present_matrix().astype(int),
+                palette=PRESENCE_PALETTE,
+                cell_px=cell_size(window.n_days, window.n_students),
+            ))
+        st.image(tile, caption="Attendance Heatmap (Green=Present, Red=Absent)")
+        labels = window.names if window.names is not None else window.ids
+        st.caption(f"Rows (top to bottom): {', '.join(str(label) for label in labels)}")
+
+    st.subheader("📈 Attendance Over the Range")
+    with profiler.stage("query range aggregates"):
+        daily = db.daily_rates(first_date, last_date)
+        students = db.student_rates(start_id, end_id, first_date, last_date)
+    st.line_chart(daily["rate"] * 100)
+    st.dataframe(students, use_container_width=True)
+
+# Server-side viewer (sort orders, filter codes, search index) per uploaded file
+@st.cache_resource(max_entries=8)
+def get_frame_viewer(content_hash, _df):
+    return FrameViewer(_df)
+
+# Paginated raw-data table: sorting, filtering and search run on the server and
+# only the current page is sent to the browser
+def render_data_viewer(df, file_stem):
+    viewer = get_frame_viewer(df.attrs.get("content_hash"), df)
+    col1, col2, col3, col4 = st.columns([2, 2, 1, 1])
+    with col1:
+        search = st.text_input("🔍 Search student ID / name (prefix)", key=f"{file_stem}_search") if viewer.search_columns else ""
+    with col2:
+        sort_by = st.selectbox("Sort by", [None] + list(df.columns), key=f"{file_stem}_sort_by",
+                               format_func=lambda c: "(file order)" if c is None else str(c))
+    with col3:
+        ascending = st.radio("Order", ["Ascending", "Descending"], key=f"{file_stem}_order") == "Ascending"
+    with col4:
+        page_size = st.selectbox("Rows per page", [25, 50, 100, 250], index=1, key=f"{file_stem}_page_size")
+
+    filters = {}
+    filter_column = st.selectbox("Filter column", [None] + list(df.columns), key=f"{file_stem}_filter_column",
+                                 format_func=lambda c: "(no filter)" if c is None else str(c))
+    if filter_column is not None:
+        if pd.api.types.is_numeric_dtype(df[filter_column]):
+            low, high = float(df[filter_column].min()), float(df[filter_column].max())
+            if low < high:
+                filters[filter_column] = st.slider("Range", low, high, (low, high), key=f"{file_stem}_filter_range")
+            else:
+                st.caption("Column has a single value (or none); nothing to filter.")
+        else:
+            values = viewer.filter_values(filter_column)
+            if values is None:
+                st.caption("Too many distinct values to filter on; use the search box instead.")
+            else:
+                chosen = st.multiselect("Show only", values, key=f"{file_stem}_filter_values")
+                if chosen:
+                    filters[filter_column] = chosen
+
+    with profiler.stage(f"query {file_stem}"):
+        positions = viewer.query(search=search, sort_by=sort_by, ascending=ascending, filters=filters)
+    n_pages = max(1, -(-len(positions) // page_size))
+    page = st.number_input(f"Page (of {n_pages})", min_value=1, max_value=n_pages, value=1, key=f"{file_stem}_page") - 1
+    with profiler.stage(f"st.dataframe {file_stem}"):
+        st.dataframe(viewer.page(positions, page, page_size), use_container_width=True)
+    st.caption(f"Rows {min(page * page_size + 1, len(positions))}-{min((page + 1) * page_size, len(positions))} "
+               f"of {len(positions)} matching ({len(df)} total)")
+
+# ML risk probabilities per model and merged-data version, reused across reruns and
+# sessions; the scoring date is part of the key since days_since_payment counts to it
+@st.cache_resource(max_entries=8)
+def get_ml_probabilities(model_path, merged_version, reference_date, _merged):
+    return score_probabilities(_merged, model_path, reference_date=reference_date)
+
+# Export files shared across reruns, reused per dataset version and format
+@st.cache_resource
+def get_export_cache():
+    return ExportCache()
+
+# Download controls: the payload is built (streamed to disk in chunks) only when
+# requested, then reused until the uploaded file changes
+# Building the export never holds the payload in memory, but st.download_button reads
+# the whole file into Streamlit's media store when it is shown, so the download itself
+# still costs one copy of the export in memory
+def render_download(df, data_type, file_stem):
+    version = df.attrs.get("content_hash")
+    export_cache = get_export_cache()
+    col1, col2 = st.columns([1, 3])
+    with col1:
+        fmt = st.selectbox("Export format", list(EXPORT_FORMATS), key=f"{file_stem}_export_format")
+    extension, mime = EXPORT_FORMATS[fmt]
+    path = export_cache.cached(version, fmt)
+    with col2:
+        if path is None and st.button(f"📦 Prepare {data_type} Download", key=f"{file_stem}_export_prepare"):
+            try:
+                with profiler.stage(f"export {file_stem}"):
+                    path = export_cache.get(df, version, file_stem, fmt)
+            except ImportError as e:
+                st.error(f"{fmt} export is not available: {str(e)}")
+        if path is not None:
+            with export_cache.open_export(df, version, file_stem, fmt) as f:
+                st.download_button(
+                    label=f"📥 Download {data_type} Data",
+                    data=f,
+                    file_name=f"{file_stem}.{extension}",
+                    mime=mime,
+                    key=f"{file_stem}_download"
+                )
 
 # Function to process uploaded file
 def process_uploaded_file(uploaded_file, data_type):
     if uploaded_file is not None:
         try:
-            # Read the file based on its extension
-            if uploaded_file.name.endswith('.csv'):
-                df = pd.read_csv(uploaded_file)
-            elif uploaded_file.name.endswith(('.xlsx', '.xls')):
-                df = pd.read_excel(uploaded_file)
-            else:
+            # Read the file based on its extension, with the declared dtypes of its schema
+            extension = os.path.splitext(uploaded_file.name)[1].lower()
+            if extension not in ('.csv', '.xlsx', '.xls'):
                 st.sidebar.error(f"Unsupported file format for {data_type}")
                 return None
+            parse = lambda data: read_upload(data, extension, data_type)
+
+            # Only parse when this exact file content has not been seen before; every
+            # session uploading the same file maps the same shared read-only copy
+            data = uploaded_file.getvalue()
+            key = upload_key(data, data_type, extension)
+            shared = get_shared_store()
+            session_id = current_session_id()
+            with profiler.stage(f"parse {data_type}"):
+                df = shared.acquire(key, session_id)
+                if df is None:
+                    parsed, from_cache, parse_seconds = get_parse_cache().get_or_parse(key, lambda: parse(data))
+                    shared.put(key, parsed)
+                    df = shared.acquire(key, session_id)
+                    source = f"{'from cache' if from_cache else 'parsed'}, parse took {parse_seconds:.2f}s"
+                else:
+                    source = "shared with other sessions"
+            df.attrs["content_hash"] = key
+
+            # Drop this session's reference to the file it replaces
+            previous = st.session_state.shared_keys.get(data_type)
+            if previous is not None and previous != key:
+                shared.release(previous, session_id)
+            st.session_state.shared_keys[data_type] = key
 
             st.sidebar.success(f"✅ {data_type} uploaded successfully!")
-            st.sidebar.write(f"📊 Shape: {df.shape[0]} rows, {df.shape[1]} columns")
+            st.sidebar.write(f"📊 Shape: {df.shape[0]} rows, {df.shape[1]} columns ({source})")
             return df
+        except SchemaError as e:
+            # Malformed files never reach the charts; every bad row is listed at once
+            st.sidebar.error(str(e))
+            st.sidebar.dataframe(e.issues, use_container_width=True)
+            return None
         except Exception as e:
             st.sidebar.error(f"Error reading {data_type}: {str(e)}")
             return None
     return None
 
-# Function to create attendance heatmap matrix
-def create_attendance_matrix(df, start_id, end_id, selected_dates):
-    try:
-        # Create a shade matrix for the heatmap
-        # This assumes the DataFrame has date columns and student rows
-
-        # Get the relevant student rows
-        student_slice = df.iloc[start_id-1:end_id].copy()
-
-        # Find date columns (exclude student info columns)
-        date_columns = []
-        for col in df.columns:
-            if col.lower() not in ['student_id', 'student', 'name', 'id', 'roll_no']:
-                date_columns.append(col)
-
-        # Filter to selected dates
-        available_dates = [date for date in selected_dates if date in date_columns]
-
-        if not available_dates:
-            st.error("No matching date columns found in the data")
-            return None
-
-        # Create the matrix for heatmap
-        shade_matrix = student_slice[available_dates].copy()
-
-        # Convert attendance data to numeric values
-        # Handle different attendance formats: P/A, Present/Absent, 1/0, etc.
-        for col in available_dates:
-            shade_matrix[col] = shade_matrix[col].astype(str).str.upper()
-
-            # Map attendance values - implementing logic for "absences last 3 days"
-            # 1.0 = Present (Green)
-            # 0.0 = Absent today only (Light Red)  
-            # -1.0 = Absent for multiple days (Dark Red)
-
-            # For simplicity, we'll use: 1=Present, 0=Absent
-            shade_matrix[col] = shade_matrix[col].map({
-                'P': 1.0, 'PRESENT': 1.0, '1': 1.0, 'YES': 1.0, 'Y': 1.0,
-                'A': 0.0, 'ABSENT': 0.0, '0': 0.0, 'NO': 0.0, 'N': 0.0
-            }).fillna(0.0)
-
-        return shade_matrix[available_dates], available_dates
-
-    except Exception as e:
-        st.error(f"Error creating attendance matrix: {str(e)}")
-        return None, None
-
 # Create sidebar for file uploads
 st.sidebar.title("📋 Upload Student Data")
+mark_first_paint(profiler, store=get_shared_store())
 st.sidebar.markdown("---")
 
 # Sidebar file upload sections
@@ -143,12 +332,39 @@ test_marks_file = st.sidebar.file_uploader(
 if test_marks_file:
     st.session_state.test_marks_data = process_uploaded_file(test_marks_file, "Test Marks")
 
+# Merge all loaded sources into one per-student frame
+# Sources are versioned by upload content hash, so only a changed upload is re-joined
+for source, data_key in [("attendance", "attendance_data"), ("assignments", "assignments_data"),
+                         ("fees", "fee_payment_data"), ("test_marks", "test_marks_data")]:
+    source_df = st.session_state[data_key]
+    if source_df is None:
+        continue
+    try:
+        with profiler.stage(f"join {source}"):
+            st.session_state.student_join.update_source(source, source_df, version=source_df.attrs.get("content_hash"))
+    except ValueError as e:
+        st.sidebar.warning(f"Could not join {source} data: {str(e)}")
+    unparsed = st.session_state.student_join.unparsed.get(source)
+    if unparsed:
+        st.sidebar.warning(f"{len(unparsed)} {source} rows have a student ID that could not be read and were left out: "
+                           f"{', '.join(map(str, unparsed[:10]))}" + (" ..." if len(unparsed) > 10 else ""))
+
+# Course/mentor rollups are patched only when a source changed since the last rerun
+student_join = st.session_state.student_join
+if len(student_join.index) > 0 and st.session_state.rollup_versions != student_join.versions:
+    attendance_df = st.session_state.attendance_data
+    with profiler.stage("refresh rollups"):
+        store = get_attendance_store(attendance_df.attrs.get("content_hash"), attendance_df) \
+            if attendance_df is not None else None
+        st.session_state.rollup.refresh(student_join.merged, store)
+    st.session_state.rollup_versions = dict(student_join.versions)
+
 # Main content area
 st.title("🎓 Student Data Management System")
 st.markdown("### Welcome to the Student Data Management Dashboard")
 
 # Create tabs for different data views
-tab1, tab2, tab3, tab4, tab5 = st.tabs(["📋 Overview", "📅 Attendance", "📝 Assignments", "💰 Fee Payments", "📊 Test Marks"])
+tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs(["📋 Overview", "📅 Attendance", "📝 Assignments", "💰 Fee Payments", "📊 Test Marks", "⚠️ Risk"])
 
 with tab1:
     st.header("📋 Data Overview")
@@ -185,6 +401,49 @@ with tab1:
             st.warning("⏳ Test Marks Data Pending")
 
     st.markdown("---")
+
+    # Merged per-student records across all uploaded sources
+    student_join = st.session_state.student_join
+    if len(student_join.index) > 0:
+        st.subheader("🔗 Merged Student Records")
+        st.metric("Students", len(student_join.index))
+        lookup_id = st.text_input("Look up a student (e.g. 1 or S1001)", key="student_lookup")
+        if lookup_id:
+            record = student_join.lookup(lookup_id.strip())
+            if record is not None:
+                st.dataframe(record.astype(str).to_frame("value"), use_container_width=True)
+            else:
+                st.warning(f"No student found for {lookup_id}")
+        st.markdown("---")
+
+    # Course and mentor aggregates from the materialized rollup cube
+    if len(student_join.index) > 0 and any(c in student_join.merged.columns for c in GROUP_COLUMNS):
+        rollup = st.session_state.rollup
+        st.subheader("🏫 Course & Mentor Rollups")
+        st.caption(f"Last refresh updated {rollup.last_refresh['students_changed']} students in "
+                   f"{rollup.last_refresh['groups_changed']} groups")
+        level = st.radio("Group by", ["course", "mentor", "course and mentor"], horizontal=True, key="rollup_level")
+        with profiler.stage("query rollups"):
+            groups = rollup.groups(GROUP_COLUMNS if level == "course and mentor" else level)
+        st.dataframe(groups, use_container_width=True)
+
+        col1, col2 = st.columns(2)
+        with col1:
+            courses = list(rollup.groups("course").index)
+            course = st.selectbox("Drill down into a course", courses, key="rollup_course")
+            if course is not None:
+                st.dataframe(rollup.drill_down(course), use_container_width=True)
+        with col2:
+            metric = st.selectbox("Top mentors by", GROUP_METRICS, index=GROUP_METRICS.index("pct_below_threshold"),
+                                  key="rollup_metric")
+            top_n = st.slider("Mentors shown", 5, 50, 10, key="rollup_top_n")
+            st.dataframe(rollup.top_n(metric, top_n), use_container_width=True)
+
+        if rollup.dates:
+            st.markdown("**Daily attendance rate**" + (f" — {course}" if course is not None else ""))
+            st.line_chart(rollup.daily_trend(course=course))
+        st.markdown("---")
+
     st.info("👈 Use the sidebar to upload your spreadsheets and navigate through the tabs to view your data.")
 
 with tab2:
@@ -194,159 +453,228 @@ with tab2:
 
         # Display data table
         st.subheader("📊 Raw Data")
-        st.dataframe(df, use_container_width=True)
-
-        # Heatmap section
-        st.subheader("🔥 Attendance Heatmap Visualization")
-
-        # Create controls for heatmap
-        col1, col2, col3 = st.columns(3)
-
-        with col1:
-            max_students = len(df)
-            start_id = st.number_input("Start Student ID", min_value=1, max_value=max_students, value=1, key="att_start")
-            end_id = st.number_input("End Student ID", min_value=start_id, max_value=max_students, 
-                                   value=min(10, max_students), key="att_end")
-
-        with col2:
-            # Get date columns (excluding student info columns)
-            date_columns = []
-            for col in df.columns:
-                if col.lower() not in ['student_id', 'student', 'name', 'id', 'roll_no']:
-                    date_columns.append(col)
-
-            if date_columns:
-                num_dates = min(10, len(date_columns))  # Default to first 10 dates
-                selected_dates = st.multiselect(
-                    "Select Date Columns", 
-                    date_columns, 
-                    default=date_columns[:num_dates],
-                    key="att_dates"
-                )
-            else:
-                selected_dates = []
-                st.warning("No date columns detected in the data")
-
-        with col3:
-            st.write("**Heatmap Legend:**")
-            st.write("🟢 Green = Present")
-            st.write("🔴 Red = Absent")
-
-        # Generate heatmap button and visualization
-        if selected_dates and st.button("🎨 Generate Attendance Heatmap", key="gen_att_heatmap"):
-            shade_matrix, available_dates = create_attendance_matrix(df, start_id, end_id, selected_dates)
-
-            if shade_matrix is not None and not shade_matrix.empty:
-                # Create the heatmap following the user's example format
-                st.subheader(f"Attendance Heatmap (Students {start_id}-{end_id}, Dates {available_dates[0]} to {available_dates[-1]})")
-
-                # Custom colormap: Green for present, Red shades for absences
-                cmap = sns.color_palette(["red", "lightgreen"], as_cmap=True)
-                norm = plt.Normalize(vmin=0, vmax=1)
-
-                fig, ax = plt.subplots(figsize=(8, 5))
-                sns.heatmap(
-                    shade_matrix,
-                    cmap=cmap,
-                    norm=norm,
-                    cbar=True,
-                    ax=ax,
-                    linewidths=0.3,
-                    linecolor="black",
-                    square=True,
-                    annot=False
-                )
-                ax.set_ylabel("Students", fontsize=8)
-                ax.set_xlabel("Date", fontsize=8)
-                ax.set_title("Attendance Heatmap (Green=Present, Red shades=Absences last 3 days)", fontsize=10)
-                ax.set_xticklabels(ax.get_xticklabels(), rotation=45, ha="right", fontsize=8)
-                ax.set_yticklabels([f"Student {i+start_id}" for i in range(len(shade_matrix))], fontsize=8)
-
-                # Adjust layout to prevent label cutoff
-                plt.tight_layout()
-
-                # Display the plot
-                st.pyplot(fig)
-
-                # Additional statistics
-                st.subheader("📈 Attendance Statistics")
-                col1, col2, col3 = st.columns(3)
-
-                with col1:
-                    total_present = shade_matrix.sum().sum()
-                    total_possible = shade_matrix.shape[0] * shade_matrix.shape[1]
-                    attendance_rate = (total_present / total_possible) * 100 if total_possible > 0 else 0
-                    st.metric("Overall Attendance Rate", f"{attendance_rate:.1f}%")
-
-                with col2:
-                    avg_student_attendance = shade_matrix.mean(axis=1).mean() * 100
-                    st.metric("Avg Student Attendance", f"{avg_student_attendance:.1f}%")
-
-                with col3:
-                    best_attendance_day = shade_matrix.mean(axis=0).idxmax() if not shade_matrix.empty else "N/A"
-                    st.metric("Best Attendance Day", str(best_attendance_day))
-            else:
-                st.error("Unable to generate heatmap. Please check your data format.")
-
-        # Download button
-        csv = df.to_csv(index=False)
-        st.download_button(
-            label="📥 Download Attendance Data",
-            data=csv,
-            file_name="attendance_data.csv",
-            mime="text/csv"
-        )
+        render_data_viewer(df, "attendance_data")
+
+        # Heatmap section (daily sheets only; a summary sheet has no date columns)
+        if is_daily_attendance(df):
+            with profiler.stage("decode attendance"):
+                decoded = get_decoded_attendance(df.attrs.get("content_hash"), df)
+
+            st.subheader("🔥 Attendance Heatmap Visualization")
+
+            # Create controls for heatmap
+            col1, col2, col3 = st.columns(3)
+
+            with col1:
+                max_students = len(df)
+                start_id = st.number_input("Start Student ID", min_value=1, max_value=max_students, value=1, key="att_start")
+                end_id = st.number_input("End Student ID", min_value=start_id, max_value=max_students, 
+                                       value=min(10, max_students), key="att_end")
+
+            with col2:
+                # Date columns (excluding student info columns), detected once per upload
+                date_columns = decoded.date_columns
+
+                if date_columns:
+                    num_dates = min(10, len(date_columns))  # Default to first 10 dates
+                    selected_dates = st.multiselect(
+                        "Select Date Columns", 
+                        date_columns, 
+                        default=date_columns[:num_dates],
+                        key="att_dates"
+                    )
+                else:
+                    selected_dates = []
+                    st.warning("No date columns detected in the data")
+
+            with col3:
+                st.write("**Heatmap Legend:**")
+                st.write("🟢 Green = Present")
+                st.write("🔴 Red = Absent")
+
+            # Generate heatmap button and visualization
+            if selected_dates and st.button("🎨 Generate Attendance Heatmap", key="gen_att_heatmap"):
+                try:
+                    with profiler.stage("create_attendance_matrix"):
+                        shade_matrix, available_dates = create_attendance_matrix(df, start_id, end_id, selected_dates, decoded=decoded)
+                except Exception as e:
+                    st.error(f"Error creating attendance matrix: {str(e)}")
+                    shade_matrix, available_dates = None, None
+
+                if shade_matrix is not None and not shade_matrix.empty:
+                    # Create the heatmap following the user's example format
+                    st.subheader(f"Attendance Heatmap (Students {start_id}-{end_id}, Dates {available_dates[0]} to {available_dates[-1]})")
+
+                    # Rasterize the matrix straight to an image: Green for present, Red for absences
+                    # Tiles are keyed by dataset, student offset, dates and window size
+                    tile_key = (df.attrs.get("content_hash"), start_id - 1, tuple(available_dates), len(shade_matrix))
+                    with profiler.stage("render heatmap"):
+                        tile = get_tile_cache().get(tile_key, lambda: render_tile(
+                            shade_matrix.to_numpy(dtype=int),
+                            palette=PRESENCE_PALETTE,
+                            cell_px=cell_size(len(available_dates), len(shade_matrix)),
+                        ))
+
+                        # Display the heatmap
+                        st.image(tile, caption="Attendance Heatmap (Green=Present, Red=Absent)")
+                    st.caption(f"Rows (top to bottom): Student {start_id} to Student {start_id + len(shade_matrix) - 1}")
+                    st.caption(f"Columns (left to right): {', '.join(map(str, available_dates))}")
+
+                    # Additional statistics
+                    st.subheader("📈 Attendance Statistics")
+                    col1, col2, col3 = st.columns(3)
+
+                    with col1:
+                        total_present = shade_matrix.sum().sum()
+                        total_possible = shade_matrix.shape[0] * shade_matrix.shape[1]
+                        attendance_rate = (total_present / total_possible) * 100 if total_possible > 0 else 0
+                        st.metric("Overall Attendance Rate", f"{attendance_rate:.1f}%")
+
+                    with col2:
+                        avg_student_attendance = shade_matrix.mean(axis=1).mean() * 100
+                        st.metric("Avg Student Attendance", f"{avg_student_attendance:.1f}%")
+
+                    with col3:
+                        best_attendance_day = shade_matrix.mean(axis=0).idxmax() if not shade_matrix.empty else "N/A"
+                        st.metric("Best Attendance Day", str(best_attendance_day))
+                else:
+                    st.error("Unable to generate heatmap. Please check your data format.")
+        else:
+            st.info("The heatmap needs a daily attendance sheet (one YYYY-MM-DD column per date); "
+                    "this upload is a summary sheet.")
+
+        # Download button (the export is built only when requested)
+        render_download(df, "Attendance", "attendance_data")
+
+        # Keep a daily upload in the attendance history database (summary sheets have no dates to store)
+        if DB_PATH and is_daily_attendance(df) and st.button("💾 Save to attendance database", key="att_save_db"):
+            try:
+                with profiler.stage("import attendance"):
+                    cells = get_attendance_db(DB_PATH).import_store(
+                        get_attendance_store(df.attrs.get("content_hash"), df))
+                st.success(f"Saved {cells} attendance cells to {DB_PATH}")
+            except Exception as e:
+                st.error(f"Could not save to the attendance database: {e}")
+    elif DB_PATH:
+        render_attendance_history(get_attendance_db(DB_PATH))
     else:
         st.info("Please upload attendance data using the sidebar.")
 
 with tab3:
     st.header("📝 Assignment Records")
     if st.session_state.assignments_data is not None:
-        st.dataframe(st.session_state.assignments_data, use_container_width=True)
-
-        # Download button
-        csv = st.session_state.assignments_data.to_csv(index=False)
-        st.download_button(
-            label="📥 Download Assignments Data",
-            data=csv,
-            file_name="assignments_data.csv",
-            mime="text/csv"
-        )
+        render_data_viewer(st.session_state.assignments_data, "assignments_data")
+
+        # Download button (the export is built only when requested)
+        render_download(st.session_state.assignments_data, "Assignments", "assignments_data")
     else:
         st.info("Please upload assignments data using the sidebar.")
 
 with tab4:
     st.header("💰 Fee Payment Records")
     if st.session_state.fee_payment_data is not None:
-        st.dataframe(st.session_state.fee_payment_data, use_container_width=True)
-
-        # Download button
-        csv = st.session_state.fee_payment_data.to_csv(index=False)
-        st.download_button(
-            label="📥 Download Fee Payment Data",
-            data=csv,
-            file_name="fee_payment_data.csv",
-            mime="text/csv"
-        )
+        render_data_viewer(st.session_state.fee_payment_data, "fee_payment_data")
+
+        # Download button (the export is built only when requested)
+        render_download(st.session_state.fee_payment_data, "Fee Payment", "fee_payment_data")
     else:
         st.info("Please upload fee payment data using the sidebar.")
 
 with tab5:
     st.header("📊 Test Marks Records")
     if st.session_state.test_marks_data is not None:
-        st.dataframe(st.session_state.test_marks_data, use_container_width=True)
-
-        # Download button
-        csv = st.session_state.test_marks_data.to_csv(index=False)
-        st.download_button(
-            label="📥 Download Test Marks Data",
-            data=csv,
-            file_name="test_marks_data.csv",
-            mime="text/csv"
-        )
+        render_data_viewer(st.session_state.test_marks_data, "test_marks_data")
+
+        # Download button (the export is built only when requested)
+        render_download(st.session_state.test_marks_data, "Test Marks", "test_marks_data")
     else:
         st.info("Please upload test marks data using the sidebar.") 
 
+with tab6:
+    st.header("⚠️ Student Risk Scores")
+    merged = st.session_state.student_join.merged
+    if len(merged) > 0:
+        # Threshold sliders; every change re-scores the whole roster in one batch call
+        defaults = {rule["id"]: rule["value"] for rule in DEFAULT_RULES}
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            attendance_threshold = st.slider("Attendance below (%)", 0, 100, defaults["attendance"], key="risk_attendance")
+        with col2:
+            fee_threshold = st.number_input("Fees due above", min_value=0, value=defaults["fees"], step=500, key="risk_fees")
+        with col3:
+            failed_threshold = st.slider("Failed attempts at least", 1, 10, defaults["failed_attempts"], key="risk_failed")
+        with col4:
+            score_threshold = st.slider("Average score below", 0, 100, defaults["avg_score"], key="risk_score")
+
+        rules = rules_with_thresholds({
+            "attendance": attendance_threshold,
+            "fees": fee_threshold,
+            "failed_attempts": failed_threshold,
+            "avg_score": score_threshold,
+        })
+        with profiler.stage("risk scoring"):
+            risk = score_students(merged, rules)
+
+        # Tier counts
+        tier_counts = risk["risk_tier"].value_counts()
+        col1, col2, col3 = st.columns(3)
+        col1.metric("🔴 Red", int(tier_counts.get("Red", 0)))
+        col2.metric("🟡 Yellow", int(tier_counts.get("Yellow", 0)))
+        col3.metric("🟢 Green", int(tier_counts.get("Green", 0)))
+
+        # At-risk students, highest score first
+        info_cols = [c for c in ["name", "mentor", "course"] if c in merged.columns]
+        at_risk = merged[info_cols].join(risk)
+        at_risk = at_risk[at_risk["risk_tier"] != "Green"].sort_values("risk_score", ascending=False)
+        st.subheader(f"Students at risk ({len(at_risk)})")
+        st.dataframe(at_risk.head(1000), use_container_width=True)
+
+        # Mentor digests: one email per mentor, concurrent and rate-limited, skipping
+        # students already alerted within the cooldown (SMTP_HOST defaults to localhost:1025)
+        if "mentor" in merged.columns:
+            alert_tiers = st.multiselect("Alert mentors about tiers", ["Red", "Yellow"], default=["Red"], key="alert_tiers")
+            if alert_tiers and st.button("📧 Send mentor digests", key="send_alerts"):
+                with profiler.stage("send alerts"):
+                    alert_results = send_alerts(merged.join(risk), log=AlertLog(), tiers=alert_tiers)
+                if alert_results.empty:
+                    st.info("No new students to alert (all within the cooldown).")
+                else:
+                    sent = int(alert_results["sent"].sum())
+                    st.success(f"Sent {sent}/{len(alert_results)} digests covering {int(alert_results['students'].sum())} students")
+                    if sent < len(alert_results):
+                        st.dataframe(alert_results[~alert_results["sent"]], use_container_width=True)
+
+        # Optional ML risk probability from a persisted model (loaded once per process)
+        st.subheader("🤖 ML Risk Probability")
+        model_path = latest_model_path()
+        reference_date = pd.Timestamp.today().normalize()
+        if outcome_labels(merged) is None:
+            st.caption("No dropped_out column in the data: the model is trained on the rule engine's Red tier, "
+                       "so it reproduces the rules rather than predicting recorded dropouts.")
+        if st.button("Train model on current data", key="train_risk_model"):
+            model_path, version = save_model(train_model(merged, reference_date=reference_date))
+            st.success(f"✅ Saved risk model version {version}")
+        if model_path is None:
+            st.info("No trained risk model yet. Train one on the current data to enable ML scoring.")
+        elif st.checkbox("Score students with the ML model", key="use_risk_model"):
+            with profiler.stage("ml scoring"):
+                merged_version = tuple(sorted(st.session_state.student_join.versions.items()))
+                probabilities, chunk_stats = get_ml_probabilities(model_path, merged_version, reference_date, merged)
+            st.caption(f"Model: {os.path.basename(model_path)}")
+            ml_ranked = merged[info_cols].join(probabilities).sort_values("ml_risk_probability", ascending=False)
+            st.dataframe(ml_ranked.head(1000), use_container_width=True)
+            with st.expander("Per-chunk scoring throughput"):
+                st.dataframe(chunk_stats, use_container_width=True)
+    else:
+        st.info("Please upload attendance, fee or test marks data using the sidebar.")
+
 # Footer
 st.markdown("---")
 st.markdown("**📚 Student Data Management System** | Built with Streamlit | Enhanced with Attendance Heatmap")
+
+# Record this rerun's metrics and show the optional debug panel
+run_metrics = get_metrics_history().add(profiler)
+if debug_panel:
+    render_debug_panel(run_metrics, get_metrics_history())
+    with st.sidebar.expander("🗂️ Shared datasets"):
+        st.dataframe(get_shared_store().stats(), use_container_width=True)
@@ -0,0 +1 @@
+# Shared data helpers used by the dashboard and batch scripts
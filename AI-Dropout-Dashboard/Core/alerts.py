@@ -0,0 +1,246 @@
+import asyncio
+import json
+import os
+import queue
+import smtplib
+import time
+from email.message import EmailMessage
+
+import numpy as np
+import pandas as pd
+
+# Defaults point at a local debugging server, so alerts can be tried offline:
+#   python -m aiosmtpd -n -l localhost:1025   (or, up to Python 3.11,
+#   python -m smtpd -n -c DebuggingServer localhost:1025)
+# Set SMTP_HOST / SMTP_PORT / SMTP_USER / SMTP_PASS for a real mail server
+SMTP_HOST = os.environ.get("SMTP_HOST", "localhost")
+SMTP_PORT = int(os.environ.get("SMTP_PORT", "1025"))
+SMTP_USER = os.environ.get("SMTP_USER")
+SMTP_PASS = os.environ.get("SMTP_PASS")
+ALERT_SENDER = os.environ.get("ALERT_SENDER", "alerts@localhost")
+# Mentors without an email column are addressed as <mentor>@MENTOR_EMAIL_DOMAIN
+MENTOR_EMAIL_DOMAIN = os.environ.get("MENTOR_EMAIL_DOMAIN", "localhost")
+
+# When each (mentor, student) alert was last sent, for the cooldown
+ALERT_LOG_PATH = os.environ.get("ALERT_LOG_PATH", "alert_log.json")
+COOLDOWN_HOURS = 24 * 7
+
+# Digests in flight at once, sends per second (ALERT_RATE_PER_SECOND, match the mail
+# provider's limit) and attempts per digest
+MAX_CONCURRENCY = 20
+RATE_PER_SECOND = float(os.environ.get("ALERT_RATE_PER_SECOND", "200"))
+MAX_RETRIES = 3
+RETRY_BACKOFF_SECONDS = 0.5
+
+DIGEST_COLUMNS = ["name", "course", "risk_tier", "risk_score", "risk_reasons"]
+
+
+# Delivers through any SMTP server; smtplib blocks, so each send runs on a worker thread
+# Connections are reused across sends (one per concurrent sender) and dropped on error
+class SMTPTransport:
+    def __init__(self, host=SMTP_HOST, port=SMTP_PORT, user=SMTP_USER, password=SMTP_PASS, timeout=10):
+        self.host = host
+        self.port = port
+        self.user = user
+        self.password = password
+        self.timeout = timeout
+        self.idle = queue.SimpleQueue()
+
+    def _connect(self):
+        smtp = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        if self.user:
+            smtp.starttls()
+            smtp.login(self.user, self.password)
+        return smtp
+
+    def _send(self, message):
+        try:
+            smtp = self.idle.get_nowait()
+        except queue.Empty:
+            smtp = self._connect()
+        try:
+            smtp.send_message(message)
+        except BaseException:
+            smtp.close()
+            raise
+        self.idle.put(smtp)
+
+    async def send(self, message):
+        await asyncio.to_thread(self._send, message)
+
+    def close(self):
+        while True:
+            try:
+                smtp = self.idle.get_nowait()
+            except queue.Empty:
+                return
+            try:
+                smtp.quit()
+            except (OSError, smtplib.SMTPException):
+                smtp.close()
+
+
+# Keeps messages in memory instead of sending them (dry runs)
+class MemoryTransport:
+    def __init__(self):
+        self.messages = []
+
+    async def send(self, message):
+        self.messages.append(message)
+
+
+# Spaces sends evenly so no more than per_second start in any second
+class RateLimiter:
+    def __init__(self, per_second):
+        self.interval = 1 / per_second if per_second else 0
+        self.next_slot = 0.0
+        self.lock = asyncio.Lock()
+
+    async def wait(self):
+        async with self.lock:
+            now = time.monotonic()
+            delay = self.next_slot - now
+            self.next_slot = max(now, self.next_slot) + self.interval
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+# Last alert time per (mentor, student) key, persisted as JSON
+class AlertLog:
+    def __init__(self, path=ALERT_LOG_PATH, cooldown_hours=COOLDOWN_HOURS):
+        self.path = path
+        self.cooldown_seconds = cooldown_hours * 3600
+        self.sent = {}
+        if path and os.path.exists(path):
+            with open(path) as f:
+                self.sent = json.load(f)
+
+    @staticmethod
+    def _key(mentor, student):
+        return f"{mentor}|{student}"
+
+    def recently_alerted(self, mentor, student, now):
+        return now - self.sent.get(self._key(mentor, student), float("-inf")) < self.cooldown_seconds
+
+    def record(self, mentor, students, now):
+        for student in students:
+            self.sent[self._key(mentor, student)] = now
+
+    def save(self):
+        if not self.path:
+            return
+        partial = self.path + ".partial"
+        with open(partial, "w") as f:
+            json.dump(self.sent, f)
+        os.replace(partial, self.path)
+
+
+def mentor_address(mentor, email=None):
+    if isinstance(email, str) and "@" in email:
+        return email
+    return f"{mentor}@{MENTOR_EMAIL_DOMAIN}"
+
+
+# One digest per mentor listing their students in the given tiers, highest score first
+# scored is the merged frame joined with score_students output, indexed by student key;
+# students alerted to the same mentor within the cooldown are left out
+# Student lines are formatted column-wise and joined per mentor in one groupby
+def build_digests(scored, tiers=("Red",), log=None, now=None, mentor_col="mentor"):
+    now = time.time() if now is None else now
+    flagged = scored[scored["risk_tier"].isin(tiers) & scored[mentor_col].notna()]
+    if log is not None and len(flagged):
+        recent = [log.recently_alerted(m, s, now) for m, s in zip(flagged[mentor_col], flagged.index)]
+        flagged = flagged[~np.array(recent, dtype=bool)]
+    if flagged.empty:
+        return []
+    flagged = flagged.sort_values("risk_score", ascending=False, kind="stable")
+
+    lines = pd.Series("- student " + flagged.index.astype(str), index=flagged.index)
+    for column in [c for c in DIGEST_COLUMNS if c in flagged.columns]:
+        lines = lines + f", {column}: " + flagged[column].astype(str)
+    mentors = flagged[mentor_col].astype(str)
+    grouped = pd.DataFrame({
+        "text": lines.groupby(mentors, sort=True).agg("\n".join),
+        "students": pd.Series(flagged.index, index=flagged.index).groupby(mentors, sort=True).agg(list),
+    })
+    if "mentor_email" in flagged.columns:
+        grouped["email"] = flagged["mentor_email"].groupby(mentors, sort=True).first()
+    else:
+        grouped["email"] = None
+    return [
+        {"mentor": mentor, "to": mentor_address(mentor, row.email), "students": row.students, "text": row.text}
+        for mentor, row in zip(grouped.index, grouped.itertuples(index=False))
+    ]
+
+
+def digest_message(digest, sender=ALERT_SENDER):
+    message = EmailMessage()
+    message["From"] = sender
+    message["To"] = digest["to"]
+    message["Subject"] = f"At-risk digest: {len(digest['students'])} student(s) need attention"
+    message.set_content(
+        f"Hello {digest['mentor']},\n\n"
+        f"The following students are flagged by the early warning dashboard:\n\n"
+        f"{digest['text']}\n"
+    )
+    return message
+
+
+# Sends digests concurrently: at most max_concurrency in flight, rate-limited, and
+# retried with exponential backoff on connection or SMTP errors
+class AlertDispatcher:
+    def __init__(self, transport=None, max_concurrency=MAX_CONCURRENCY, rate_per_second=RATE_PER_SECOND,
+                 max_retries=MAX_RETRIES, retry_backoff=RETRY_BACKOFF_SECONDS):
+        self.transport = transport or SMTPTransport()
+        self.max_concurrency = max_concurrency
+        self.rate_per_second = rate_per_second
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+
+    async def _send(self, digest, semaphore, limiter):
+        start = time.perf_counter()
+        error = None
+        async with semaphore:
+            for attempt in range(1, self.max_retries + 1):
+                await limiter.wait()
+                try:
+                    await self.transport.send(digest_message(digest))
+                    error = None
+                    break
+                except (OSError, smtplib.SMTPException) as e:
+                    error = f"{type(e).__name__}: {e}"
+                    if attempt < self.max_retries:
+                        await asyncio.sleep(self.retry_backoff * 2 ** (attempt - 1))
+        return {
+            "mentor": digest["mentor"],
+            "to": digest["to"],
+            "students": len(digest["students"]),
+            "sent": error is None,
+            "attempts": attempt,
+            "error": error,
+            "seconds": time.perf_counter() - start,
+        }
+
+    async def dispatch(self, digests):
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        limiter = RateLimiter(self.rate_per_second)
+        try:
+            return await asyncio.gather(*(self._send(digest, semaphore, limiter) for digest in digests))
+        finally:
+            if hasattr(self.transport, "close"):
+                await asyncio.to_thread(self.transport.close)
+
+
+# Build, send and log one run of mentor digests; returns a per-digest results frame
+# Only students whose digest actually went out are recorded for the cooldown
+def send_alerts(scored, dispatcher=None, log=None, tiers=("Red",), mentor_col="mentor"):
+    dispatcher = dispatcher or AlertDispatcher()
+    now = time.time()
+    digests = build_digests(scored, tiers, log, now, mentor_col)
+    results = asyncio.run(dispatcher.dispatch(digests)) if digests else []
+    if log is not None:
+        for digest, result in zip(digests, results):
+            if result["sent"]:
+                log.record(digest["mentor"], digest["students"], now)
+        log.save()
+    return pd.DataFrame(results, columns=["mentor", "to", "students", "sent", "attempts", "error", "seconds"])
@@ -0,0 +1,158 @@
+import os
+import sqlite3
+import threading
+
+import numpy as np
+import pandas as pd
+
+from Core.attendance_store import AttendanceStore
+from Core.streaming import CHUNK_ROWS, iter_attendance_chunks
+
+# Set ATTENDANCE_DB to a database file to make the dashboards read history from it
+DB_PATH = os.environ.get("ATTENDANCE_DB")
+
+# One row per recorded cell: status 1 = present ("P"), 0 = absent ("A")
+# Missing or unrecognised cells are not stored, same as a cell with neither bit set
+# in AttendanceStore. Days are date ordinals, so day ranges are date ranges
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS students (
+    student_id INTEGER PRIMARY KEY,
+    name TEXT
+);
+CREATE TABLE IF NOT EXISTS dates (
+    day INTEGER PRIMARY KEY,
+    date TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS attendance (
+    student_id INTEGER NOT NULL,
+    day INTEGER NOT NULL,
+    status INTEGER NOT NULL,
+    PRIMARY KEY (student_id, day)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS attendance_by_day ON attendance (day, status);
+"""
+
+
+def date_ordinal(value):
+    return pd.Timestamp(value).date().toordinal()
+
+
+# Normalized attendance history in a local SQLite file
+# The (student, day) primary key serves heatmap windows and per-student ranges;
+# the (day) index serves per-date aggregates without touching student rows
+class AttendanceDB:
+    def __init__(self, path):
+        self.path = path
+        # One connection shared by Streamlit's script threads, used under a lock
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.lock = threading.Lock()
+        with self.lock, self.conn:
+            self.conn.executescript(SCHEMA)
+
+    def _query(self, sql, params=()):
+        with self.lock:
+            return self.conn.execute(sql, params).fetchall()
+
+    # Add or overwrite the cells of one wide store (e.g. a chunk of attendance_daily.csv)
+    # Re-importing a file, or a newer export with more dates, only writes what changed in place
+    # student_id is an INTEGER key, so text IDs (e.g. "S1001") are rejected before anything is written
+    def import_store(self, store):
+        days = np.array([date_ordinal(d) for d in store.dates], dtype=np.int64)
+        numeric = pd.to_numeric(pd.Series(store.ids), errors="coerce")
+        bad = pd.Series(store.ids)[numeric.isna() | (numeric % 1 != 0)]
+        if len(bad):
+            raise ValueError(f"The attendance database needs numeric student IDs; {len(bad)} IDs are not "
+                             f"numbers: {', '.join(map(str, bad[:5]))}" + (" ..." if len(bad) > 5 else ""))
+        ids = numeric.to_numpy().astype(np.int64)
+        present = store.present_matrix()
+        absent = store.absent_matrix()
+        rows, cols = np.nonzero(present | absent)
+        names = store.names if store.names is not None else [None] * store.n_students
+        with self.lock, self.conn:
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO dates (day, date) VALUES (?, ?)",
+                zip(days.tolist(), [str(d) for d in store.dates]),
+            )
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO students (student_id, name) VALUES (?, ?)",
+                zip(ids.tolist(), names),
+            )
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO attendance (student_id, day, status) VALUES (?, ?, ?)",
+                zip(ids[rows].tolist(), days[cols].tolist(), present[rows, cols].astype(int).tolist()),
+            )
+        return len(rows)
+
+    def import_frame(self, df, id_col="ID", name_col="Name"):
+        return self.import_store(AttendanceStore.from_frame(df, id_col=id_col, name_col=name_col))
+
+    # Convert a wide attendance CSV chunk by chunk; returns the number of cells stored
+    def import_csv(self, path, chunksize=CHUNK_ROWS, id_col="ID", name_col="Name"):
+        return sum(self.import_store(store) for store in iter_attendance_chunks(path, chunksize, id_col, name_col))
+
+    # All recorded dates in order (one row per date, not per cell)
+    def dates(self):
+        return [d for (d,) in self._query("SELECT date FROM dates ORDER BY day")]
+
+    # (min ID, max ID, number of students)
+    def id_range(self):
+        return self._query("SELECT MIN(student_id), MAX(student_id), COUNT(*) FROM students")[0]
+
+    # Students x dates window as an AttendanceStore, read through the (student, day) key
+    def window(self, start_id, end_id, start_date, end_date):
+        start_id, end_id = int(start_id), int(end_id)
+        start_day, end_day = date_ordinal(start_date), date_ordinal(end_date)
+        students = self._query(
+            "SELECT student_id, name FROM students WHERE student_id BETWEEN ? AND ? ORDER BY student_id",
+            (start_id, end_id),
+        )
+        dates = self._query("SELECT day, date FROM dates WHERE day BETWEEN ? AND ? ORDER BY day", (start_day, end_day))
+        cells = np.array(self._query(
+            "SELECT student_id, day, status FROM attendance "
+            "WHERE student_id BETWEEN ? AND ? AND day BETWEEN ? AND ?",
+            (start_id, end_id, start_day, end_day),
+        ), dtype=np.int64).reshape(-1, 3)
+
+        ids = np.array([s for s, _ in students], dtype=np.int64)
+        days = np.array([d for d, _ in dates], dtype=np.int64)
+        rows, cols = np.searchsorted(ids, cells[:, 0]), np.searchsorted(days, cells[:, 1])
+        present = np.zeros((len(ids), len(days)), dtype=bool)
+        absent = np.zeros((len(ids), len(days)), dtype=bool)
+        present[rows, cols] = cells[:, 2] == 1
+        absent[rows, cols] = cells[:, 2] == 0
+        names = None if all(n is None for _, n in students) else [n for _, n in students]
+        return AttendanceStore(ids, names, [d for _, d in dates], np.packbits(present, axis=1), np.packbits(absent, axis=1))
+
+    # Students present / recorded and the present share for every date in a range
+    def daily_rates(self, start_date, end_date):
+        rows = self._query(
+            "SELECT d.date, a.present, a.recorded FROM dates d JOIN ("
+            "  SELECT day, SUM(status) AS present, COUNT(*) AS recorded FROM attendance"
+            "  WHERE day BETWEEN ? AND ? GROUP BY day"
+            ") a ON a.day = d.day ORDER BY d.day",
+            (date_ordinal(start_date), date_ordinal(end_date)),
+        )
+        result = pd.DataFrame(rows, columns=["date", "present", "recorded"]).set_index("date")
+        result["rate"] = result["present"] / result["recorded"]
+        return result
+
+    # Days present / absent per student over a date range, with the same
+    # attendance_percent formula as AttendanceStore (present / dates in range)
+    def student_rates(self, start_id, end_id, start_date, end_date):
+        start_id, end_id = int(start_id), int(end_id)
+        start_day, end_day = date_ordinal(start_date), date_ordinal(end_date)
+        n_days = self._query("SELECT COUNT(*) FROM dates WHERE day BETWEEN ? AND ?", (start_day, end_day))[0][0]
+        rows = self._query(
+            "SELECT s.student_id, s.name, "
+            "  COALESCE(SUM(a.status), 0), COALESCE(SUM(1 - a.status), 0) "
+            "FROM students s LEFT JOIN attendance a "
+            "  ON a.student_id = s.student_id AND a.day BETWEEN ? AND ? "
+            "WHERE s.student_id BETWEEN ? AND ? GROUP BY s.student_id ORDER BY s.student_id",
+            (start_day, end_day, start_id, end_id),
+        )
+        result = pd.DataFrame(rows, columns=["ID", "Name", "days_present", "days_absent"])
+        result["attendance_percent"] = result["days_present"] / n_days * 100 if n_days else np.nan
+        return result
+
+    def close(self):
+        self.conn.close()
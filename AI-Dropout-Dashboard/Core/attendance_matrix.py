@@ -0,0 +1,88 @@
+import numpy as np
+import pandas as pd
+
+# Student info columns that are never treated as dates
+STUDENT_INFO_COLUMNS = ['student_id', 'student', 'name', 'id', 'roll_no']
+
+# Handle different attendance formats: P/A, Present/Absent, 1/0, etc.
+# Anything else (including missing cells) decodes as absent, as before
+ATTENDANCE_CODES = {
+    'P': 1, 'PRESENT': 1, '1': 1, 'YES': 1, 'Y': 1,
+    'A': 0, 'ABSENT': 0, '0': 0, 'NO': 0, 'N': 0,
+}
+
+# Date columns decoded per factorize pass, to bound temporary memory on big uploads
+DECODE_BLOCK_COLUMNS = 64
+
+
+# Find date columns (exclude student info columns)
+def find_date_columns(df):
+    return [col for col in df.columns if str(col).lower() not in STUDENT_INFO_COLUMNS]
+
+
+# Lookup table for a set of distinct cell values
+def attendance_lookup(uniques):
+    return np.array([ATTENDANCE_CODES.get(str(u).upper(), 0) for u in uniques], dtype=np.uint8)
+
+
+# Decode a block of attendance cells to 1 (present) / 0 (absent)
+# Only distinct cell values go through string handling; the resulting lookup
+# table is then applied to the whole array in one pass
+def decode_attendance_block(block):
+    n_rows, n_cols = block.shape
+    decoded = np.empty((n_rows, n_cols), dtype=np.uint8)
+
+    # Categorical columns already carry codes, so decoding is a single take
+    categorical = [j for j in range(n_cols) if isinstance(block.dtypes.iloc[j], pd.CategoricalDtype)]
+    for j in categorical:
+        column = block.iloc[:, j]
+        lookup = np.append(attendance_lookup(column.cat.categories), attendance_lookup([np.nan]))
+        decoded[:, j] = lookup[column.cat.codes.to_numpy()]
+
+    other = [j for j in range(n_cols) if j not in set(categorical)]
+    for start in range(0, len(other), DECODE_BLOCK_COLUMNS):
+        cols = other[start:start + DECODE_BLOCK_COLUMNS]
+        values = block.iloc[:, cols].to_numpy(dtype=object)
+        # Plain P/A cells are matched directly; only the rest is factorized
+        present = values == "P"
+        rest = ~(present | (values == "A"))
+        if rest.any():
+            codes, uniques = pd.factorize(values[rest], use_na_sentinel=False)
+            present[rest] = attendance_lookup(uniques)[codes]
+        decoded[:, cols] = present
+    return decoded
+
+
+# Attendance of an uploaded frame decoded once; heatmaps are then array slices
+class DecodedAttendance:
+    def __init__(self, df):
+        self.index = df.index
+        self.date_columns = find_date_columns(df)
+        self.column_positions = {col: i for i, col in enumerate(self.date_columns)}
+        self.present = decode_attendance_block(df[self.date_columns])
+
+    # Same result as the old per-column create_attendance_matrix
+    def matrix(self, start_id, end_id, selected_dates):
+        # Filter to selected dates
+        available_dates = [date for date in selected_dates if date in self.column_positions]
+        if not available_dates:
+            raise ValueError("No matching date columns found in the data")
+
+        # Get the relevant student rows and date columns; 1=Present, 0=Absent
+        rows = slice(max(start_id - 1, 0), end_id)
+        cols = [self.column_positions[date] for date in available_dates]
+        shade_matrix = pd.DataFrame(
+            self.present[rows][:, cols].astype(float),
+            index=self.index[rows],
+            columns=available_dates,
+        )
+        return shade_matrix, available_dates
+
+
+# Function to create attendance heatmap matrix
+# Pass a cached DecodedAttendance for the frame to skip decoding on every call
+# Raises ValueError when none of the selected dates exist in the data
+def create_attendance_matrix(df, start_id, end_id, selected_dates, decoded=None):
+    if decoded is None:
+        decoded = DecodedAttendance(df)
+    return decoded.matrix(start_id, end_id, selected_dates)
@@ -0,0 +1,121 @@
+import numpy as np
+import pandas as pd
+
+# Number of set bits for every byte value, used to count packed present/absent days
+POPCOUNT = np.unpackbits(np.arange(256, dtype=np.uint8)[:, None], axis=1).sum(axis=1).astype(np.uint8)
+
+# Rows unpacked at a time when aggregating over dates
+UNPACK_CHUNK_ROWS = 65536
+
+
+# Compact students x days attendance matrix
+# Present and absent days are each stored as one bit per cell (np.packbits along
+# the date axis); a cell with neither bit set was missing in the source file
+class AttendanceStore:
+    def __init__(self, ids, names, dates, present_bits, absent_bits):
+        self.ids = np.asarray(ids)
+        self.names = None if names is None else np.asarray(names, dtype=object)
+        self.dates = pd.Index(dates)
+        self.present_bits = present_bits
+        self.absent_bits = absent_bits
+        self.id_index = pd.Index(self.ids)
+
+    # Build from the wide layout used by attendance_daily.csv (ID, Name, date columns...)
+    @classmethod
+    def from_frame(cls, df, id_col="ID", name_col="Name"):
+        info_cols = [c for c in (id_col, name_col) if c in df.columns]
+        date_cols = [c for c in df.columns if c not in info_cols]
+        values = df[date_cols].to_numpy(dtype=object)
+        return cls(
+            df[id_col].to_numpy(),
+            df[name_col].to_numpy() if name_col in df.columns else None,
+            date_cols,
+            np.packbits(values == "P", axis=1),
+            np.packbits(values == "A", axis=1),
+        )
+
+    # With chunksize set, the file is packed chunk by chunk so the full string
+    # frame never has to be held in memory
+    @classmethod
+    def from_csv(cls, path, id_col="ID", name_col="Name", chunksize=None):
+        if chunksize is None:
+            return cls.from_frame(pd.read_csv(path), id_col=id_col, name_col=name_col)
+        chunks = [cls.from_frame(chunk, id_col=id_col, name_col=name_col)
+                  for chunk in pd.read_csv(path, chunksize=chunksize)]
+        return cls.concat(chunks)
+
+    # Stack stores that share the same dates (e.g. chunks of one file)
+    @classmethod
+    def concat(cls, stores):
+        return cls(
+            np.concatenate([s.ids for s in stores]),
+            None if stores[0].names is None else np.concatenate([s.names for s in stores]),
+            stores[0].dates,
+            np.concatenate([s.present_bits for s in stores]),
+            np.concatenate([s.absent_bits for s in stores]),
+        )
+
+    @property
+    def n_students(self):
+        return len(self.ids)
+
+    @property
+    def n_days(self):
+        return len(self.dates)
+
+    @property
+    def nbytes(self):
+        names = 0 if self.names is None else self.names.nbytes + sum(len(n) for n in self.names)
+        return self.ids.nbytes + names + self.present_bits.nbytes + self.absent_bits.nbytes
+
+    # Positional rows for a list of student IDs (-1 where the ID is unknown)
+    def rows_for(self, student_ids):
+        return self.id_index.get_indexer(student_ids)
+
+    # Positional rows of students whose ID lies in [start_id, end_id]
+    def rows_between(self, start_id, end_id):
+        return np.flatnonzero((self.ids >= start_id) & (self.ids <= end_id))
+
+    def _unpack(self, bits, rows=slice(None), start=0, stop=None):
+        stop = self.n_days if stop is None else stop
+        # Only unpack the bytes that cover the requested date range
+        first_byte, last_byte = start // 8, (stop + 7) // 8
+        cells = np.unpackbits(bits[rows, first_byte:last_byte], axis=1)
+        offset = first_byte * 8
+        return cells[:, start - offset:stop - offset].astype(bool)
+
+    # Boolean present/absent cells for a student x date window
+    def present_matrix(self, rows=slice(None), start=0, stop=None):
+        return self._unpack(self.present_bits, rows, start, stop)
+
+    def absent_matrix(self, rows=slice(None), start=0, stop=None):
+        return self._unpack(self.absent_bits, rows, start, stop)
+
+    def present_counts(self):
+        return POPCOUNT[self.present_bits].sum(axis=1, dtype=np.int64)
+
+    def absent_counts(self):
+        return POPCOUNT[self.absent_bits].sum(axis=1, dtype=np.int64)
+
+    # Same formula as (df[attendance_cols] == "P").sum(axis=1) / len(attendance_cols) * 100
+    def attendance_percent(self):
+        return self.present_counts() / self.n_days * 100
+
+    # Number of students present on each date
+    def daily_present_counts(self):
+        totals = np.zeros(self.n_days, dtype=np.int64)
+        for start in range(0, self.n_students, UNPACK_CHUNK_ROWS):
+            rows = slice(start, start + UNPACK_CHUNK_ROWS)
+            totals += self.present_matrix(rows).sum(axis=0)
+        return totals
+
+    # Share of students present on each date, like (df[attendance_cols] == "P").mean()
+    def daily_average(self):
+        return pd.Series(self.daily_present_counts() / self.n_students, index=self.dates)
+
+    def percent_frame(self, id_col="ID", name_col="Name"):
+        result = pd.DataFrame({id_col: self.ids})
+        if self.names is not None:
+            result[name_col] = self.names
+        result["attendance_percent"] = self.attendance_percent()
+        return result
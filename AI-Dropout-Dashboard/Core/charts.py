@@ -0,0 +1,158 @@
+import hashlib
+import io
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from Core.startup import lazy_import
+
+# Plotting libraries are only imported once a chart is actually rendered
+figure = lazy_import("matplotlib.figure")
+sns = lazy_import("seaborn")
+
+
+# Hash chart input data so a chart is only redrawn when its inputs change
+def data_hash(*parts):
+    h = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        arr = np.asarray(part)
+        if arr.dtype == object:
+            h.update("\0".join(map(str, arr.ravel())).encode())
+        else:
+            h.update(str(arr.shape).encode())
+            h.update(np.ascontiguousarray(arr).tobytes())
+    return h.hexdigest()
+
+
+# A chart to render: draw(ax, *inputs) fills a fresh axes of the given figsize
+class ChartSpec:
+    def __init__(self, name, title, draw, inputs, figsize=(6.4, 4.8)):
+        self.name = name
+        self.title = title
+        self.draw = draw
+        self.inputs = inputs
+        self.figsize = figsize
+        self.key = (name, data_hash(*inputs))
+
+
+# Draw one chart to PNG bytes and release the figure
+# Figures are created with the object API (not pyplot), so nothing is kept in
+# pyplot's global registry and they are safe to render from worker threads
+def render_png(spec):
+    start = time.perf_counter()
+    fig = figure.Figure(figsize=spec.figsize)
+    ax = fig.subplots()
+    spec.draw(ax, *spec.inputs)
+    buf = io.BytesIO()
+    fig.savefig(buf, format="png", bbox_inches="tight")
+    fig.clear()
+    return buf.getvalue(), time.perf_counter() - start
+
+
+# LRU cache of rendered charts keyed by (chart name, input data hash)
+# Shared by all sessions, so the OrderedDict is only changed under a lock
+class ChartCache:
+    def __init__(self, max_charts=64):
+        self.max_charts = max_charts
+        self.charts = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            if key in self.charts:
+                self.charts.move_to_end(key)
+                return self.charts[key]
+            return None
+
+    def put(self, key, rendered):
+        with self.lock:
+            self.charts[key] = rendered
+            self.charts.move_to_end(key)
+            while len(self.charts) > self.max_charts:
+                self.charts.popitem(last=False)
+
+
+# Render every chart not already cached concurrently in a worker pool
+# Returns (spec, png, render_seconds, from_cache) in spec order
+# Charts are read from the cache once, so another session evicting them cannot drop one
+def render_charts(specs, cache, max_workers=4):
+    found = {spec.key: cache.get(spec.key) for spec in specs}
+    missing = [spec for spec in specs if found[spec.key] is None]
+    rendered = {}
+    if missing:
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            for spec, chart in zip(missing, pool.map(render_png, missing)):
+                cache.put(spec.key, chart)
+                rendered[spec.key] = chart
+    results = []
+    for spec in specs:
+        png, seconds = rendered.get(spec.key) or found[spec.key]
+        results.append((spec, png, seconds, spec.key not in rendered))
+    return results
+
+
+# The six charts of Graphs/attendance_graphs.py
+
+def draw_bar(ax, names, percent):
+    ax.bar(names, percent, color='skyblue')
+    ax.set_ylabel("Attendance %")
+    ax.set_xlabel("Student Name")
+    ax.set_title("Attendance Percentage per Student")
+    ax.tick_params(axis="x", labelrotation=90)
+
+
+def draw_histogram(ax, percent):
+    ax.hist(percent, bins=10, color='orange', edgecolor='black')
+    ax.set_xlabel("Attendance %")
+    ax.set_ylabel("Number of Students")
+    ax.set_title("Distribution of Attendance Percentages")
+
+
+def draw_boxplot(ax, percent):
+    ax.boxplot(percent, vert=False)
+    ax.set_xlabel("Attendance %")
+    ax.set_title("Boxplot of Attendance Percentages")
+
+
+def draw_heatmap(ax, present_bits, dates):
+    present = np.unpackbits(present_bits, axis=1, count=len(dates))
+    sns.heatmap(pd.DataFrame(present, columns=dates), cmap="YlGnBu", cbar=True, ax=ax)
+    ax.set_ylabel("Student Index")
+    ax.set_xlabel("Date")
+    ax.set_title("Student Daily Attendance Heatmap")
+
+
+def draw_pie(ax, totals):
+    ax.pie(totals, labels=["Present", "Absent"], autopct='%1.1f%%', colors=['green', 'red'])
+    ax.set_title("Overall Attendance Status")
+
+
+def draw_line(ax, dates, avg_daily_attendance):
+    ax.plot(dates, avg_daily_attendance * 100, marker='o')
+    ax.set_ylabel("Average Attendance %")
+    ax.set_xlabel("Date")
+    ax.set_title("Average Daily Attendance Over Time")
+    ax.tick_params(axis="x", labelrotation=90)
+
+
+# Chart specs for an AttendanceStore, in the order the page shows them
+def attendance_chart_specs(store):
+    df = store.percent_frame()
+    names = df["Name"].to_numpy(dtype=object) if "Name" in df.columns else df["ID"].astype(str).to_numpy(dtype=object)
+    percent = df["attendance_percent"].to_numpy()
+    dates = np.asarray(store.dates, dtype=object)
+    totals = np.array([store.present_counts().sum(), store.absent_counts().sum()])
+    return [
+        ChartSpec("bar", "Bar Chart: Attendance Percentage per Student", draw_bar, (names, percent), figsize=(12, 5)),
+        ChartSpec("histogram", "Histogram: Distribution of Attendance Percentages", draw_histogram, (percent,)),
+        ChartSpec("boxplot", "Boxplot: Attendance Percentage Spread", draw_boxplot, (percent,)),
+        ChartSpec("heatmap", "Heatmap: Daily Attendance", draw_heatmap,
+                  (store.present_bits, dates), figsize=(12, 8)),
+        ChartSpec("pie", "Pie Chart: Overall Attendance Status", draw_pie, (totals,)),
+        ChartSpec("line", "Line Chart: Average Daily Attendance Over Time", draw_line,
+                  (dates, store.daily_average().to_numpy())),
+    ]
@@ -0,0 +1,97 @@
+import numpy as np
+import pandas as pd
+
+from Core.student_join import KEY_COLUMNS, NAME_COLUMNS, find_column
+
+# Columns with at most this many distinct values get an "is one of" filter
+MAX_FILTER_VALUES = 1000
+
+
+# Server-side view over one uploaded frame: only the requested page leaves the server
+# Sort orders, factorized filter codes and the ID/name search index are built once
+# per column on first use and reused for every later page flip
+class FrameViewer:
+    def __init__(self, df):
+        self.df = df
+        self.n_rows = len(df)
+        self.sort_orders = {}
+        self.filter_codes = {}
+        self.search_columns = [c for c in (find_column(df, KEY_COLUMNS), find_column(df, NAME_COLUMNS)) if c is not None]
+        self._search_keys = None
+        self._search_rows = None
+
+    # Stable order of a column, missing values last in both directions
+    # Mixed-type object columns (e.g. numbers and text) are ordered by their text
+    def sort_order(self, column, ascending=True):
+        if (column, ascending) not in self.sort_orders:
+            if ascending:
+                values = self.df[column].reset_index(drop=True)
+                try:
+                    order = values.sort_values(kind="stable", na_position="last")
+                except TypeError:
+                    order = values.sort_values(kind="stable", na_position="last",
+                                               key=lambda v: v.map(str, na_action="ignore"))
+                order = order.index.to_numpy()
+            else:
+                # Reverse the non-missing part only, so missing values stay last
+                order = self.sort_order(column)
+                valid = self.df[column].notna().to_numpy()[order]
+                order = np.concatenate([order[valid][::-1], order[~valid]])
+            self.sort_orders[(column, ascending)] = order
+        return self.sort_orders[(column, ascending)]
+
+    # Distinct values of a low-cardinality column, or None when it has too many to list
+    # Values are sorted unless they cannot be compared (mixed types), then in file order
+    def filter_values(self, column):
+        if column not in self.filter_codes:
+            try:
+                codes, uniques = pd.factorize(self.df[column], sort=True)
+            except TypeError:
+                codes, uniques = pd.factorize(self.df[column])
+            self.filter_codes[column] = (codes, uniques)
+        codes, uniques = self.filter_codes[column]
+        return list(uniques) if len(uniques) <= MAX_FILTER_VALUES else None
+
+    def _filter_mask(self, column, values):
+        self.filter_values(column)
+        codes, uniques = self.filter_codes[column]
+        return np.isin(codes, uniques.get_indexer(values))
+
+    # Prefix search over the lowercased ID and name columns via a sorted key array
+    def _search_mask(self, text):
+        if self._search_keys is None:
+            keys, rows = [], []
+            for column in self.search_columns:
+                keys.append(self.df[column].astype(str).str.lower().to_numpy(dtype=str))
+                rows.append(np.arange(self.n_rows))
+            keys, rows = np.concatenate(keys), np.concatenate(rows)
+            order = np.argsort(keys, kind="stable")
+            self._search_keys, self._search_rows = keys[order], rows[order]
+        text = text.strip().lower()
+        lo = np.searchsorted(self._search_keys, text, side="left")
+        hi = np.searchsorted(self._search_keys, text + "\uffff", side="left")
+        mask = np.zeros(self.n_rows, dtype=bool)
+        mask[self._search_rows[lo:hi]] = True
+        return mask
+
+    # Row positions matching the search/filters, in the requested order
+    # filters maps column -> list of allowed values, or (min, max) for numeric ranges
+    def query(self, search=None, sort_by=None, ascending=True, filters=None):
+        mask = np.ones(self.n_rows, dtype=bool)
+        if search:
+            mask &= self._search_mask(search)
+        for column, allowed in (filters or {}).items():
+            if isinstance(allowed, tuple):
+                values = pd.to_numeric(self.df[column], errors="coerce").to_numpy()
+                mask &= (values >= allowed[0]) & (values <= allowed[1])
+            else:
+                mask &= self._filter_mask(column, allowed)
+
+        if sort_by is None:
+            return np.flatnonzero(mask)
+        order = self.sort_order(sort_by, ascending)
+        return order[mask[order]]
+
+    def page(self, positions, page, page_size):
+        start = page * page_size
+        return self.df.iloc[positions[start:start + page_size]]
@@ -0,0 +1,95 @@
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+
+from Core.shared_store import USER_CACHE_DIR, private_dir
+
+# Rows serialized per chunk when writing CSV exports
+EXPORT_CHUNK_ROWS = 100_000
+
+# Export format -> (file extension, MIME type)
+EXPORT_FORMATS = {
+    "CSV": ("csv", "text/csv"),
+    "CSV (gzip)": ("csv.gz", "application/gzip"),
+    "Parquet": ("parquet", "application/vnd.apache.parquet"),
+    "Feather": ("feather", "application/octet-stream"),
+}
+
+# Export files hold student data, so they go to a private (0700) directory in the
+# user's cache directory; set EXPORT_DIR to keep them somewhere else
+EXPORT_DIR = os.environ.get("EXPORT_DIR", os.path.join(USER_CACHE_DIR, "dashboard_exports"))
+
+
+# Write one export file; CSV variants are streamed to disk in row chunks
+def write_export(df, path, fmt):
+    if fmt == "CSV":
+        df.to_csv(path, index=False, chunksize=EXPORT_CHUNK_ROWS)
+    elif fmt == "CSV (gzip)":
+        df.to_csv(path, index=False, chunksize=EXPORT_CHUNK_ROWS, compression="gzip")
+    elif fmt == "Parquet":
+        df.to_parquet(path, index=False)
+    elif fmt == "Feather":
+        df.reset_index(drop=True).to_feather(path)
+    else:
+        raise ValueError(f"Unsupported export format: {fmt}")
+
+
+# Export files built on request and reused per (dataset version, format)
+# Only the file path is cached, so payloads never sit in memory between reruns
+# One cache is shared by every session; the lock guards the file index, and another
+# session may evict (delete) a file at any time, so readers use open_export
+class ExportCache:
+    def __init__(self, export_dir=EXPORT_DIR, max_files=16):
+        self.export_dir = export_dir
+        self.max_files = max_files
+        self.files = OrderedDict()
+        self.lock = threading.Lock()
+        private_dir(export_dir, setting="EXPORT_DIR")
+
+    def cached(self, version, fmt):
+        with self.lock:
+            path = self.files.get((version, fmt))
+            if path is not None and os.path.exists(path):
+                self.files.move_to_end((version, fmt))
+                return path
+            return None
+
+    # Build the export if needed and return its path
+    def get(self, df, version, name, fmt):
+        path = self.cached(version, fmt)
+        if path is not None:
+            return path
+        extension = EXPORT_FORMATS[fmt][0]
+        path = os.path.join(self.export_dir, f"{name}-{version}.{extension}")
+        # Write to a unique temporary file first, so a failed export never looks complete
+        # and two sessions exporting the same file never write into each other's output
+        fd, partial = tempfile.mkstemp(dir=self.export_dir, prefix=f"{name}-{version}.", suffix=".partial")
+        os.close(fd)
+        try:
+            write_export(df, partial, fmt)
+            os.replace(partial, path)
+        finally:
+            if os.path.exists(partial):
+                os.remove(partial)
+        with self.lock:
+            self.files[(version, fmt)] = path
+            self.files.move_to_end((version, fmt))
+            evicted = []
+            while len(self.files) > self.max_files:
+                evicted.append(self.files.popitem(last=False)[1])
+        for old_path in evicted:
+            if os.path.exists(old_path):
+                os.remove(old_path)
+        return path
+
+    # Open the export for reading; if another session evicted the file between the
+    # lookup and the open, it is exported again
+    def open_export(self, df, version, name, fmt, attempts=3):
+        for _ in range(attempts - 1):
+            try:
+                return open(self.get(df, version, name, fmt), "rb")
+            except FileNotFoundError:
+                with self.lock:
+                    self.files.pop((version, fmt), None)
+        return open(self.get(df, version, name, fmt), "rb")
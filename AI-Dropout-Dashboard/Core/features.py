@@ -0,0 +1,181 @@
+import re
+
+import numpy as np
+import pandas as pd
+
+from Core.attendance_store import UNPACK_CHUNK_ROWS
+
+# Trailing windows (in recorded dates) for the rolling attendance rates
+RATE_WINDOWS = (7, 30)
+
+# Week-over-week velocity compares the last VELOCITY_DAYS dates with the ones before
+VELOCITY_DAYS = 7
+
+# Recent days kept per student so a new day can be applied without the full history
+HISTORY_DAYS = max(max(RATE_WINDOWS), 2 * VELOCITY_DAYS)
+
+ASSESSMENT_PATTERN = re.compile(r"^assessment_(\d+)$", re.IGNORECASE)
+
+
+# Current (ending on the last date) and longest run of True cells per student row
+# Dates are scanned in order over contiguous per-date rows, one vector step per date
+def absence_streaks(flags):
+    by_date = np.ascontiguousarray(flags.T)
+    current = np.zeros(flags.shape[0], dtype=np.int32)
+    longest = np.zeros(flags.shape[0], dtype=np.int32)
+    for day in by_date:
+        current += 1
+        current *= day
+        np.maximum(longest, current, out=longest)
+    return current, longest
+
+
+# Rolling attendance rates, week-over-week velocity and absence streaks per student
+# Only the last HISTORY_DAYS present flags and the two streak counters are kept,
+# so appending a day is O(students) like AttendanceCounts.append_day
+# Absent means an "A" cell; missing cells are neither present nor absent and
+# break an absence streak, same as the heatmap shading
+class RollingFeatures:
+    def __init__(self, ids, dates, recent_present, current_streak, longest_streak):
+        self.ids = np.asarray(ids)
+        self.dates = list(dates)
+        self.recent_present = np.asarray(recent_present, dtype=np.uint8)
+        self.current_streak = np.asarray(current_streak, dtype=np.int32)
+        self.longest_streak = np.asarray(longest_streak, dtype=np.int32)
+        self.id_index = pd.Index(self.ids)
+
+    # Whole roster in array operations, unpacking UNPACK_CHUNK_ROWS students at a time
+    @classmethod
+    def from_store(cls, store):
+        n, days = store.n_students, store.n_days
+        recent = np.zeros((n, HISTORY_DAYS), dtype=np.uint8)
+        current = np.zeros(n, dtype=np.int32)
+        longest = np.zeros(n, dtype=np.int32)
+        kept = min(days, HISTORY_DAYS)
+        for start in range(0, n, UNPACK_CHUNK_ROWS):
+            rows = slice(start, start + UNPACK_CHUNK_ROWS)
+            if kept:
+                recent[rows, HISTORY_DAYS - kept:] = store.present_matrix(rows, days - kept, days)
+                current[rows], longest[rows] = absence_streaks(store.absent_matrix(rows))
+        return cls(store.ids, store.dates, recent, current, longest)
+
+    # Row chunks of one file (see Core.streaming.iter_attendance_chunks); students are
+    # independent, so each chunk is computed on its own and then stacked
+    @classmethod
+    def from_chunks(cls, stores):
+        parts = [cls.from_store(store) for store in stores]
+        return cls(
+            np.concatenate([p.ids for p in parts]),
+            parts[0].dates,
+            np.concatenate([p.recent_present for p in parts]),
+            np.concatenate([p.current_streak for p in parts]),
+            np.concatenate([p.longest_streak for p in parts]),
+        )
+
+    def _add_students(self, ids):
+        # Students first seen today were missing on every earlier day
+        new = pd.Index(ids).difference(self.id_index)
+        if len(new) == 0:
+            return
+        self.ids = np.concatenate([self.ids, new.to_numpy()])
+        self.recent_present = np.concatenate([self.recent_present, np.zeros((len(new), HISTORY_DAYS), dtype=np.uint8)])
+        self.current_streak = np.concatenate([self.current_streak, np.zeros(len(new), dtype=np.int32)])
+        self.longest_streak = np.concatenate([self.longest_streak, np.zeros(len(new), dtype=np.int32)])
+        self.id_index = pd.Index(self.ids)
+
+    # Apply one day of attendance: ids and their "P"/"A" values for that date
+    def append_day(self, date, ids, values):
+        if date in self.dates:
+            raise ValueError(f"Attendance for {date} has already been applied")
+        self._add_students(ids)
+        rows = self.id_index.get_indexer(ids)
+        values = np.asarray(values, dtype=object)
+        present = np.zeros(len(self.ids), dtype=bool)
+        absent = np.zeros(len(self.ids), dtype=bool)
+        present[rows] = values == "P"
+        absent[rows] = values == "A"
+
+        self.recent_present[:, :-1] = self.recent_present[:, 1:]
+        self.recent_present[:, -1] = present
+        self.current_streak = np.where(absent, self.current_streak + 1, 0).astype(np.int32)
+        np.maximum(self.longest_streak, self.current_streak, out=self.longest_streak)
+        self.dates.append(date)
+
+    # Apply any date columns not seen yet; only the ID column and the new dates are parsed
+    def update_from_csv(self, path, id_col="ID", name_col="Name"):
+        columns = pd.read_csv(path, nrows=0).columns
+        new_dates = [c for c in columns if c not in (id_col, name_col) and c not in self.dates]
+        if not new_dates:
+            return []
+        df = pd.read_csv(path, usecols=[id_col] + new_dates)
+        for date in new_dates:
+            self.append_day(date, df[id_col].to_numpy(), df[date].to_numpy(dtype=object))
+        return new_dates
+
+    # Percentage of the last `days` dates attended (fewer at the start of a term)
+    def attendance_rate(self, days):
+        days = min(days, len(self.dates))
+        if days == 0:
+            return np.full(len(self.ids), np.nan)
+        return self.recent_present[:, -days:].sum(axis=1) / days * 100
+
+    # Change in the 7-day rate against the week before, in percentage points
+    def velocity(self):
+        if len(self.dates) < 2 * VELOCITY_DAYS:
+            return np.full(len(self.ids), np.nan)
+        this_week = self.recent_present[:, -VELOCITY_DAYS:].sum(axis=1, dtype=np.int64)
+        last_week = self.recent_present[:, -2 * VELOCITY_DAYS:-VELOCITY_DAYS].sum(axis=1, dtype=np.int64)
+        return (this_week - last_week) / VELOCITY_DAYS * 100
+
+    def frame(self, id_col="ID"):
+        result = pd.DataFrame({id_col: self.ids})
+        for days in RATE_WINDOWS:
+            result[f"attendance_rate_{days}d"] = self.attendance_rate(days)
+        result["attendance_velocity_wow"] = self.velocity()
+        result["current_absence_streak"] = self.current_streak
+        result["longest_absence_streak"] = self.longest_streak
+        return result
+
+    # Text IDs are saved as a fixed-width string array (an object array would need
+    # pickle to load) and come back as objects, like the IDs of a freshly built store
+    def save(self, path):
+        np.savez(
+            path,
+            ids=self.ids.astype(str) if self.ids.dtype == object else self.ids,
+            dates=np.asarray(self.dates, dtype=str),
+            recent_present=self.recent_present,
+            current_streak=self.current_streak,
+            longest_streak=self.longest_streak,
+        )
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as state:
+            ids = state["ids"]
+            if ids.dtype.kind == "U":
+                ids = ids.astype(object)
+            return cls(ids, state["dates"].tolist(), state["recent_present"],
+                       state["current_streak"], state["longest_streak"])
+
+
+# assessment_1, assessment_2, ... columns in assessment order
+def assessment_columns(df):
+    numbered = [(int(m.group(1)), c) for c in df.columns if (m := ASSESSMENT_PATTERN.match(str(c)))]
+    return [c for _, c in sorted(numbered)]
+
+
+# Least-squares slope of each student's scores over the assessment sequence (points
+# per assessment), skipping missing scores; NaN with fewer than two scores
+def score_slope(df, columns=None):
+    columns = assessment_columns(df) if columns is None else columns
+    scores = df[columns].apply(pd.to_numeric, errors="coerce").to_numpy(dtype=float)
+    valid = ~np.isnan(scores)
+    x = np.where(valid, np.arange(len(columns), dtype=float), 0.0)
+    y = np.where(valid, scores, 0.0)
+    n = valid.sum(axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        x_mean = x.sum(axis=1) / n
+        y_mean = y.sum(axis=1) / n
+        dx = np.where(valid, x - x_mean[:, None], 0.0)
+        slope = (dx * (y - y_mean[:, None])).sum(axis=1) / (dx ** 2).sum(axis=1)
+    return pd.Series(np.where(n >= 2, slope, np.nan), index=df.index, name="score_slope")
@@ -0,0 +1,125 @@
+import numpy as np
+import pandas as pd
+
+from Core.attendance_store import AttendanceStore
+
+
+# Running present/total day counts per student
+# Appending a day touches each student once, so a daily update is O(students)
+# instead of re-scanning the whole attendance history
+class AttendanceCounts:
+    def __init__(self, ids, names, dates, present, total):
+        self.ids = np.asarray(ids)
+        self.names = None if names is None else np.asarray(names, dtype=object)
+        self.dates = list(dates)
+        self.present = np.asarray(present, dtype=np.int64)
+        self.total = np.asarray(total, dtype=np.int64)
+        self.id_index = pd.Index(self.ids)
+
+    # Full recompute from packed chunks (see Core.streaming.iter_attendance_chunks)
+    @classmethod
+    def from_chunks(cls, stores):
+        return cls.from_store(AttendanceStore.concat(list(stores)))
+
+    @classmethod
+    def from_store(cls, store):
+        return cls(
+            store.ids,
+            store.names,
+            store.dates,
+            store.present_counts(),
+            np.full(store.n_students, store.n_days, dtype=np.int64),
+        )
+
+    def _add_students(self, ids, names):
+        # Students first seen today were missing on every earlier day
+        new = pd.Index(ids).difference(self.id_index)
+        if len(new) == 0:
+            return
+        self.ids = np.concatenate([self.ids, new.to_numpy()])
+        if self.names is not None:
+            new_names = pd.Series(names, index=ids).loc[new] if names is not None else new.astype(str)
+            self.names = np.concatenate([self.names, np.asarray(new_names, dtype=object)])
+        self.present = np.concatenate([self.present, np.zeros(len(new), dtype=np.int64)])
+        self.total = np.concatenate([self.total, np.full(len(new), len(self.dates), dtype=np.int64)])
+        self.id_index = pd.Index(self.ids)
+
+    # Apply one day of attendance: ids and their "P"/"A" values for that date
+    def append_day(self, date, ids, values, names=None):
+        if date in self.dates:
+            raise ValueError(f"Attendance for {date} has already been applied")
+        self._add_students(ids, names)
+        rows = self.id_index.get_indexer(ids)
+        present = np.asarray(values, dtype=object) == "P"
+        np.add.at(self.present, rows[present], 1)
+        # Every student gets a day in the denominator, even when missing from the file
+        self.total += 1
+        self.dates.append(date)
+
+    # Apply any date columns not seen yet, either from the growing attendance_daily.csv
+    # or from a single-day file with the same ID, Name, <date> layout
+    # Only the ID/Name columns and the new dates are parsed
+    def update_from_csv(self, path, id_col="ID", name_col="Name"):
+        columns = pd.read_csv(path, nrows=0).columns
+        new_dates = [c for c in columns if c not in (id_col, name_col) and c not in self.dates]
+        if not new_dates:
+            return []
+        info_cols = [c for c in (id_col, name_col) if c in columns]
+        df = pd.read_csv(path, usecols=info_cols + new_dates)
+        names = df[name_col].to_numpy() if name_col in df.columns else None
+        for date in new_dates:
+            self.append_day(date, df[id_col].to_numpy(), df[date].to_numpy(dtype=object), names)
+        return new_dates
+
+    def attendance_percent(self):
+        return self.present / self.total * 100
+
+    def percent_frame(self, id_col="ID", name_col="Name"):
+        result = pd.DataFrame({id_col: self.ids})
+        if self.names is not None:
+            result[name_col] = self.names
+        result["attendance_percent"] = self.attendance_percent()
+        return result
+
+    # Compare the running counts with a full recompute; returns the mismatching students
+    def check_consistency(self, store, id_col="ID"):
+        rows = store.rows_for(self.ids)
+        known = rows >= 0
+        expected_present = np.zeros(len(self.ids), dtype=np.int64)
+        expected_present[known] = store.present_counts()[rows[known]]
+        report = pd.DataFrame({
+            id_col: self.ids,
+            "present": self.present,
+            "expected_present": expected_present,
+            "total": self.total,
+            "expected_total": store.n_days,
+        })
+        bad = (report["present"] != report["expected_present"]) | (report["total"] != report["expected_total"]) | ~known
+        missing = np.setdiff1d(store.ids, self.ids)
+        if len(missing):
+            extra = pd.DataFrame({id_col: missing, "present": 0, "total": 0,
+                                  "expected_present": store.present_counts()[store.rows_for(missing)],
+                                  "expected_total": store.n_days})
+            return pd.concat([report[bad], extra], ignore_index=True)
+        return report[bad].reset_index(drop=True)
+
+    # Text IDs are saved as a fixed-width string array, like RollingFeatures.save
+    def save(self, path):
+        np.savez(
+            path,
+            ids=self.ids.astype(str) if self.ids.dtype == object else self.ids,
+            names=np.asarray([] if self.names is None else self.names, dtype=str),
+            has_names=self.names is not None,
+            dates=np.asarray(self.dates, dtype=str),
+            present=self.present,
+            total=self.total,
+        )
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as state:
+            ids = state["ids"]
+            if ids.dtype.kind == "U":
+                ids = ids.astype(object)
+            names = state["names"].astype(object) if state["has_names"] else None
+            return cls(ids, names, state["dates"].tolist(), state["present"], state["total"])
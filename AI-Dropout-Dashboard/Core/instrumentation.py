@@ -0,0 +1,186 @@
+import json
+import os
+import threading
+import time
+import tracemalloc
+import weakref
+from collections import deque
+from contextlib import contextmanager
+
+# Runs kept in the rolling history
+HISTORY_RUNS = 200
+
+# Set DASHBOARD_METRICS_PATH to append every run to a JSON lines file
+METRICS_PATH = os.environ.get("DASHBOARD_METRICS_PATH")
+
+
+# True when the debug panel was requested with ?debug=1 or DASHBOARD_DEBUG=1
+def debug_requested():
+    import streamlit as st
+
+    return os.environ.get("DASHBOARD_DEBUG") == "1" or st.query_params.get("debug") == "1"
+
+
+# tracemalloc is process-wide and shared by every session: it is started when the first
+# memory-tracing profiler appears and stopped only when the last one is gone (and only
+# if it was started here); _trace_sessions counts the live tracing profilers
+_trace_lock = threading.Lock()
+_trace_sessions = 0
+_trace_started_here = False
+
+
+def _acquire_tracing():
+    global _trace_sessions, _trace_started_here
+    with _trace_lock:
+        if _trace_sessions == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _trace_started_here = True
+        _trace_sessions += 1
+
+
+def _release_tracing():
+    global _trace_sessions, _trace_started_here
+    with _trace_lock:
+        _trace_sessions -= 1
+        if _trace_sessions == 0 and _trace_started_here:
+            # Tracing slows every allocation, so it is off while no debug panel is open
+            tracemalloc.stop()
+            _trace_started_here = False
+
+
+# Peaks are only meaningful while a single session traces: reset_peak is global, so with
+# two debug panels open each one would reset the other's peak
+def _tracing_exclusive():
+    with _trace_lock:
+        return _trace_sessions == 1
+
+
+# Per-rerun stage timings, with optional peak-memory sampling via tracemalloc
+# Stages are not meant to be nested: each one resets the tracemalloc peak
+# Peak memory is reported while this is the only tracing profiler (None otherwise); it
+# still includes allocations made by non-debug sessions running at the same time
+class Profiler:
+    def __init__(self, app, trace_memory=False):
+        self.app = app
+        self.trace_memory = trace_memory
+        self.started = time.time()
+        self.start = time.perf_counter()
+        self.stages = []
+        # Set by Core.startup.mark_first_paint; cold start only on an app's first run in a process
+        self.first_paint_seconds = None
+        self.cold_start_seconds = None
+        if trace_memory:
+            _acquire_tracing()
+            # Released by close(), or when the profiler is garbage collected after a
+            # rerun that stopped early
+            self._release_tracing = weakref.finalize(self, _release_tracing)
+
+    # End of the rerun; MetricsHistory.add calls this
+    def close(self):
+        if self.trace_memory:
+            self._release_tracing()
+
+    @contextmanager
+    def stage(self, name):
+        sample = self.trace_memory and _tracing_exclusive()
+        if sample:
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            peak = tracemalloc.get_traced_memory()[1] - base if sample and _tracing_exclusive() else None
+            self.stages.append({"stage": name, "seconds": seconds, "peak_bytes": peak})
+
+    def run_record(self):
+        return {
+            "app": self.app,
+            "timestamp": self.started,
+            "total_seconds": sum(s["seconds"] for s in self.stages),
+            "first_paint_seconds": self.first_paint_seconds,
+            "cold_start_seconds": self.cold_start_seconds,
+            "stages": list(self.stages),
+        }
+
+
+# Rolling history of finished runs, shared by every session of an app
+class MetricsHistory:
+    def __init__(self, max_runs=HISTORY_RUNS):
+        self.runs = deque(maxlen=max_runs)
+
+    def add(self, profiler, path=METRICS_PATH):
+        profiler.close()
+        record = profiler.run_record()
+        self.runs.append(record)
+        if path:
+            with open(path, "a") as f:
+                f.write(json.dumps(record) + "\n")
+        return record
+
+    def to_json_lines(self):
+        return "".join(json.dumps(run) + "\n" for run in self.runs)
+
+    # Prometheus text exposition: per-stage sum/count of seconds and the last peak memory
+    def to_prometheus(self):
+        totals = {}
+        for run in self.runs:
+            for s in run["stages"]:
+                key = (run["app"], s["stage"])
+                total, count, peak = totals.get(key, (0.0, 0, None))
+                totals[key] = (total + s["seconds"], count + 1, s["peak_bytes"] if s["peak_bytes"] is not None else peak)
+
+        lines = [
+            "# HELP dashboard_stage_seconds Time spent in each dashboard stage",
+            "# TYPE dashboard_stage_seconds summary",
+        ]
+        for (app, stage), (total, count, _) in sorted(totals.items()):
+            labels = f'app="{app}",stage="{stage}"'
+            lines.append(f"dashboard_stage_seconds_sum{{{labels}}} {total:.6f}")
+            lines.append(f"dashboard_stage_seconds_count{{{labels}}} {count}")
+        lines += [
+            "# HELP dashboard_stage_peak_bytes Peak traced memory of the last sampled run of each stage",
+            "# TYPE dashboard_stage_peak_bytes gauge",
+        ]
+        for (app, stage), (_, _, peak) in sorted(totals.items()):
+            if peak is not None:
+                lines.append(f'dashboard_stage_peak_bytes{{app="{app}",stage="{stage}"}} {peak}')
+
+        # Latest time-to-first-paint per app, and the last cold start from server launch
+        for metric, help_text in [("first_paint_seconds", "Seconds from script start to the first painted element"),
+                                  ("cold_start_seconds", "Seconds from server start to the first painted element")]:
+            latest = {run["app"]: run[metric] for run in self.runs if run.get(metric) is not None}
+            lines += [f"# HELP dashboard_{metric} {help_text}", f"# TYPE dashboard_{metric} gauge"]
+            lines += [f'dashboard_{metric}{{app="{app}"}} {value:.6f}' for app, value in sorted(latest.items())]
+        return "\n".join(lines) + "\n"
+
+
+# Optional debug sidebar: this rerun's breakdown, the rolling history and exports
+def render_debug_panel(record, history):
+    import pandas as pd
+    import streamlit as st
+
+    with st.sidebar.expander("🐞 Performance", expanded=True):
+        st.write(f"**This run:** {record['total_seconds']:.3f}s")
+        if record.get("first_paint_seconds") is not None:
+            st.write(f"**First paint:** {record['first_paint_seconds']:.3f}s")
+        cold_starts = [run["cold_start_seconds"] for run in history.runs
+                       if run["app"] == record["app"] and run.get("cold_start_seconds") is not None]
+        if cold_starts:
+            st.write(f"**Cold start to first paint:** {cold_starts[-1]:.3f}s")
+        stages = pd.DataFrame(record["stages"])
+        if not stages.empty:
+            if stages["peak_bytes"].notna().any():
+                stages["peak_mb"] = stages["peak_bytes"] / 1e6
+            st.dataframe(stages.drop(columns=["peak_bytes"]), use_container_width=True)
+
+        runs = [run for run in history.runs if run["app"] == record["app"]]
+        if len(runs) > 1:
+            st.write(f"**Last {len(runs)} runs (seconds)**")
+            st.line_chart(pd.DataFrame({"total_seconds": [run["total_seconds"] for run in runs]}))
+
+        st.download_button("📥 Prometheus metrics", history.to_prometheus(), file_name="dashboard_metrics.prom",
+                           mime="text/plain", key="debug_prom")
+        st.download_button("📥 JSON lines", history.to_json_lines(), file_name="dashboard_metrics.jsonl",
+                           mime="application/json", key="debug_jsonl")
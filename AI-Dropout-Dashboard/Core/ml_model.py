@@ -0,0 +1,177 @@
+import glob
+import hashlib
+import io
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from Core.risk import numeric_column, score_students
+from Core.startup import lazy_import
+
+# scikit-learn and joblib take seconds to import; they are loaded on first use
+ensemble = lazy_import("sklearn.ensemble")
+joblib = lazy_import("joblib")
+
+# Directory where trained models are written as risk_model-<version>.joblib
+MODEL_DIR = os.environ.get("RISK_MODEL_DIR", "models")
+
+# Rows scored per chunk; cohorts larger than one chunk are scored across a process pool
+SCORE_CHUNK_ROWS = 100_000
+
+FEATURE_COLUMNS = [
+    "attendance_percent", "absence_ratio", "total_fee_due", "days_since_payment",
+    "assessment_1", "assessment_2", "assessment_3", "score_trend",
+    "failed_attempts", "avg_score",
+]
+
+# Recorded outcome (1 = dropped out, 0 = stayed); students without one are not trained on
+OUTCOME_COLUMNS = ["dropped_out", "dropout"]
+
+
+def _numeric(df, column):
+    values = numeric_column(df, column)
+    return pd.Series(np.nan, index=df.index) if values is None else values
+
+
+# Engineered features from the merged attendance, fees and scores frame (see StudentJoin)
+# days_since_payment counts to reference_date (default today); pass a fixed date when the
+# features have to be reproducible, e.g. for cached scores
+def build_features(merged, reference_date=None):
+    reference_date = pd.Timestamp(reference_date) if reference_date is not None else pd.Timestamp.today().normalize()
+    features = pd.DataFrame(index=merged.index)
+    features["attendance_percent"] = _numeric(merged, ["daily_attendance_percent", "attendance_percent"])
+    features["absence_ratio"] = _numeric(merged, "days_absent") / _numeric(merged, "days_recorded")
+    features["total_fee_due"] = _numeric(merged, "total_fee_due")
+    if "last_payment_date" in merged.columns:
+        paid = pd.to_datetime(merged["last_payment_date"], errors="coerce")
+        features["days_since_payment"] = (reference_date - paid).dt.days
+    else:
+        features["days_since_payment"] = np.nan
+    for column in ["assessment_1", "assessment_2", "assessment_3", "failed_attempts", "avg_score"]:
+        features[column] = _numeric(merged, column)
+    features["score_trend"] = features["assessment_3"] - features["assessment_1"]
+    # Missing sources become 0 so every student can be scored
+    return features[FEATURE_COLUMNS].fillna(0.0).astype(np.float32)
+
+
+# Recorded dropout outcomes from the merged frame, or None when no source has them
+def outcome_labels(merged):
+    return numeric_column(merged, OUTCOME_COLUMNS)
+
+
+# Train a Random Forest on engineered features
+# Labels come from the recorded outcome column when there is one; otherwise the rule
+# engine's Red tier is used, so the model is only a rules surrogate (it learns to
+# reproduce the rules, not to predict real dropouts)
+def train_model(merged, labels=None, n_estimators=100, reference_date=None):
+    features = build_features(merged, reference_date)
+    if labels is None:
+        labels = outcome_labels(merged)
+    if labels is None:
+        labels = score_students(merged)["risk_tier"] == "Red"
+    labels = pd.Series(np.asarray(labels, dtype=float), index=features.index)
+    known = labels.notna().to_numpy()
+    model = ensemble.RandomForestClassifier(n_estimators=n_estimators, random_state=0, n_jobs=-1)
+    model.fit(features.to_numpy()[known], labels[known].astype(int).to_numpy())
+    # Scoring is parallelised across processes, so each prediction stays single-threaded
+    model.n_jobs = 1
+    return model
+
+
+# Persist a model under a content-hash version; returns (path, version)
+def save_model(model, model_dir=MODEL_DIR):
+    buf = io.BytesIO()
+    joblib.dump(model, buf)
+    data = buf.getvalue()
+    version = hashlib.blake2b(data, digest_size=8).hexdigest()
+    os.makedirs(model_dir, exist_ok=True)
+    path = os.path.join(model_dir, f"risk_model-{version}.joblib")
+    with open(path, "wb") as f:
+        f.write(data)
+    return path, version
+
+
+def latest_model_path(model_dir=MODEL_DIR):
+    paths = glob.glob(os.path.join(model_dir, "risk_model-*.joblib"))
+    return max(paths, key=os.path.getmtime) if paths else None
+
+
+# Model loaded in this process, keyed by path (the file name carries the version)
+# Only the latest model is kept: loading a new version releases the old one
+_model_lock = threading.Lock()
+_loaded_models = {}
+
+
+def load_model(path):
+    with _model_lock:
+        if path not in _loaded_models:
+            model = joblib.load(path)
+            _loaded_models.clear()
+            _loaded_models[path] = model
+        return _loaded_models[path]
+
+
+def _positive_proba(model, rows):
+    if 1 not in model.classes_:
+        return np.zeros(len(rows))
+    return model.predict_proba(rows)[:, list(model.classes_).index(1)]
+
+
+# Worker process state: the model is loaded once per worker, not once per chunk
+_worker_model = None
+
+
+def _init_worker(path):
+    global _worker_model
+    _worker_model = load_model(path)
+
+
+def _score_chunk(rows):
+    start = time.perf_counter()
+    proba = _positive_proba(_worker_model, rows)
+    return proba, len(rows), time.perf_counter() - start
+
+
+# Long-lived scoring pool of this process, one per model path: its workers load the model
+# once and are reused by every later call. When a new model is scored the old pool is
+# shut down without cancelling, so chunks other sessions already submitted still finish
+# Workers are spawned, not forked: forking Streamlit's threaded server can copy held locks
+_pool_lock = threading.Lock()
+_pool = None
+_pool_model_path = None
+
+
+# Chunks are submitted under the lock (map submits eagerly), so a pool is never shut down
+# between being picked and being given its chunks
+def map_scoring_pool(model_path, chunks, processes=None):
+    global _pool, _pool_model_path
+    with _pool_lock:
+        if _pool is None or _pool_model_path != model_path:
+            if _pool is not None:
+                _pool.shutdown(wait=False)
+            _pool = ProcessPoolExecutor(max_workers=processes, mp_context=multiprocessing.get_context("spawn"),
+                                        initializer=_init_worker, initargs=(model_path,))
+            _pool_model_path = model_path
+        return _pool.map(_score_chunk, chunks)
+
+
+# Risk probability for the whole roster, scored in chunks across the scoring pool
+# Returns (probabilities Series, per-chunk stats frame with rows, seconds, rows_per_second)
+def score_probabilities(merged, model_path, chunk_rows=SCORE_CHUNK_ROWS, processes=None, reference_date=None):
+    features = build_features(merged, reference_date).to_numpy()
+    chunks = [features[i:i + chunk_rows] for i in range(0, len(features), chunk_rows)] or [features]
+    if len(chunks) > 1:
+        results = list(map_scoring_pool(model_path, chunks, processes))
+    else:
+        _init_worker(model_path)
+        results = [_score_chunk(chunks[0])]
+
+    stats = pd.DataFrame([(rows, seconds) for _, rows, seconds in results], columns=["rows", "seconds"])
+    stats["rows_per_second"] = stats["rows"] / stats["seconds"].where(stats["seconds"] > 0)
+    proba = np.concatenate([p for p, _, _ in results]) if results else np.array([])
+    return pd.Series(proba, index=merged.index, name="ml_risk_probability"), stats
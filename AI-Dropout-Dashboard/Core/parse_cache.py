@@ -0,0 +1,97 @@
+import hashlib
+import logging
+import os
+import time
+from collections import OrderedDict
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+
+# Hash the raw bytes of an upload so identical files share one cache entry
+def content_hash(data):
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+# Bounded LRU cache of parsed DataFrames keyed by upload content hash
+# Parsed frames can optionally be spilled to a Parquet/Feather sidecar directory
+# so they survive eviction and server restarts
+class ParseCache:
+    def __init__(self, max_entries=8, spill_dir=None, spill_format="parquet"):
+        self.max_entries = max_entries
+        self.spill_dir = spill_dir
+        self.spill_format = spill_format
+        self.entries = OrderedDict()
+        self.engine_warned = False
+        if spill_dir:
+            os.makedirs(spill_dir, exist_ok=True)
+
+    def _spill_path(self, key):
+        return os.path.join(self.spill_dir, f"{key}.{self.spill_format}")
+
+    def _spill(self, key, df, parse_seconds):
+        if not self.spill_dir:
+            return
+        try:
+            if self.spill_format == "feather":
+                df.reset_index(drop=True).to_feather(self._spill_path(key))
+            else:
+                df.to_parquet(self._spill_path(key), index=False)
+            with open(self._spill_path(key) + ".meta", "w") as f:
+                f.write(str(parse_seconds))
+        except ImportError:
+            # No parquet/feather engine installed: warn once, entries stay in memory
+            if not self.engine_warned:
+                self.engine_warned = True
+                logger.warning("Parse cache spilling needs pyarrow; keeping parsed uploads in memory only")
+        except Exception:
+            # A column pyarrow cannot serialise (e.g. mixed-type objects) or a full disk:
+            # this entry just stays in memory; later entries still try to spill
+            logger.warning("Could not spill parsed upload %s to %s", key, self.spill_dir, exc_info=True)
+            for path in (self._spill_path(key), self._spill_path(key) + ".meta"):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+    def _load_spilled(self, key):
+        if not self.spill_dir or not os.path.exists(self._spill_path(key)):
+            return None
+        try:
+            if self.spill_format == "feather":
+                df = pd.read_feather(self._spill_path(key))
+            else:
+                df = pd.read_parquet(self._spill_path(key))
+            with open(self._spill_path(key) + ".meta") as f:
+                parse_seconds = float(f.read())
+        except Exception:
+            # A spill that cannot be read back is parsed again
+            logger.warning("Could not load spilled upload %s", key, exc_info=True)
+            return None
+        return df, parse_seconds
+
+    def _store(self, key, df, parse_seconds):
+        self.entries[key] = (df, parse_seconds)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    # Return (df, from_cache, parse_seconds); parse(data) is only called on a miss
+    def get_or_parse(self, key, parse):
+        if key in self.entries:
+            self.entries.move_to_end(key)
+            df, parse_seconds = self.entries[key]
+            return df, True, parse_seconds
+
+        spilled = self._load_spilled(key)
+        if spilled is not None:
+            self._store(key, *spilled)
+            return spilled[0], True, spilled[1]
+
+        start = time.perf_counter()
+        df = parse()
+        parse_seconds = time.perf_counter() - start
+        self._store(key, df, parse_seconds)
+        self._spill(key, df, parse_seconds)
+        return df, False, parse_seconds
@@ -0,0 +1,203 @@
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+
+from Core.attendance_store import AttendanceStore
+from Core.risk import score_students
+from Core.student_join import KEY_COLUMNS, NAME_COLUMNS, StudentJoin, find_column, is_daily_attendance
+
+# Input files are recognised by file name prefix, first match wins
+# attendance_percent*.csv is an output of the attendance job, never an input
+SOURCE_PREFIXES = [
+    ("attendance_percent", None),
+    ("attendance_daily", "attendance_daily"),
+    ("attendance", "attendance"),
+    ("assignment", "assignments"),
+    ("fee", "fees"),
+    ("score", "scores"),
+    ("test_marks", "scores"),
+    ("marks", "scores"),
+]
+
+# Written last in each cohort's output directory; its presence marks the cohort as done
+MANIFEST_FILE = "manifest.json"
+RISK_FILE = "student_risk.csv"
+PERCENT_FILE = "attendance_percent.csv"
+
+
+def source_for(file_name):
+    stem = os.path.splitext(file_name)[0].lower()
+    for prefix, source in SOURCE_PREFIXES:
+        if stem.startswith(prefix):
+            return source
+    return None
+
+
+# Source name -> CSV path for one cohort directory
+def cohort_sources(cohort_dir):
+    sources = {}
+    for file_name in sorted(os.listdir(cohort_dir)):
+        path = os.path.join(cohort_dir, file_name)
+        if not file_name.lower().endswith(".csv") or not os.path.isfile(path):
+            continue
+        source = source_for(file_name)
+        if source is not None and source not in sources:
+            sources[source] = path
+    return sources
+
+
+# Every subdirectory holding recognised input files is one cohort (course or campus)
+# A directory with input files directly inside it is a single cohort
+def find_cohorts(input_dir):
+    if cohort_sources(input_dir):
+        return {os.path.basename(os.path.abspath(input_dir)): input_dir}
+    cohorts = {}
+    for name in sorted(os.listdir(input_dir)):
+        path = os.path.join(input_dir, name)
+        if os.path.isdir(path) and cohort_sources(path):
+            cohorts[name] = path
+    return cohorts
+
+
+# Size and mtime of every input, so a finished cohort is redone only when its files change
+def input_signature(sources, model_path=None):
+    signature = {source: [os.path.getsize(path), os.path.getmtime(path)] for source, path in sources.items()}
+    signature["model"] = model_path and [model_path, os.path.getmtime(model_path)]
+    return signature
+
+
+def is_done(cohort_out, signature):
+    try:
+        with open(os.path.join(cohort_out, MANIFEST_FILE)) as f:
+            return json.load(f)["inputs"] == json.loads(json.dumps(signature))
+    except (OSError, ValueError, KeyError):
+        return False
+
+
+# Write through a temporary file so an interrupted run never leaves a half-written output
+def _write_csv(df, path, **kwargs):
+    partial = path + ".partial"
+    df.to_csv(partial, **kwargs)
+    os.replace(partial, path)
+
+
+# Drop blank and exactly duplicated rows, and rows whose student ID is missing
+def clean_frame(df):
+    before = len(df)
+    df = df.dropna(how="all").drop_duplicates()
+    key_col = find_column(df, KEY_COLUMNS)
+    if key_col is not None:
+        df = df[df[key_col].notna() & (df[key_col].astype(str).str.strip() != "")]
+    return df.reset_index(drop=True), before - len(df)
+
+
+# Ingest, clean, join, engineer features and score one cohort; runs in a worker process
+# Returns a summary with per-file and per-stage timings
+def process_cohort(cohort, cohort_dir, out_dir, model_path=None):
+    start = time.perf_counter()
+    sources = cohort_sources(cohort_dir)
+    cohort_out = os.path.join(out_dir, cohort)
+    os.makedirs(cohort_out, exist_ok=True)
+    signature = input_signature(sources, model_path)
+    stages = {}
+    files = []
+    dropped_rows = 0
+
+    join = StudentJoin()
+    for source, path in sources.items():
+        file_start = time.perf_counter()
+        df = pd.read_csv(path)
+        read_seconds = time.perf_counter() - file_start
+        df, dropped = clean_frame(df)
+        dropped_rows += dropped
+        join.update_source(source, df)
+
+        # Daily sheets also get the per-student attendance_percent.csv the attendance job produced
+        key_col, name_col = find_column(df, KEY_COLUMNS), find_column(df, NAME_COLUMNS)
+        if is_daily_attendance(df, key_col, name_col):
+            store = AttendanceStore.from_frame(df, id_col=key_col, name_col=name_col)
+            _write_csv(store.percent_frame(key_col, name_col or "Name"), os.path.join(cohort_out, PERCENT_FILE), index=False)
+        files.append({
+            "source": source,
+            "path": path,
+            "rows": len(df),
+            "dropped_rows": dropped,
+            "read_seconds": read_seconds,
+            "seconds": time.perf_counter() - file_start,
+        })
+    stages["ingest"] = sum(f["seconds"] for f in files)
+
+    stage_start = time.perf_counter()
+    merged = join.merged
+    risk = score_students(merged)
+    stages["risk"] = time.perf_counter() - stage_start
+
+    output = pd.concat([merged, risk], axis=1)
+    if model_path is not None:
+        # scikit-learn is only imported when a model is given
+        stage_start = time.perf_counter()
+        from Core.ml_model import score_probabilities
+        # One chunk: the cohorts themselves are already spread across processes
+        output["ml_risk_probability"], _ = score_probabilities(merged, model_path, chunk_rows=max(len(merged), 1))
+        stages["ml_scoring"] = time.perf_counter() - stage_start
+
+    stage_start = time.perf_counter()
+    _write_csv(output, os.path.join(cohort_out, RISK_FILE))
+    stages["write"] = time.perf_counter() - stage_start
+
+    summary = {
+        "cohort": cohort,
+        "inputs": signature,
+        "students": len(merged),
+        "dropped_rows": dropped_rows,
+        # Student IDs that could not be parsed, per source; those rows are not scored
+        "unparsed_ids": {source: ids[:20] for source, ids in join.unparsed.items() if ids},
+        "tiers": risk["risk_tier"].value_counts().to_dict(),
+        "files": files,
+        "stages": stages,
+        "seconds": time.perf_counter() - start,
+    }
+    # The manifest goes last: a cohort without one is redone on the next run
+    partial = os.path.join(cohort_out, MANIFEST_FILE + ".partial")
+    with open(partial, "w") as f:
+        json.dump(summary, f, indent=2)
+    os.replace(partial, os.path.join(cohort_out, MANIFEST_FILE))
+    return summary
+
+
+# Process every cohort across a process pool, yielding (done, total, summary) as each finishes
+# Cohorts already finished with unchanged inputs are skipped unless resume is False;
+# a failing cohort is reported with an "error" entry instead of stopping the run
+def run_pipeline(cohorts, out_dir, processes=None, resume=True, model_path=None):
+    pending = {}
+    skipped = []
+    for cohort, cohort_dir in cohorts.items():
+        signature = input_signature(cohort_sources(cohort_dir), model_path)
+        if resume and is_done(os.path.join(out_dir, cohort), signature):
+            skipped.append(cohort)
+        else:
+            pending[cohort] = cohort_dir
+
+    total = len(cohorts)
+    done = 0
+    for cohort in skipped:
+        done += 1
+        yield done, total, {"cohort": cohort, "skipped": True}
+    if not pending:
+        return
+
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        futures = {
+            pool.submit(process_cohort, cohort, cohort_dir, out_dir, model_path): cohort
+            for cohort, cohort_dir in pending.items()
+        }
+        for future in as_completed(futures):
+            done += 1
+            try:
+                summary = future.result()
+            except Exception as e:
+                summary = {"cohort": futures[future], "error": f"{type(e).__name__}: {e}"}
+            yield done, total, summary
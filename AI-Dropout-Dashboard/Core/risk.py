@@ -0,0 +1,89 @@
+import operator
+
+import numpy as np
+import pandas as pd
+
+# Comparison operators a rule may use
+OPS = {
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+    "==": operator.eq,
+    "!=": operator.ne,
+}
+
+# Default rule set from the README thresholds
+# "id" is stable (threshold overrides are keyed by it); "reason" is the text shown in
+# risk_reasons, filled in with the rule's current column, op and value
+# "column" may list alternatives; each student takes the first one that has a value
+DEFAULT_RULES = [
+    {"id": "attendance", "reason": "Attendance below {value}%", "column": ["daily_attendance_percent", "attendance_percent"],
+     "op": "<", "value": 75, "points": 3},
+    {"id": "fees", "reason": "Outstanding fees above {value}", "column": "total_fee_due", "op": ">", "value": 0, "points": 1},
+    {"id": "failed_attempts", "reason": "{value} or more failed attempts", "column": "failed_attempts", "op": ">=",
+     "value": 2, "points": 2},
+    {"id": "avg_score", "reason": "Average score below {value}", "column": "avg_score", "op": "<", "value": 40, "points": 2},
+]
+
+# Minimum score for each tier, lowest first
+DEFAULT_TIERS = [("Green", 0), ("Yellow", 2), ("Red", 4)]
+
+
+# Reason text for a rule at its current threshold, e.g. "Attendance below 60%"
+# Rules without a "reason" template read "<column> <op> <value>"
+def rule_reason(rule, column=None):
+    column = column or (rule["column"] if isinstance(rule["column"], str) else rule["column"][0])
+    value = f"{rule['value']:g}" if isinstance(rule["value"], (int, float)) else str(rule["value"])
+    return rule.get("reason", "{column} {op} {value}").format(column=column, op=rule["op"], value=value)
+
+
+# Numeric values of a rule column, or None when no candidate column is in the frame
+# With alternatives, candidates are coalesced row by row: after a merge a student may
+# only have a summary attendance_percent while others have daily_attendance_percent
+def numeric_column(df, column):
+    candidates = [c for c in ([column] if isinstance(column, str) else column) if c in df.columns]
+    if not candidates:
+        return None
+    values = pd.to_numeric(df[candidates[0]], errors="coerce")
+    for candidate in candidates[1:]:
+        values = values.fillna(pd.to_numeric(df[candidate], errors="coerce"))
+    return values
+
+
+# Score every student in one batch: each rule is a single column-wise comparison
+# Returns risk_score, risk_tier and risk_reasons (triggered rule reasons, "; " separated)
+def score_students(df, rules=DEFAULT_RULES, tiers=DEFAULT_TIERS):
+    n = len(df)
+    score = np.zeros(n, dtype=np.int64)
+    mask = np.zeros(n, dtype=np.int64)
+    active = []
+    for rule in rules:
+        values = numeric_column(df, rule["column"])
+        if values is None:
+            continue
+        values = values.to_numpy(dtype=float)
+        # Missing values never trigger a rule (NaN comparisons are False)
+        triggered = OPS[rule["op"]](values, rule["value"])
+        score += triggered * rule["points"]
+        mask |= triggered.astype(np.int64) << len(active)
+        active.append(rule_reason(rule))
+
+    # Reasons are looked up per bitmask, so no per-student Python runs
+    reason_lookup = np.array(
+        ["; ".join(name for bit, name in enumerate(active) if m >> bit & 1) for m in range(1 << len(active))],
+        dtype=object,
+    )
+    tier_names = np.array([name for name, _ in tiers], dtype=object)
+    tier_floors = np.array([floor for _, floor in tiers])
+    tier = tier_names[np.searchsorted(tier_floors, score, side="right") - 1]
+
+    return pd.DataFrame(
+        {"risk_score": score, "risk_tier": tier, "risk_reasons": reason_lookup[mask]},
+        index=df.index,
+    )
+
+
+# Copy of the default rules with thresholds overridden by rule id
+def rules_with_thresholds(thresholds, rules=DEFAULT_RULES):
+    return [dict(rule, value=thresholds.get(rule["id"], rule["value"])) for rule in rules]
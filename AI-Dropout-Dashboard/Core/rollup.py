@@ -0,0 +1,261 @@
+import numpy as np
+import pandas as pd
+
+from Core.attendance_store import UNPACK_CHUNK_ROWS
+from Core.risk import numeric_column
+from Core.student_join import normalize_student_keys
+
+GROUP_COLUMNS = ["course", "mentor"]
+UNASSIGNED = "Unassigned"
+
+# Students below this attendance percentage count towards pct_below_threshold
+ATTENDANCE_THRESHOLD = 75
+
+# Additive per-student measures; every group figure is a sum of these, so groups
+# can be rolled up (course, mentor -> course) and patched by subtract/add
+MEASURES = ["students", "attendance_sum", "attendance_count", "below_threshold", "fees_outstanding", "fees_due_students"]
+
+GROUP_METRICS = ["students", "avg_attendance", "pct_below_threshold", "fees_outstanding", "fees_due_students",
+                 "latest_daily_rate"]
+
+
+# Sum the rows of values per group id (ids in [0, n_groups)); rows with id -1 are skipped
+# Rows are sorted by group once and reduced with one reduceat, instead of np.add.at
+def group_sum(groups, values, n_groups):
+    result = np.zeros((n_groups,) + values.shape[1:], dtype=np.float64 if values.dtype.kind == "f" else np.int64)
+    keep = groups >= 0
+    groups, values = groups[keep], values[keep]
+    if len(groups) == 0:
+        return result
+    order = np.argsort(groups, kind="stable")
+    sorted_groups = groups[order]
+    starts = np.flatnonzero(np.r_[True, sorted_groups[1:] != sorted_groups[:-1]])
+    result[sorted_groups[starts]] = np.add.reduceat(values[order], starts, axis=0)
+    return result
+
+
+# Materialized aggregates per (course, mentor) and per (course, mentor, date)
+# refresh() diffs the new per-student measures, group assignment and daily attendance
+# against what is already in the cube and only subtracts/adds the students that changed,
+# so a new day or an edited student touches just the affected groups
+class RollupCube:
+    def __init__(self, threshold=ATTENDANCE_THRESHOLD):
+        self.threshold = threshold
+        self.keys = pd.Index([], dtype=np.int64, name="student_key")
+        self.group_labels = []
+        self.group_ids = {}
+        self.student_group = np.zeros(0, dtype=np.int64)
+        self.student_values = np.zeros((0, len(MEASURES)))
+        self.group_values = np.zeros((0, len(MEASURES)))
+        self.dates = []
+        self.present_bits = np.zeros((0, 0), dtype=np.uint8)
+        self.recorded_bits = np.zeros((0, 0), dtype=np.uint8)
+        self.daily_present = np.zeros((0, 0), dtype=np.int64)
+        self.daily_recorded = np.zeros((0, 0), dtype=np.int64)
+        self.last_refresh = {"students_changed": 0, "groups_changed": 0}
+
+    def _group_id(self, label):
+        if label not in self.group_ids:
+            self.group_ids[label] = len(self.group_labels)
+            self.group_labels.append(label)
+        return self.group_ids[label]
+
+    def _grow_groups(self):
+        extra = len(self.group_labels) - len(self.group_values)
+        if extra:
+            self.group_values = np.vstack([self.group_values, np.zeros((extra, len(MEASURES)))])
+            self.daily_present = np.vstack([self.daily_present, np.zeros((extra, len(self.dates)), dtype=np.int64)])
+            self.daily_recorded = np.vstack([self.daily_recorded, np.zeros((extra, len(self.dates)), dtype=np.int64)])
+
+    def _grow_students(self, keys):
+        new = keys.difference(self.keys)
+        if len(new) == 0:
+            return
+        n_bytes = self.present_bits.shape[1]
+        self.keys = self.keys.append(new).rename("student_key")
+        self.student_group = np.concatenate([self.student_group, np.full(len(new), -1, dtype=np.int64)])
+        self.student_values = np.vstack([self.student_values, np.zeros((len(new), len(MEASURES)))])
+        self.present_bits = np.vstack([self.present_bits, np.zeros((len(new), n_bytes), dtype=np.uint8)])
+        self.recorded_bits = np.vstack([self.recorded_bits, np.zeros((len(new), n_bytes), dtype=np.uint8)])
+
+    # Dates are kept sorted (ISO date labels, so text order is date order) and the last
+    # column is always the latest date, wherever a new date falls
+    def _grow_dates(self, dates):
+        known = set(self.dates)
+        new = [d for d in dates if d not in known]
+        if not new:
+            return
+        # Repacking is one vectorized pass; it only happens when dates are added
+        old_days = len(self.dates)
+        dates = sorted(self.dates + new)
+        position = {d: i for i, d in enumerate(dates)}
+        cols = [position[d] for d in self.dates]
+        for name in ("present_bits", "recorded_bits"):
+            cells = np.zeros((len(self.keys), len(dates)), dtype=np.uint8)
+            cells[:, cols] = np.unpackbits(getattr(self, name), axis=1, count=old_days)
+            setattr(self, name, np.packbits(cells, axis=1))
+        for name in ("daily_present", "daily_recorded"):
+            totals = np.zeros((len(self.group_labels), len(dates)), dtype=np.int64)
+            totals[:, cols] = getattr(self, name)
+            setattr(self, name, totals)
+        self.dates = dates
+
+    # Drop the dates not in keep; called after refresh, when their cells are all zero
+    def _drop_dates(self, keep):
+        keep = set(keep)
+        cols = [i for i, d in enumerate(self.dates) if d in keep]
+        if len(cols) == len(self.dates):
+            return
+        for name in ("present_bits", "recorded_bits"):
+            cells = np.unpackbits(getattr(self, name), axis=1, count=len(self.dates))[:, cols]
+            setattr(self, name, np.packbits(cells, axis=1))
+        self.daily_present = self.daily_present[:, cols]
+        self.daily_recorded = self.daily_recorded[:, cols]
+        self.dates = [self.dates[i] for i in cols]
+
+    # Per-student measures and group ids for the merged frame (see StudentJoin), in cube order
+    def _student_state(self, merged):
+        labels = pd.DataFrame(index=merged.index)
+        for column in GROUP_COLUMNS:
+            labels[column] = merged[column].astype(object).where(merged[column].notna(), UNASSIGNED) \
+                if column in merged.columns else UNASSIGNED
+        pairs, uniques = pd.factorize(pd.MultiIndex.from_frame(labels))
+        lookup = np.array([self._group_id(tuple(label)) for label in uniques], dtype=np.int64)
+        self._grow_groups()
+
+        attendance = numeric_column(merged, ["daily_attendance_percent", "attendance_percent"])
+        attendance = attendance.to_numpy(dtype=float) if attendance is not None else np.full(len(merged), np.nan)
+        fees = pd.to_numeric(merged["total_fee_due"], errors="coerce").fillna(0).to_numpy(dtype=float) \
+            if "total_fee_due" in merged.columns else np.zeros(len(merged))
+        values = np.column_stack([
+            np.ones(len(merged)),
+            np.nan_to_num(attendance),
+            ~np.isnan(attendance),
+            attendance < self.threshold,
+            fees,
+            fees > 0,
+        ]).astype(float)
+
+        rows = self.keys.get_indexer(merged.index)
+        groups = self.student_group.copy()
+        groups[rows] = lookup[pairs]
+        student_values = np.zeros_like(self.student_values)
+        student_values[rows] = values
+        return groups, student_values
+
+    # Packed present/recorded bits of the daily store aligned to cube students and dates
+    def _daily_state(self, store):
+        present = np.zeros_like(self.present_bits)
+        recorded = np.zeros_like(self.recorded_bits)
+        rows = self.keys.get_indexer(normalize_student_keys(store.ids))
+        known = np.flatnonzero(rows >= 0)
+        if list(store.dates) == self.dates[:store.n_days]:
+            # Same leading dates: the packed bytes line up and are copied as is
+            width = store.present_bits.shape[1]
+            present[rows[known], :width] = store.present_bits[known]
+            recorded[rows[known], :width] = store.present_bits[known] | store.absent_bits[known]
+            return present, recorded
+        cols = [self.dates.index(d) for d in store.dates]
+        for start in range(0, len(known), UNPACK_CHUNK_ROWS):
+            chunk = known[start:start + UNPACK_CHUNK_ROWS]
+            cells = np.zeros((len(chunk), len(self.dates)), dtype=bool)
+            cells[:, cols] = store.present_matrix(chunk)
+            present[rows[chunk]] = np.packbits(cells, axis=1)
+            cells[:, cols] |= store.absent_matrix(chunk)
+            recorded[rows[chunk]] = np.packbits(cells, axis=1)
+        return present, recorded
+
+    # Add the daily cells of bits[rows] to their groups (sign=-1 removes them)
+    # Only the byte columns listed are unpacked, i.e. the 8-day blocks that changed
+    def _apply_daily(self, rows, groups, present_bits, recorded_bits, byte_cols, sign):
+        if len(rows) == 0 or len(byte_cols) == 0:
+            return
+        days = np.flatnonzero(np.isin(np.arange(len(self.dates)) // 8, byte_cols))
+        n_groups = len(self.group_labels)
+        for start in range(0, len(rows), UNPACK_CHUNK_ROWS):
+            chunk = rows[start:start + UNPACK_CHUNK_ROWS]
+            for bits, totals in ((present_bits, self.daily_present), (recorded_bits, self.daily_recorded)):
+                cells = np.unpackbits(bits[np.ix_(chunk, byte_cols)], axis=1)[:, :len(days)].astype(np.int64)
+                totals[:, days] += sign * group_sum(groups[chunk], cells, n_groups)
+
+    # Bring the cube up to date with the merged per-student frame and the daily
+    # AttendanceStore; returns the number of students whose contribution changed
+    # Students who moved group are removed from the old group and added to the new one;
+    # everyone else only has their changed measures and changed 8-day blocks patched in
+    # Without a store (no daily sheet, or it was removed) every daily cell counts as
+    # unrecorded, so an earlier sheet's contribution is subtracted; dates that are no
+    # longer in the store are dropped
+    def refresh(self, merged, store=None):
+        self._grow_students(pd.Index(merged.index))
+        if store is not None:
+            self._grow_dates(list(store.dates))
+        groups, values = self._student_state(merged)
+        if store is not None:
+            present_bits, recorded_bits = self._daily_state(store)
+        else:
+            present_bits, recorded_bits = np.zeros_like(self.present_bits), np.zeros_like(self.recorded_bits)
+        old_groups, n_groups = self.student_group, len(self.group_labels)
+        all_bytes = np.arange(self.present_bits.shape[1])
+
+        moved = np.flatnonzero(groups != old_groups)
+        self.group_values -= group_sum(old_groups[moved], self.student_values[moved], n_groups)
+        self.group_values += group_sum(groups[moved], values[moved], n_groups)
+        self._apply_daily(moved, old_groups, self.present_bits, self.recorded_bits, all_bytes, -1)
+        self._apply_daily(moved, groups, present_bits, recorded_bits, all_bytes, 1)
+
+        stayed = groups == old_groups
+        value_rows = np.flatnonzero(stayed & (values != self.student_values).any(axis=1))
+        self.group_values += group_sum(groups[value_rows], values[value_rows] - self.student_values[value_rows], n_groups)
+        bit_changes = (present_bits != self.present_bits) | (recorded_bits != self.recorded_bits)
+        bit_rows = np.flatnonzero(stayed & bit_changes.any(axis=1))
+        byte_cols = np.flatnonzero(bit_changes[bit_rows].any(axis=0))
+        self._apply_daily(bit_rows, groups, self.present_bits, self.recorded_bits, byte_cols, -1)
+        self._apply_daily(bit_rows, groups, present_bits, recorded_bits, byte_cols, 1)
+
+        rows = np.union1d(moved, np.union1d(value_rows, bit_rows))
+        touched = np.unique(np.concatenate([groups[rows], old_groups[rows]]))
+        self.last_refresh = {"students_changed": len(rows), "groups_changed": int((touched >= 0).sum())}
+        self.student_group, self.student_values = groups, values
+        self.present_bits, self.recorded_bits = present_bits, recorded_bits
+        self._drop_dates(store.dates if store is not None else [])
+        return len(rows)
+
+    # Measures summed to the requested level: "course", "mentor" or both
+    def _rolled(self, level):
+        level = [level] if isinstance(level, str) else list(level)
+        index = pd.MultiIndex.from_tuples(self.group_labels, names=GROUP_COLUMNS) if self.group_labels \
+            else pd.MultiIndex.from_arrays([[], []], names=GROUP_COLUMNS)
+        sums = pd.DataFrame(self.group_values, index=index, columns=MEASURES)
+        present = pd.DataFrame(self.daily_present, index=index, columns=self.dates)
+        recorded = pd.DataFrame(self.daily_recorded, index=index, columns=self.dates)
+        return sums.groupby(level=level).sum(), present.groupby(level=level).sum(), recorded.groupby(level=level).sum()
+
+    # Group metrics at a level, only groups with students
+    def groups(self, level=("course", "mentor")):
+        sums, present, recorded = self._rolled(level)
+        result = pd.DataFrame(index=sums.index)
+        result["students"] = sums["students"].astype(int)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            result["avg_attendance"] = sums["attendance_sum"] / sums["attendance_count"]
+            result["pct_below_threshold"] = sums["below_threshold"] / sums["attendance_count"] * 100
+            result["fees_outstanding"] = sums["fees_outstanding"]
+            result["fees_due_students"] = sums["fees_due_students"].astype(int)
+            result["latest_daily_rate"] = (present.iloc[:, -1] / recorded.iloc[:, -1] * 100) if self.dates else np.nan
+        return result[result["students"] > 0]
+
+    # Mentors within one course
+    def drill_down(self, course):
+        groups = self.groups(("course", "mentor"))
+        return groups.xs(course, level="course") if course in groups.index.get_level_values("course") else groups.iloc[0:0]
+
+    def top_n(self, metric, n=10, level="mentor", ascending=False):
+        return self.groups(level).sort_values(metric, ascending=ascending).head(n)
+
+    # Present share per date, optionally for one course and/or mentor
+    def daily_trend(self, course=None, mentor=None):
+        mask = np.array([(course is None or c == course) and (mentor is None or m == mentor) for c, m in self.group_labels],
+                        dtype=bool)
+        present = self.daily_present[mask].sum(axis=0)
+        recorded = self.daily_recorded[mask].sum(axis=0)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return pd.Series(present / recorded * 100, index=self.dates, name="daily_rate")
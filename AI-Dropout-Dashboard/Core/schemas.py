@@ -0,0 +1,245 @@
+import io
+
+import numpy as np
+import pandas as pd
+
+from Core.attendance_matrix import ATTENDANCE_CODES
+from Core.attendance_store import AttendanceStore
+from Core.features import ASSESSMENT_PATTERN
+from Core.parse_cache import content_hash
+from Core.student_join import INVALID_KEY, KEY_COLUMNS, NAME_COLUMNS, find_column, normalize_student_keys
+
+# Attendance cells are stored as one-byte codes of these two values; "Present", "Y",
+# 1 and the other ATTENDANCE_CODES spellings are folded into them, missing cells stay NaN
+ATTENDANCE_DTYPE = pd.CategoricalDtype(["P", "A"])
+
+# Column types:
+#   "category"   repeated labels, stored as categorical codes
+#   "number"     numeric; integer columns are downcast to the smallest integer type
+#   "date"       parsed to datetime64 (ISO 8601, e.g. 2025-08-20)
+#   "attendance" P/A style codes (any ATTENDANCE_CODES spelling), stored as ATTENDANCE_DTYPE
+# Column names match case-insensitively; undeclared columns are read as they are
+# Every upload needs a student ID column (any of KEY_COLUMNS)
+SCHEMAS = {
+    "Attendance": {
+        "columns": {"course": "category", "mentor": "category", "attendance_percent": "number"},
+        # Wide daily sheets carry one attendance column per date (YYYY-MM-DD headers)
+        "date_columns": "attendance",
+        # Either a summary percentage or at least one date column
+        "required_any": ["attendance_percent"],
+    },
+    "Assignments": {
+        "columns": {"course": "category", "subject": "category", "assignment": "category", "status": "category",
+                    "score": "number", "marks": "number", "max_marks": "number",
+                    "due_date": "date", "submission_date": "date"},
+    },
+    "Fee Payment": {
+        "columns": {"total_fee_due": "number", "amount_paid": "number", "status": "category",
+                    "last_payment_date": "date"},
+    },
+    "Test Marks": {
+        "columns": {"course": "category", "subject": "category", "failed_attempts": "number", "avg_score": "number",
+                    "marks": "number", "score": "number"},
+        "patterns": [(ASSESSMENT_PATTERN, "number")],
+    },
+}
+
+# Bad rows listed in the rejection message (the full list is on SchemaError.issues)
+MAX_REPORTED_ISSUES = 10
+
+ISSUE_COLUMNS = ["row", "column", "value", "problem"]
+
+
+# A file that does not match its schema; issues has one row per bad cell
+class SchemaError(ValueError):
+    def __init__(self, data_type, issues):
+        self.data_type = data_type
+        self.issues = issues
+        shown = issues.head(MAX_REPORTED_ISSUES)
+        lines = [f"row {int(row)}, {column}: {problem} ({value!r})" if pd.notna(row) else f"{column}: {problem}"
+                 for row, column, value, problem in shown.itertuples(index=False)]
+        more = f"; and {len(issues) - len(shown)} more" if len(issues) > len(shown) else ""
+        super().__init__(f"{data_type} file rejected, {len(issues)} problem(s): " + "; ".join(lines) + more)
+
+
+# ISO date ("2025-08-20") of every date header, NaN for other columns
+# Excel sheets give datetime headers, which read back as Timestamps or, once saved as
+# text again, as "2025-08-20 00:00:00"; both count as dates when they fall on midnight
+def date_labels(columns):
+    text = pd.Index([str(c).strip() for c in columns], dtype=object)
+    stamps = pd.Series(pd.to_datetime(text, errors="coerce", format="%Y-%m-%d"))
+    stamps = stamps.fillna(pd.Series(pd.to_datetime(text, errors="coerce", format="%Y-%m-%d %H:%M:%S")))
+    dated = stamps.notna() & (stamps == stamps.dt.normalize())
+    return pd.Index(stamps.dt.strftime("%Y-%m-%d").where(dated), dtype=object)
+
+
+def _is_date_label(columns):
+    return date_labels(columns).notna()
+
+
+# Column names with date headers spelled as ISO dates, so every later step sees
+# "2025-08-20" however the sheet stored the date
+def normalize_column_names(columns):
+    labels = date_labels(columns)
+    return [column if pd.isna(label) else label for column, label in zip(columns, labels)]
+
+
+# Declared type of every column of an upload, from its header alone
+def column_types(columns, data_type):
+    schema = SCHEMAS[data_type]
+    declared = {name.lower(): kind for name, kind in schema["columns"].items()}
+    key_col = find_column(pd.DataFrame(columns=columns), KEY_COLUMNS)
+    name_col = find_column(pd.DataFrame(columns=columns), NAME_COLUMNS)
+    dated = _is_date_label(columns) if "date_columns" in schema else np.zeros(len(columns), dtype=bool)
+    types = {}
+    for column, is_date in zip(columns, dated):
+        if column in (key_col, name_col):
+            continue
+        if str(column).lower() in declared:
+            types[column] = declared[str(column).lower()]
+        elif is_date:
+            types[column] = schema["date_columns"]
+        else:
+            for pattern, kind in schema.get("patterns", []):
+                if pattern.match(str(column)):
+                    types[column] = kind
+                    break
+    return types
+
+
+# Date columns of an attendance upload, in file order
+def attendance_date_columns(df):
+    return [column for column, label in zip(df.columns, date_labels(df.columns)) if pd.notna(label)]
+
+
+# True when an upload has daily attendance (date) columns; summary sheets such as
+# CSV/attendance.csv (attendance_percent, course, mentor) have none. Unlike
+# student_join.is_daily_attendance, other columns may sit next to the dates
+def is_daily_attendance(df):
+    return bool(attendance_date_columns(df))
+
+
+# The date columns of an attendance upload packed for the rollups, or None when it has
+# no student ID or no date columns
+def upload_attendance_store(df):
+    key_col = find_column(df, KEY_COLUMNS)
+    date_cols = attendance_date_columns(df)
+    if key_col is None or not date_cols:
+        return None
+    name_col = find_column(df, NAME_COLUMNS)
+    info_cols = [c for c in (key_col, name_col) if c is not None]
+    return AttendanceStore.from_frame(df[info_cols + date_cols], id_col=key_col, name_col=name_col)
+
+
+# read_csv dtypes for the declared columns; label columns are categorized by the parser,
+# attendance cells are read as plain objects (much faster than an open-ended categorical
+# there) and coded afterwards, numbers are left to the parser's own typed inference
+def csv_dtypes(types):
+    dtypes = {"category": "category", "attendance": object}
+    return {column: dtypes[kind] for column, kind in types.items() if kind in dtypes}
+
+
+def _issues(rows, column, values, problem):
+    return pd.DataFrame({
+        # Spreadsheet row numbers: the header is row 1
+        "row": rows + 2,
+        "column": column,
+        "value": np.asarray(values, dtype=object),
+        "problem": problem,
+    }, columns=ISSUE_COLUMNS)
+
+
+# Attendance columns are factorized one at a time; only their few distinct spellings go
+# through ATTENDANCE_CODES, and the codes are then remapped to P/A in one take
+# Returns the ATTENDANCE_DTYPE columns and the rows, column positions and values of unknown codes
+def _convert_attendance(block):
+    converted = {}
+    bad_rows, bad_cols, bad_values = [], [], []
+    for j, column in enumerate(block.columns):
+        codes, uniques = pd.factorize(block[column].to_numpy(dtype=object))
+        canonical = [ATTENDANCE_CODES.get(str(u).strip().upper()) for u in uniques]
+        lookup = np.array([-1 if code is None else 1 - code for code in canonical] + [-1], dtype=np.int8)
+        converted[column] = pd.Categorical.from_codes(lookup[codes], dtype=ATTENDANCE_DTYPE)
+        unknown = [i for i, code in enumerate(canonical) if code is None]
+        if unknown:
+            rows = np.flatnonzero(np.isin(codes, unknown))
+            bad_rows.append(rows)
+            bad_cols.append(np.full(len(rows), j))
+            bad_values.append(uniques[codes[rows]])
+    if not bad_rows:
+        return converted, np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64), np.zeros(0, dtype=object)
+    return converted, np.concatenate(bad_rows), np.concatenate(bad_cols), np.concatenate(bad_values)
+
+
+def _convert(values, kind):
+    if kind == "category":
+        return values.astype("category"), np.zeros(0, dtype=np.int64)
+    if kind == "number":
+        converted = values if pd.api.types.is_numeric_dtype(values) else pd.to_numeric(values, errors="coerce")
+        if pd.api.types.is_integer_dtype(converted):
+            converted = pd.to_numeric(converted, downcast="integer")
+    else:
+        converted = pd.to_datetime(values, errors="coerce", format="ISO8601")
+    return converted, np.flatnonzero(converted.isna().to_numpy() & values.notna().to_numpy())
+
+
+# Convert a parsed upload to its declared types and check it, column by column
+# Every check is one vectorized pass; all bad cells are collected before the file is
+# rejected, so the whole list of problems can be fixed in one go
+def apply_schema(df, data_type):
+    df = df.set_axis(normalize_column_names(list(df.columns)), axis=1)
+    problems = []
+    key_col = find_column(df, KEY_COLUMNS)
+    if key_col is None:
+        problems.append(pd.DataFrame([(None, "student ID", None, f"missing, expected one of {KEY_COLUMNS}")],
+                                     columns=ISSUE_COLUMNS))
+    else:
+        keys = normalize_student_keys(df[key_col])
+        bad = np.flatnonzero(keys == INVALID_KEY)
+        problems.append(_issues(bad, key_col, df[key_col].to_numpy()[bad], "not a student ID"))
+
+    types = column_types(list(df.columns), data_type)
+    schema = SCHEMAS[data_type]
+    required = schema.get("required_any")
+    if required and not any(str(c).lower() in required for c in types) \
+            and schema.get("date_columns") not in types.values():
+        expected = required + (["date columns"] if "date_columns" in schema else [])
+        problems.append(pd.DataFrame([(None, " or ".join(expected), None, "missing")], columns=ISSUE_COLUMNS))
+
+    converted = {}
+    for column, kind in types.items():
+        if kind == "attendance":
+            continue
+        converted[column], bad = _convert(df[column], kind)
+        if len(bad):
+            problems.append(_issues(bad, column, df[column].to_numpy(dtype=object)[bad], f"not a valid {kind}"))
+    attendance = df[[c for c, kind in types.items() if kind == "attendance"]]
+    if attendance.shape[1]:
+        codes, bad_rows, bad_cols, bad_values = _convert_attendance(attendance)
+        converted.update(codes)
+        order = np.lexsort((bad_cols, bad_rows))
+        problems.append(_issues(bad_rows[order], attendance.columns[bad_cols[order]], bad_values[order],
+                                "not a valid attendance code"))
+
+    issues = pd.concat(problems, ignore_index=True)
+    if len(issues):
+        raise SchemaError(data_type, issues)
+    return pd.DataFrame({c: converted[c] if c in converted else df[c] for c in df.columns}, index=df.index)
+
+
+# Parse/shared-store key of an upload; the data type is part of it, since it decides
+# the schema the file is read with
+def upload_key(data, data_type, extension):
+    return f"{content_hash(data)}-{data_type.lower().replace(' ', '_')}{extension}"
+
+
+# Parse an uploaded CSV/Excel file with its schema's dtypes and validate it
+# CSV headers are read first so categorical columns are built by the parser itself
+def read_upload(data, extension, data_type):
+    if extension == ".csv":
+        columns = normalize_column_names(list(pd.read_csv(io.BytesIO(data), nrows=0).columns))
+        df = pd.read_csv(io.BytesIO(data), header=0, names=columns,
+                         dtype=csv_dtypes(column_types(columns, data_type)))
+    else:
+        df = pd.read_excel(io.BytesIO(data))
+    return apply_schema(df, data_type)
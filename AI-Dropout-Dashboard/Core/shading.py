@@ -0,0 +1,37 @@
+import numpy as np
+import pandas as pd
+
+# Number of days (including the current one) counted by the absence shading
+SHADE_WINDOW = 3
+
+
+# Decode a wide block of P/A cells into a boolean absence matrix
+# Missing cells count as present, same as the heatmap's fillna(1)
+def absence_matrix(values):
+    values = np.asarray(values, dtype=object)
+    present = (values == "P") | pd.isna(values)
+    return ~present
+
+
+# Compute the 0-3 shade level for every student/date cell in one pass
+# levels[k] holds the level when the window is truncated to k+1 days, so
+# the first visible dates can be shaded exactly like the old per-window loop
+def shade_levels(absent):
+    absent = np.asarray(absent, dtype=np.uint8)
+    levels = np.empty((SHADE_WINDOW,) + absent.shape, dtype=np.uint8)
+    levels[0] = absent
+    for k in range(1, SHADE_WINDOW):
+        levels[k] = levels[k - 1]
+        levels[k][:, k:] += absent[:, :-k]
+    # Present days are always green (level 0)
+    levels *= absent
+    return levels
+
+
+# Slice the visible window out of the precomputed levels
+# rows are positional student indexes, dates run from start to stop (exclusive)
+def shade_window(levels, rows, start, stop):
+    window = levels[-1][rows, start:stop].copy()
+    for k in range(min(SHADE_WINDOW - 1, stop - start)):
+        window[:, k] = levels[k][rows, start + k]
+    return window
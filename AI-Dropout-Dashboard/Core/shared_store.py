@@ -0,0 +1,226 @@
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+# The user's cache directory ($XDG_CACHE_HOME or ~/.cache)
+USER_CACHE_DIR = os.environ.get("XDG_CACHE_HOME", os.path.join(os.path.expanduser("~"), ".cache"))
+
+# Directory holding one memory-mapped copy of every distinct uploaded dataset
+# Defaults to the user's own cache directory; it is created private (0700) and must be
+# owned by the user running the dashboard
+SHARED_DATA_DIR = os.environ.get("SHARED_DATA_DIR", os.path.join(USER_CACHE_DIR, "dashboard_shared_data"))
+
+# Datasets no session holds any more are kept on disk (most recent first) up to
+# this many, so a roster that is re-opened later maps again without parsing
+MAX_UNUSED_DATASETS = 8
+
+META_FILE = "meta.json"
+
+
+# Create a directory only this user can use; refuse one owned by someone else, since
+# whoever controls it can read or replace the student data written there
+# setting names the environment variable that chose the path, for the error message
+def private_dir(path, setting="SHARED_DATA_DIR"):
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    info = os.stat(path)
+    if hasattr(os, "getuid"):
+        if info.st_uid != os.getuid():
+            raise PermissionError(f"{path} is owned by another user; set {setting} to a private directory")
+        if info.st_mode & 0o077:
+            os.chmod(path, 0o700)
+
+
+# Metadata is plain JSON: column names, category values and attrs are strings, numbers,
+# booleans or tagged timestamps, so reading it never executes anything
+def _to_json(value):
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, pd.Timestamp):
+        return {"timestamp": value.isoformat()}
+    if isinstance(value, pd.Timedelta):
+        return {"timedelta": value.isoformat()}
+    if value is None or isinstance(value, (str, bool, int, float)):
+        return value
+    return str(value)
+
+
+def _from_json(value):
+    if isinstance(value, dict):
+        if "timestamp" in value:
+            return pd.Timestamp(value["timestamp"])
+        return pd.Timedelta(value["timedelta"])
+    return value
+
+
+def _smallest_code_dtype(n_categories):
+    for dtype in (np.int8, np.int16, np.int32):
+        if n_categories < np.iinfo(dtype).max:
+            return dtype
+    return np.int64
+
+
+# Write a frame as one .npy file per column plus a small JSON metadata file
+# Numeric, boolean and datetime columns are saved as is; every other column is
+# saved as categorical codes with its (usually tiny) list of distinct values,
+# so P/A attendance cells take one byte each and can be mapped without copying
+def write_frame(df, path):
+    columns = []
+    for i, column in enumerate(df.columns):
+        values = df[column]
+        if isinstance(values.dtype, np.dtype) and values.dtype.kind in "biufcmM":
+            np.save(os.path.join(path, f"{i}.npy"), values.to_numpy())
+            columns.append((column, None))
+        else:
+            try:
+                codes, categories = pd.factorize(values, sort=True)
+            except TypeError:
+                # Mixed types that cannot be ordered keep first-seen order
+                codes, categories = pd.factorize(values)
+            np.save(os.path.join(path, f"{i}.npy"), codes.astype(_smallest_code_dtype(len(categories))))
+            columns.append((column, categories))
+    meta = {
+        "columns": [{"name": _to_json(column),
+                     "categories": None if categories is None else [_to_json(c) for c in categories]}
+                    for column, categories in columns],
+        "attrs": {str(k): _to_json(v) for k, v in df.attrs.items()},
+    }
+    with open(os.path.join(path, META_FILE), "w") as f:
+        json.dump(meta, f)
+
+
+# Map a frame written by write_frame; column data stays in the OS page cache and is
+# shared by every process and session that maps the same files
+def map_frame(path):
+    with open(os.path.join(path, META_FILE)) as f:
+        meta = json.load(f)
+    data = {}
+    for i, column in enumerate(meta["columns"]):
+        values = np.load(os.path.join(path, f"{i}.npy"), mmap_mode="r", allow_pickle=False)
+        if column["categories"] is not None:
+            categories = pd.Index([_from_json(c) for c in column["categories"]], dtype=object).infer_objects()
+            values = pd.Categorical.from_codes(values, categories)
+        data[i] = values
+    df = pd.DataFrame(data, copy=False)
+    df.columns = pd.Index([_from_json(column["name"]) for column in meta["columns"]])
+    df.attrs.update({k: _from_json(v) for k, v in meta["attrs"].items()})
+    return df
+
+
+def _directory_bytes(path):
+    return sum(entry.stat().st_size for entry in os.scandir(path) if entry.is_file())
+
+
+# Every session and the warm-up of a server process share one store per root: holder
+# counts are per instance, and the startup cleanup (removing half-written and unknown
+# directories, evicting unused datasets) must never run under another instance's feet
+_process_stores = {}
+_process_stores_lock = threading.Lock()
+
+
+def get_process_store(root=SHARED_DATA_DIR):
+    with _process_stores_lock:
+        if root not in _process_stores:
+            _process_stores[root] = SharedFrameStore(root)
+        return _process_stores[root]
+
+
+# Read-only datasets shared by every dashboard session, keyed by content hash
+# Each distinct dataset is written to disk once and mapped once per server process;
+# sessions take a reference with acquire() and drop it with release(). A dataset
+# nobody references is unmapped, and its files are deleted once more than
+# max_unused such datasets pile up
+# Use get_process_store rather than a new instance for the default root
+class SharedFrameStore:
+    def __init__(self, root=SHARED_DATA_DIR, max_unused=MAX_UNUSED_DATASETS):
+        self.root = root
+        self.max_unused = max_unused
+        self.frames = {}
+        self.holders = {}
+        self.unused = OrderedDict()
+        self.lock = threading.Lock()
+        private_dir(root)
+        # Datasets left by an earlier server process start out unused, oldest first;
+        # half-written ones from a crashed writer (and any without metadata) are removed
+        for entry in sorted(os.scandir(root), key=lambda e: e.stat().st_mtime):
+            if ".partial-" in entry.name or (entry.is_dir() and not os.path.exists(os.path.join(entry.path, META_FILE))):
+                shutil.rmtree(entry.path, ignore_errors=True)
+            elif entry.is_dir():
+                self.unused[entry.name] = entry.stat().st_mtime
+        self._evict()
+
+    def _path(self, key):
+        return os.path.join(self.root, key)
+
+    def contains(self, key):
+        return key in self.frames or os.path.exists(os.path.join(self._path(key), META_FILE))
+
+    # Write a dataset once; a concurrent writer of the same key simply loses the rename
+    def put(self, key, df):
+        if self.contains(key):
+            return
+        partial = tempfile.mkdtemp(prefix=f"{key}.partial-", dir=self.root)
+        try:
+            write_frame(df, partial)
+            os.rename(partial, self._path(key))
+        except OSError:
+            if not self.contains(key):
+                raise
+        finally:
+            shutil.rmtree(partial, ignore_errors=True)
+        with self.lock:
+            self.unused[key] = time.time()
+            self._evict()
+
+    # Mapped frame for a holder (e.g. a session ID), or None if the dataset was never stored
+    def acquire(self, key, holder):
+        with self.lock:
+            if key not in self.frames:
+                if not os.path.exists(os.path.join(self._path(key), META_FILE)):
+                    return None
+                self.frames[key] = map_frame(self._path(key))
+            self.holders.setdefault(key, set()).add(holder)
+            self.unused.pop(key, None)
+            return self.frames[key]
+
+    def release(self, key, holder):
+        with self.lock:
+            holders = self.holders.get(key)
+            if holders is None:
+                return
+            holders.discard(holder)
+            if not holders:
+                # Unmapped once the last session drops its reference to the frame
+                del self.holders[key]
+                self.frames.pop(key, None)
+                self.unused[key] = time.time()
+                self._evict()
+
+    # Drop the references of holders that are gone (e.g. closed browser sessions)
+    def prune(self, is_alive):
+        with self.lock:
+            held = [(key, holder) for key, holders in self.holders.items() for holder in holders]
+        for key, holder in held:
+            if not is_alive(holder):
+                self.release(key, holder)
+
+    def _evict(self):
+        while len(self.unused) > self.max_unused:
+            key, _ = self.unused.popitem(last=False)
+            shutil.rmtree(self._path(key), ignore_errors=True)
+
+    # Mapped datasets, their holder counts and on-disk size, for the debug panel
+    def stats(self):
+        with self.lock:
+            keys = list(self.frames) + list(self.unused)
+            return pd.DataFrame(
+                [(key, len(self.holders.get(key, ())), key in self.frames,
+                  _directory_bytes(self._path(key)) if os.path.isdir(self._path(key)) else 0) for key in keys],
+                columns=["dataset", "sessions", "mapped", "bytes"],
+            )
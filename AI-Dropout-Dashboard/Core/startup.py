@@ -0,0 +1,107 @@
+import importlib
+import os
+import threading
+import time
+
+from Core.instrumentation import Profiler, debug_requested
+
+# Wall-clock start of this server process; Server/serve.py sets DASHBOARD_PROCESS_START
+# when it launches Streamlit, otherwise the first import of this module stands in for it
+PROCESS_STARTED = float(os.environ.get("DASHBOARD_PROCESS_START", time.time()))
+
+# Plotting and model libraries that take seconds to import; the apps only reference
+# them through lazy_import, so they are loaded when a chart or model is first used
+HEAVY_MODULES = ["matplotlib.figure", "seaborn", "sklearn.ensemble", "joblib"]
+
+# Sample files preloaded by warm_up, relative to the dashboard root, with their upload type
+DASHBOARD_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_DATASETS = [
+    ("CSV/attendance_daily.csv", "Attendance"),
+    ("CSV/attendance.csv", "Attendance"),
+    ("CSV/fees.csv", "Fee Payment"),
+    ("CSV/scores.csv", "Test Marks"),
+]
+
+# Set DASHBOARD_WARMUP=1 to warm up in the background after the first page is painted
+WARMUP_ENV = "DASHBOARD_WARMUP"
+
+_painted_apps = set()
+_warm_up_lock = threading.Lock()
+_warm_up_started = False
+
+
+# Module proxy that imports on first attribute access (import locks make this thread safe)
+class LazyModule:
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def __getattr__(self, attr):
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return getattr(self._module, attr)
+
+
+def lazy_import(name):
+    return LazyModule(name)
+
+
+# Shared start of every dashboard script: page config, profiler and debug flag
+def setup_page(app, **page_config):
+    import streamlit as st
+
+    if page_config:
+        st.set_page_config(**page_config)
+    debug_panel = debug_requested()
+    return Profiler(app, trace_memory=debug_panel), debug_panel
+
+
+# Call once the first visible element has been sent: records the time from script start
+# and, on the first run of the app in this process, from server start (cold start)
+# With DASHBOARD_WARMUP=1 the warm-up then starts on a background thread, loading the
+# sample datasets into store (the app's shared store; the process's one by default)
+def mark_first_paint(profiler, store=None):
+    profiler.first_paint_seconds = time.perf_counter() - profiler.start
+    if profiler.app not in _painted_apps:
+        _painted_apps.add(profiler.app)
+        profiler.cold_start_seconds = time.time() - PROCESS_STARTED
+    if os.environ.get(WARMUP_ENV) == "1":
+        warm_up_in_background(store)
+
+
+# Import the heavy modules and put the sample datasets in the shared store, so neither a
+# first chart nor an upload of a sample file has to wait for them; returns seconds per step
+# store defaults to the process's shared store, the same one the app's sessions use
+def warm_up(modules=HEAVY_MODULES, datasets=DEFAULT_DATASETS, store=None):
+    from Core.schemas import read_upload, upload_key
+    from Core.shared_store import get_process_store
+
+    timings = {}
+    for name in modules:
+        start = time.perf_counter()
+        importlib.import_module(name)
+        timings[f"import {name}"] = time.perf_counter() - start
+
+    store = store or get_process_store()
+    for path, data_type in datasets:
+        full_path = os.path.join(DASHBOARD_ROOT, path)
+        if not os.path.exists(full_path):
+            continue
+        start = time.perf_counter()
+        with open(full_path, "rb") as f:
+            data = f.read()
+        extension = os.path.splitext(path)[1].lower()
+        key = upload_key(data, data_type, extension)
+        if not store.contains(key):
+            store.put(key, read_upload(data, extension, data_type))
+        timings[f"load {path}"] = time.perf_counter() - start
+    return timings
+
+
+def warm_up_in_background(store=None):
+    global _warm_up_started
+    with _warm_up_lock:
+        if _warm_up_started:
+            return
+        _warm_up_started = True
+    threading.Thread(target=warm_up, kwargs={"store": store}, name="dashboard-warm-up", daemon=True).start()
@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd
+
+from Core.attendance_store import AttendanceStore
+
+# Rows read from attendance_daily.csv per chunk
+CHUNK_ROWS = 100_000
+
+
+# Running totals over a stream of attendance chunks
+# Only per-date counters are kept, so memory stays flat as rows are added
+class AttendanceTotals:
+    def __init__(self):
+        self.dates = None
+        self.n_students = 0
+        self.daily_present = None
+        self.total_present = 0
+        self.total_absent = 0
+
+    def add(self, store):
+        if self.dates is None:
+            self.dates = store.dates
+            self.daily_present = np.zeros(store.n_days, dtype=np.int64)
+        self.n_students += store.n_students
+        self.daily_present += store.daily_present_counts()
+        self.total_present += int(store.present_counts().sum())
+        self.total_absent += int(store.absent_counts().sum())
+
+    # Share of students present on each date, same as the non-streaming daily_average
+    def daily_average(self):
+        return pd.Series(self.daily_present / self.n_students, index=self.dates)
+
+
+# Read attendance_daily.csv in row chunks and yield one packed store per chunk
+def iter_attendance_chunks(path, chunksize=CHUNK_ROWS, id_col="ID", name_col="Name"):
+    for chunk in pd.read_csv(path, chunksize=chunksize):
+        yield AttendanceStore.from_frame(chunk, id_col=id_col, name_col=name_col)
+
+
+# Write attendance_percent.csv chunk by chunk without loading the whole input
+# The output is identical to the non-streaming result; returns the running totals
+def stream_attendance_percent(in_path, out_path, chunksize=CHUNK_ROWS, id_col="ID", name_col="Name"):
+    totals = AttendanceTotals()
+    for i, store in enumerate(iter_attendance_chunks(in_path, chunksize, id_col, name_col)):
+        store.percent_frame(id_col, name_col).to_csv(
+            out_path, mode="w" if i == 0 else "a", header=i == 0, index=False
+        )
+        totals.add(store)
+    return totals
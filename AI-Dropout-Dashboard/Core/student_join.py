@@ -0,0 +1,154 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from Core.attendance_store import AttendanceStore
+from Core.features import RollingFeatures, assessment_columns, score_slope
+
+# Columns that identify a student, in order of preference
+KEY_COLUMNS = ['student_id', 'ID', 'id', 'roll_no', 'student']
+NAME_COLUMNS = ['name', 'Name', 'student_name']
+
+ID_PREFIX_CHARS = "ABCDEFGHIJKLMNOPQRSTUVWXYZ_-"
+
+# Key for an ID that could not be parsed; such rows are reported, never joined
+INVALID_KEY = -1
+
+
+# "S=1000,T=5000" -> {"S": 1000, "T": 5000}
+def parse_prefix_offsets(text):
+    offsets = {}
+    for item in filter(None, (part.strip() for part in text.split(","))):
+        prefix, _, offset = item.partition("=")
+        offsets[prefix.strip().upper()] = int(offset)
+    return offsets
+
+
+# How prefixed IDs map onto plain numeric IDs, e.g. STUDENT_ID_PREFIX_OFFSETS="S=1000"
+# when a roster's S1001 is the daily sheet's student 1. By default prefixes are only
+# stripped (S1001 -> 1001); offsets are never guessed, since they differ per school
+ID_PREFIX_OFFSETS = parse_prefix_offsets(os.environ.get("STUDENT_ID_PREFIX_OFFSETS", ""))
+
+
+# Canonical integer key for every student ID in a column
+# Plain integers are used as is; prefixed IDs like "S1001" drop the prefix and, if one is
+# configured for that prefix, its offset. Anything else (blank, "12.5", "XX", or a key
+# that would come out negative) becomes INVALID_KEY
+def normalize_student_keys(values, prefix_offsets=None):
+    prefix_offsets = ID_PREFIX_OFFSETS if prefix_offsets is None else prefix_offsets
+    values = pd.Series(values)
+    if pd.api.types.is_integer_dtype(values):
+        keys = values.to_numpy(dtype=np.int64)
+        return np.where(keys < 0, INVALID_KEY, keys)
+    text = values.astype(str).str.strip().str.upper()
+    number = text.str.lstrip(ID_PREFIX_CHARS)
+    keys = pd.to_numeric(number.where(number.str.fullmatch(r"\d+", na=False)), errors="coerce")
+    if prefix_offsets:
+        prefix = text.str.extract(r"^([A-Z_\-]*)", expand=False)
+        keys = keys - prefix.map(prefix_offsets).fillna(0)
+    keys = keys.astype("Int64").to_numpy(dtype=np.int64, na_value=INVALID_KEY)
+    return np.where(keys < 0, INVALID_KEY, keys)
+
+
+def find_column(df, candidates):
+    lowered = {str(c).lower(): c for c in df.columns}
+    for candidate in candidates:
+        if candidate.lower() in lowered:
+            return lowered[candidate.lower()]
+    return None
+
+
+# A wide daily attendance sheet: a key column, an optional name and only date columns
+def is_daily_attendance(df, key_col, name_col):
+    rest = [c for c in df.columns if c not in (key_col, name_col)]
+    return bool(rest) and pd.to_datetime(pd.Index(rest, dtype=object), errors="coerce", format="%Y-%m-%d").notna().all()
+
+
+# Reduce one uploaded source to one row per student, indexed by canonical key
+# Returns the frame and the raw IDs of rows that were left out because they could not be parsed
+def per_student_frame(df):
+    key_col = find_column(df, KEY_COLUMNS)
+    if key_col is None:
+        raise ValueError("No student ID column found")
+    name_col = find_column(df, NAME_COLUMNS)
+
+    if is_daily_attendance(df, key_col, name_col):
+        store = AttendanceStore.from_frame(df, id_col=key_col, name_col=name_col)
+        frame = pd.DataFrame({
+            "days_present": store.present_counts(),
+            "days_absent": store.absent_counts(),
+            "days_recorded": store.n_days,
+            "daily_attendance_percent": store.attendance_percent(),
+        })
+        # Rolling rates, velocity and absence streaks as of the latest date
+        rolling = RollingFeatures.from_store(store).frame()
+        frame = pd.concat([frame, rolling.drop(columns=["ID"])], axis=1)
+        if store.names is not None:
+            frame.insert(0, "name", store.names)
+    else:
+        frame = df.drop(columns=[key_col]).rename(columns={name_col: "name"} if name_col else {})
+        frame = frame.reset_index(drop=True)
+        # Grade trend across assessment_1..n
+        if len(assessment_columns(frame)) >= 2:
+            frame["score_slope"] = score_slope(frame)
+
+    keys = normalize_student_keys(df[key_col])
+    frame.index = pd.Index(keys, name="student_key")
+    # Rows whose ID cannot be parsed are left out and returned for reporting, rather than
+    # all being merged into one made-up student
+    invalid = keys == INVALID_KEY
+    unparsed = df[key_col].to_numpy()[invalid].tolist()
+    frame = frame[~invalid]
+    # Later rows win when a student appears more than once
+    return frame[~frame.index.duplicated(keep="last")], unparsed
+
+
+# Joins attendance, fees, scores (and any other per-student source) into one frame
+# The student index is a hashed pd.Index built once; refreshing one source only
+# re-reads that source and reindexes its columns into the merged frame
+class StudentJoin:
+    def __init__(self):
+        self.index = pd.Index([], dtype=np.int64, name="student_key")
+        self.merged = pd.DataFrame(index=self.index)
+        self.versions = {}
+        self.columns = {}
+        # Raw IDs per source that could not be parsed and were not joined
+        self.unparsed = {}
+
+    # Merged column names for a source; clashes with other sources get a source prefix
+    def _column_names(self, source, frame):
+        taken = {c for other, cols in self.columns.items() if other != source for c in cols.values()}
+        return {c: (f"{source}_{c}" if c in taken else c) for c in frame.columns}
+
+    # Add or replace one source; a no-op when the version (e.g. content hash) is unchanged
+    def update_source(self, source, df, version=None):
+        if version is not None and self.versions.get(source) == version:
+            return False
+        frame, self.unparsed[source] = per_student_frame(df)
+
+        # Drop this source's old columns, then grow the student index if new keys appeared
+        self.merged = self.merged.drop(columns=list(self.columns.get(source, {}).values()))
+        new_keys = frame.index.difference(self.index)
+        if len(new_keys):
+            self.index = self.index.append(new_keys).rename("student_key")
+            self.merged = self.merged.reindex(self.index)
+
+        names = self._column_names(source, frame)
+        aligned = frame.rename(columns=names).reindex(self.index)
+        self.merged = pd.concat([self.merged, aligned], axis=1)
+        self.columns[source] = names
+        self.versions[source] = version
+        return True
+
+    def remove_source(self, source):
+        self.merged = self.merged.drop(columns=list(self.columns.pop(source, {}).values()))
+        self.versions.pop(source, None)
+        self.unparsed.pop(source, None)
+
+    # O(1) hashed lookup of one student's merged record; accepts any ID format
+    def lookup(self, student_id):
+        key = normalize_student_keys([student_id])[0]
+        if key == INVALID_KEY or key not in self.index:
+            return None
+        return self.merged.iloc[self.index.get_loc(key)]
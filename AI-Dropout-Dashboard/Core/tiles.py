@@ -0,0 +1,72 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+# RGB colour per shade level: green, then light/medium/dark red (same as the seaborn heatmap)
+SHADE_PALETTE = np.array([
+    [0, 128, 0],
+    [255, 153, 153],
+    [255, 77, 77],
+    [204, 0, 0],
+], dtype=np.uint8)
+
+# Two-colour palette for plain present/absent matrices (index 0 = absent, 1 = present)
+PRESENCE_PALETTE = np.array([
+    [255, 0, 0],
+    [144, 238, 144],
+], dtype=np.uint8)
+
+BORDER_COLOR = np.array([0, 0, 0], dtype=np.uint8)
+
+
+# Pick a cell size so the rendered image stays around target_px wide and no more than
+# max_height_px tall; tall windows may go below min_px (down to 1px rows)
+def cell_size(n_cols, n_rows=1, target_px=800, min_px=4, max_px=40, max_height_px=2000):
+    width_px = max(min_px, min(max_px, target_px // max(n_cols, 1)))
+    return int(max(1, min(width_px, max_height_px // max(n_rows, 1))))
+
+
+# Rasterize a matrix of palette indexes straight to an RGB image
+# Each cell becomes a cell_px x cell_px block with a one-pixel black border
+# Returns None for an empty window (e.g. a gap in the ID range), so callers can skip it
+def render_tile(indexes, palette=SHADE_PALETTE, cell_px=20, border=True):
+    indexes = np.asarray(indexes, dtype=np.intp)
+    if indexes.size == 0:
+        return None
+    image = palette[indexes]
+    image = np.repeat(np.repeat(image, cell_px, axis=0), cell_px, axis=1)
+    if border and cell_px >= 6:
+        image[::cell_px, :] = BORDER_COLOR
+        image[:, ::cell_px] = BORDER_COLOR
+        image[-1, :] = BORDER_COLOR
+        image[:, -1] = BORDER_COLOR
+    return image
+
+
+# LRU cache of rendered tiles keyed by (student_offset, date_offset, window size)
+# Shared by all sessions, so the OrderedDict is only changed under a lock
+class TileCache:
+    def __init__(self, max_tiles=256):
+        self.max_tiles = max_tiles
+        self.tiles = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    # render() is only called when the tile is not cached yet; it runs outside the lock,
+    # so two sessions missing the same tile may both render it
+    def get(self, key, render):
+        with self.lock:
+            if key in self.tiles:
+                self.tiles.move_to_end(key)
+                self.hits += 1
+                return self.tiles[key]
+            self.misses += 1
+        tile = render()
+        with self.lock:
+            self.tiles[key] = tile
+            self.tiles.move_to_end(key)
+            while len(self.tiles) > self.max_tiles:
+                self.tiles.popitem(last=False)
+        return tile
@@ -1,70 +1,50 @@
+import os
+import sys
 import streamlit as st
-import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
 
-st.title("Student Attendance Visualization")
-
-# Load data
-df = pd.read_csv("attendance_daily.csv")
-attendance_cols = df.columns[2:]
-
-# Calculate attendance percent
-df["attendance_percent"] = (df[attendance_cols] == "P").sum(axis=1) / len(attendance_cols) * 100
-
-# 1. Bar Chart: Attendance percentage per student
-st.subheader("Bar Chart: Attendance Percentage per Student")
-fig, ax = plt.subplots(figsize=(12, 5))
-ax.bar(df["Name"], df["attendance_percent"], color='skyblue')
-ax.set_ylabel("Attendance %")
-ax.set_xlabel("Student Name")
-ax.set_title("Attendance Percentage per Student")
-plt.xticks(rotation=90)
-st.pyplot(fig)
-
-# 2. Histogram: Distribution of attendance percentages
-st.subheader("Histogram: Distribution of Attendance Percentages")
-fig, ax = plt.subplots()
-ax.hist(df["attendance_percent"], bins=10, color='orange', edgecolor='black')
-ax.set_xlabel("Attendance %")
-ax.set_ylabel("Number of Students")
-ax.set_title("Distribution of Attendance Percentages")
-st.pyplot(fig)
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from Core.attendance_store import AttendanceStore
+from Core.charts import ChartCache, attendance_chart_specs, render_charts
+from Core.instrumentation import MetricsHistory, render_debug_panel
+from Core.startup import mark_first_paint, setup_page
+from Core.streaming import CHUNK_ROWS
 
-# 3. Boxplot: Attendance percentage spread
-st.subheader("Boxplot: Attendance Percentage Spread")
-fig, ax = plt.subplots()
-ax.boxplot(df["attendance_percent"], vert=False)
-ax.set_xlabel("Attendance %")
-ax.set_title("Boxplot of Attendance Percentages")
-st.pyplot(fig)
-
-# 4. Heatmap: Daily attendance (students vs dates)
-st.subheader("Heatmap: Daily Attendance")
-attendance_matrix = df[attendance_cols].replace({"P": 1, "A": 0})
-fig, ax = plt.subplots(figsize=(12, 8))
-sns.heatmap(attendance_matrix, cmap="YlGnBu", cbar=True, ax=ax)
-ax.set_ylabel("Student Index")
-ax.set_xlabel("Date")
-ax.set_title("Student Daily Attendance Heatmap")
-st.pyplot(fig)
-
-# 5. Pie Chart: Attendance status counts (overall)
-st.subheader("Pie Chart: Overall Attendance Status")
-total_present = (df[attendance_cols] == "P").sum().sum()
-total_absent = (df[attendance_cols] == "A").sum().sum()
-fig, ax = plt.subplots()
-ax.pie([total_present, total_absent], labels=["Present", "Absent"], autopct='%1.1f%%', colors=['green', 'red'])
-ax.set_title("Overall Attendance Status")
-st.pyplot(fig)
-
-# 6. Line Chart: Average daily attendance over time
-st.subheader("Line Chart: Average Daily Attendance Over Time")
-avg_daily_attendance = (df[attendance_cols] == "P").mean()
-fig, ax = plt.subplots()
-ax.plot(attendance_cols, avg_daily_attendance * 100, marker='o')
-ax.set_ylabel("Average Attendance %")
-ax.set_xlabel("Date")
-ax.set_title("Average Daily Attendance Over Time")
-plt.xticks(rotation=90)
-st.pyplot(fig)
\ No newline at end of file
+# Per-stage timings for this rerun (?debug=1 shows the performance panel)
+profiler, debug_panel = setup_page("attendance_graphs")
+st.title("Student Attendance Visualization")
+# The title is up before seaborn/matplotlib are imported for the first chart
+mark_first_paint(profiler)
+
+@st.cache_resource
+def get_metrics_history():
+    return MetricsHistory()
+
+# Load data into the compact attendance store and build the chart inputs once per file version
+@st.cache_resource
+def load_chart_specs(path, mtime):
+    return attendance_chart_specs(AttendanceStore.from_csv(path, chunksize=CHUNK_ROWS))
+
+# Rendered charts shared across reruns, keyed by a hash of each chart's input data
+@st.cache_resource
+def get_chart_cache():
+    return ChartCache()
+
+csv_path = "attendance_daily.csv"
+with profiler.stage("load chart data"):
+    chart_specs = load_chart_specs(csv_path, os.path.getmtime(csv_path))
+
+# Draw the bar, histogram, boxplot, heatmap, pie and line charts
+# Only charts whose data changed are redrawn, concurrently in a worker pool
+with profiler.stage("render charts"):
+    rendered = render_charts(chart_specs, get_chart_cache())
+
+with profiler.stage("display"):
+    for spec, png, seconds, from_cache in rendered:
+        st.subheader(spec.title)
+        st.image(png)
+        st.caption(f"Rendered in {seconds:.3f}s" + (" (cached)" if from_cache else ""))
+
+# Record this rerun's metrics and show the optional debug panel
+run_metrics = get_metrics_history().add(profiler)
+if debug_panel:
+    render_debug_panel(run_metrics, get_metrics_history())
@@ -1,22 +1,67 @@
+import os
+import sys
 import streamlit as st
-import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
-import matplotlib.colors as mcolors
 
-# Set wide page layout
-st.set_page_config(layout="centered")
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from Core.attendance_db import DB_PATH, AttendanceDB
+from Core.attendance_store import AttendanceStore
+from Core.instrumentation import MetricsHistory, render_debug_panel
+from Core.shading import shade_levels, shade_window
+from Core.startup import mark_first_paint, setup_page
+from Core.streaming import CHUNK_ROWS
+from Core.tiles import TileCache, cell_size, render_tile
+
+# Set page layout, with per-stage timings for this rerun (?debug=1 shows the performance panel)
+profiler, debug_panel = setup_page("heatmap", layout="centered")
 st.title("Interactive Student Attendance Heatmap")
+mark_first_paint(profiler)
+
+@st.cache_resource
+def get_metrics_history():
+    return MetricsHistory()
+
+# Load attendance CSV into the compact store and precompute the shade levels once per file version
+# Only the current version is kept; an older store and its levels are dropped when the file changes
+@st.cache_resource(max_entries=1)
+def load_attendance(path, mtime):
+    store = AttendanceStore.from_csv(path, chunksize=CHUNK_ROWS)
+    levels = shade_levels(store.absent_matrix())
+    return store, levels
+
+# With ATTENDANCE_DB set, history is read from the SQLite store instead: only the
+# date list and ID range are loaded up front, each view queries just its window
+@st.cache_resource
+def get_attendance_db(path):
+    return AttendanceDB(path)
+
+if DB_PATH:
+    data_path = DB_PATH
+    db = get_attendance_db(DB_PATH)
+    with profiler.stage("load dates"):
+        attendance_cols = db.dates()
+        min_id, max_id, _ = db.id_range()
+    if not attendance_cols:
+        st.warning(f"{DB_PATH} has no attendance yet; import a CSV with Pipeline/import_attendance.py")
+        st.stop()
+else:
+    data_path = "attendance_daily.csv"
+    db = None
+    with profiler.stage("load attendance"):
+        store, levels = load_attendance(data_path, os.path.getmtime(data_path))
+    attendance_cols = store.dates
+    min_id, max_id = int(store.ids.min()), int(store.ids.max())
+
+# Rendered heatmap tiles, cached per file version so panning back over a window is free
+@st.cache_resource(max_entries=1)
+def get_tile_cache(path, mtime):
+    return TileCache()
 
-# Load attendance CSV
-df = pd.read_csv("attendance_daily.csv")
-attendance_cols = df.columns[2:]  # assuming first 2 columns are ID and Name
+tile_cache = get_tile_cache(data_path, os.path.getmtime(data_path))
 
 # Parameters
-window_students = 10   # number of students to display at once
-window_dates = 7       # number of dates to display at once
-min_id, max_id = int(df["ID"].min()), int(df["ID"].max())
 total_dates = len(attendance_cols)
+window_students = st.sidebar.number_input("Students per view", min_value=1, max_value=100, value=10)  # number of students to display at once
+window_dates = min(st.sidebar.number_input("Dates per view", min_value=1, max_value=90, value=7), total_dates)  # number of dates to display at once
 
 # Initialize session state for navigation
 if "student_offset" not in st.session_state:
@@ -85,59 +130,42 @@ end_id = min(start_id + window_students - 1, max_id)
 start_date_idx = st.session_state.date_offset
 end_date_idx = min(start_date_idx + window_dates - 1, total_dates - 1)
 selected_dates = attendance_cols[start_date_idx:end_date_idx + 1]
-df_subset = df[df["ID"].between(start_id, end_id)]
-
-# Convert attendance to numeric: P=1, A=0
-attendance_matrix = df_subset[selected_dates].replace({"P": 1, "A": 0}).fillna(1)
-
-# Apply last 3-day absence shading
-shade_matrix = attendance_matrix.copy()
-for idx, row in attendance_matrix.iterrows():
-    for col_idx, col in enumerate(attendance_matrix.columns):
-        if col not in selected_dates:
-            continue
-        # last 3 days including current
-        last3_idx = max(0, col_idx - 2)
-        last3_values = row[last3_idx:col_idx+1]
-        absences = (last3_values == 0).sum()
-        if row[col] == 1:
-            shade_matrix.at[idx, col] = 0
-        else:
-            if absences == 1:
-                shade_matrix.at[idx, col] = 1  # light red
-            elif absences == 2:
-                shade_matrix.at[idx, col] = 2  # medium red
-            else:
-                shade_matrix.at[idx, col] = 3  # dark red
 
-# Use names if available
-if "Name" in df.columns:
-    shade_matrix.index = df_subset["Name"]
+if db is not None:
+    # Shading only looks back within the visible window, so the window alone is enough
+    with profiler.stage("query window"):
+        window = db.window(start_id, end_id, selected_dates[0], selected_dates[-1])
+    view_levels, student_rows, view_start = shade_levels(window.absent_matrix()), slice(None), 0
+    row_store = window
 else:
-    shade_matrix.index = df_subset["ID"]
+    view_levels, student_rows, view_start = levels, store.rows_between(start_id, end_id), start_date_idx
+    row_store = store
+
+# Apply last 3-day absence shading by slicing the precomputed levels, then
+# rasterize the window straight to an image (reused from the tile cache when possible)
+tile_key = (st.session_state.student_offset, start_date_idx, window_students, window_dates)
+with profiler.stage("shade and render tile"):
+    window_levels = shade_window(view_levels, student_rows, view_start, view_start + len(selected_dates))
+    tile = tile_cache.get(tile_key, lambda: render_tile(
+        window_levels,
+        cell_px=cell_size(len(selected_dates), len(window_levels)),
+    ))
 
-# Colormap: Green + 3 reds
-cmap = mcolors.ListedColormap(["green", "#ff9999", "#ff4d4d", "#cc0000"])
-bounds = [-0.5,0.5,1.5,2.5,3.5]
-norm = mcolors.BoundaryNorm(bounds, cmap.N)
+# Use names if available
+row_labels = row_store.names[student_rows] if row_store.names is not None else row_store.ids[student_rows]
 
 # Plot heatmap (compact)
 st.subheader(f"Attendance Heatmap (Students {start_id}-{end_id}, Dates {selected_dates[0]} to {selected_dates[-1]})")
-fig, ax = plt.subplots(figsize=(8, 5))
-sns.heatmap(
-    shade_matrix[selected_dates],
-    cmap=cmap,
-    norm=norm,
-    cbar=True,
-    ax=ax,
-    linewidths=0.3,
-    linecolor="black",
-    square=True,
-    annot=False
-)
-ax.set_ylabel("Students", fontsize=8)
-ax.set_xlabel("Date", fontsize=8)
-ax.set_title("Attendance Heatmap (Green=Present, Red shades=Absences last 3 days)", fontsize=10)
-ax.set_xticklabels(ax.get_xticklabels(), rotation=45, ha="right", fontsize=8)
-ax.set_yticklabels(ax.get_yticklabels(), fontsize=8)
-st.pyplot(fig)
+with profiler.stage("display"):
+    if tile is None:
+        # No student IDs fall in this part of the range
+        st.info(f"No students with IDs {start_id}-{end_id}")
+    else:
+        st.image(tile, caption="Attendance Heatmap (Green=Present, Red shades=Absences last 3 days)")
+    st.caption(f"Rows (top to bottom): {', '.join(str(label) for label in row_labels)}")
+    st.caption(f"Columns (left to right): {', '.join(selected_dates)}")
+
+# Record this rerun's metrics and show the optional debug panel
+run_metrics = get_metrics_history().add(profiler)
+if debug_panel:
+    render_debug_panel(run_metrics, get_metrics_history())
@@ -1,31 +1,84 @@
+import os
+import sys
 import streamlit as st
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from Core.attendance_store import AttendanceStore
+from Core.features import RollingFeatures
+from Core.incremental import AttendanceCounts
+from Core.instrumentation import MetricsHistory, render_debug_panel
+from Core.startup import mark_first_paint, setup_page
+from Core.streaming import CHUNK_ROWS, iter_attendance_chunks, stream_attendance_percent
+
+# Rows shown in the preview; the full file is only ever read in chunks
+PREVIEW_ROWS = 1000
+
+# Running per-student counts kept between runs for incremental daily updates
+STATE_FILE = "attendance_state.npz"
+# Recent days and absence streaks kept between runs for the rolling features
+FEATURES_STATE_FILE = "attendance_features_state.npz"
+
+# Time to first paint is recorded for this app too (?debug=1 shows the performance panel)
+profiler, debug_panel = setup_page("hacksa_test")
 st.title("Data Analysis and Visualization App")
+mark_first_paint(profiler)
+
+@st.cache_resource
+def get_metrics_history():
+    return MetricsHistory()
 
 st.header("Attendance Database Preview")
 
 csv_file = "attendance_daily.csv"
 try:
-    df = pd.read_csv(csv_file)
+    df = pd.read_csv(csv_file, nrows=PREVIEW_ROWS)
     st.dataframe(df)
+    st.caption(f"Showing the first {len(df)} rows")
 except Exception as e:
     st.error(f"Could not load {csv_file}: {e}")
 
-# Load the daily attendance CSV
-df = pd.read_csv("attendance_daily.csv")
+incremental = st.checkbox("Incremental update (only apply new date columns)", value=os.path.exists(STATE_FILE))
 
-# Get attendance columns (excluding ID and Name)
-attendance_cols = df.columns[2:]
+if incremental:
+    # Apply only the dates added since the last run, O(students) per new day
+    if os.path.exists(STATE_FILE):
+        counts = AttendanceCounts.load(STATE_FILE)
+        new_dates = counts.update_from_csv("attendance_daily.csv")
+        st.write(f"Applied {len(new_dates)} new date(s): {', '.join(new_dates)}")
+    else:
+        counts = AttendanceCounts.from_chunks(iter_attendance_chunks("attendance_daily.csv"))
+        st.write(f"Built running counts from {len(counts.dates)} dates")
+    counts.percent_frame().to_csv("attendance_percent.csv", index=False)
+    counts.save(STATE_FILE)
 
-# Calculate attendance percentage for each student
-df["attendance_percent"] = (df[attendance_cols] == "P").sum(axis=1) / len(attendance_cols) * 100
+    # Rolling 7/30-day rates, velocity and absence streaks, updated the same way
+    if os.path.exists(FEATURES_STATE_FILE):
+        features = RollingFeatures.load(FEATURES_STATE_FILE)
+        features.update_from_csv("attendance_daily.csv")
+    else:
+        features = RollingFeatures.from_chunks(iter_attendance_chunks("attendance_daily.csv"))
+    features.frame().to_csv("attendance_features.csv", index=False)
+    features.save(FEATURES_STATE_FILE)
 
-# Select only ID, Name, and attendance_percent
-result = df[["ID", "Name", "attendance_percent"]]
+    if st.button("Check against full recompute"):
+        mismatches = counts.check_consistency(AttendanceStore.from_csv("attendance_daily.csv", chunksize=CHUNK_ROWS))
+        if mismatches.empty:
+            st.success("Incremental counts match a full recompute")
+        else:
+            st.error(f"{len(mismatches)} students differ from a full recompute")
+            st.dataframe(mismatches)
+else:
+    # Stream the daily attendance CSV in row chunks, calculating each student's
+    # attendance percentage and saving ID, Name, attendance_percent to a new CSV
+    stream_attendance_percent("attendance_daily.csv", "attendance_percent.csv")
+    # Rolling 7/30-day rates, velocity and absence streaks per student
+    RollingFeatures.from_chunks(iter_attendance_chunks("attendance_daily.csv")).frame().to_csv(
+        "attendance_features.csv", index=False
+    )
 
-# Save to new CSV
-result.to_csv("attendance_percent.csv", index=False)
\ No newline at end of file
+# Record this rerun's metrics and show the optional debug panel
+run_metrics = get_metrics_history().add(profiler)
+if debug_panel:
+    render_debug_panel(run_metrics, get_metrics_history())
@@ -0,0 +1,39 @@
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from Core.attendance_db import DB_PATH, AttendanceDB
+from Core.streaming import CHUNK_ROWS
+
+# Convert wide attendance CSVs (ID, Name, one column per date) into the SQLite store
+# read by the dashboards when ATTENDANCE_DB is set
+#
+#   python Pipeline/import_attendance.py attendance_daily.csv --db attendance.db
+#
+# Files can be imported repeatedly: cells already stored are overwritten, new dates
+# and students are added
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import wide attendance CSVs into the SQLite attendance store")
+    parser.add_argument("csv_files", nargs="+", help="wide attendance CSVs to import")
+    parser.add_argument("--db", default=DB_PATH or "attendance.db", help="database file (default $ATTENDANCE_DB)")
+    parser.add_argument("--chunksize", type=int, default=CHUNK_ROWS, help="CSV rows read per chunk")
+    parser.add_argument("--id-col", default="ID", help="student ID column")
+    parser.add_argument("--name-col", default="Name", help="student name column")
+    args = parser.parse_args()
+
+    db = AttendanceDB(args.db)
+    for path in args.csv_files:
+        start = time.perf_counter()
+        cells = db.import_csv(path, args.chunksize, args.id_col, args.name_col)
+        print(f"{path}: {cells} cells in {time.perf_counter() - start:.2f}s")
+    min_id, max_id, n_students = db.id_range()
+    print(f"{args.db}: {n_students} students (IDs {min_id}-{max_id}), {len(db.dates())} dates")
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
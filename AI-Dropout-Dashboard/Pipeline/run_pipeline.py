@@ -0,0 +1,63 @@
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime, timezone
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from Core.pipeline import find_cohorts, run_pipeline
+
+# Headless nightly job: every cohort directory under the input directory is ingested,
+# cleaned, joined and scored in its own worker process
+#
+#   python Pipeline/run_pipeline.py campuses/ --output risk_output/ --processes 8
+#
+# Each cohort gets <output>/<cohort>/student_risk.csv (and attendance_percent.csv for
+# daily sheets) plus a manifest.json; re-running skips cohorts whose inputs are unchanged
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run ingestion and risk scoring for every cohort directory")
+    parser.add_argument("input_dir", help="directory of cohort subdirectories (or a single cohort's files)")
+    parser.add_argument("--output", default="pipeline_output", help="output directory, one subdirectory per cohort")
+    parser.add_argument("--processes", type=int, help="worker processes (default: one per core)")
+    parser.add_argument("--no-resume", action="store_true", help="redo cohorts that already finished")
+    parser.add_argument("--model", help="trained risk model (.joblib) to add ml_risk_probability")
+    args = parser.parse_args()
+
+    cohorts = find_cohorts(args.input_dir)
+    if not cohorts:
+        sys.exit(f"No attendance, fee or score files found under {args.input_dir}")
+    os.makedirs(args.output, exist_ok=True)
+    print(f"{len(cohorts)} cohort(s) -> {args.output}")
+
+    start = time.perf_counter()
+    summaries = []
+    for done, total, summary in run_pipeline(cohorts, args.output, args.processes, not args.no_resume, args.model):
+        summaries.append(summary)
+        if "error" in summary:
+            status = f"FAILED {summary['error']}"
+        elif summary.get("skipped"):
+            status = "unchanged, skipped"
+        else:
+            stages = " ".join(f"{name} {seconds:.2f}s" for name, seconds in summary["stages"].items())
+            status = f"{summary['students']} students in {summary['seconds']:.2f}s ({stages})"
+        print(f"[{done}/{total}] {summary['cohort']}: {status}")
+
+    failed = [s["cohort"] for s in summaries if "error" in s]
+    report = {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "input_dir": os.path.abspath(args.input_dir),
+        "seconds": time.perf_counter() - start,
+        "failed": failed,
+        "cohorts": summaries,
+    }
+    with open(os.path.join(args.output, "run_summary.json"), "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Finished in {report['seconds']:.2f}s, {len(failed)} failed")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+import argparse
+import glob
+import os
+import sys
+import time
+
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from Core.alerts import (
+    ALERT_LOG_PATH, COOLDOWN_HOURS, MAX_CONCURRENCY, RATE_PER_SECOND,
+    AlertDispatcher, AlertLog, MemoryTransport, SMTPTransport, send_alerts,
+)
+from Core.pipeline import RISK_FILE
+
+# Email each mentor one digest of their at-risk students from the pipeline output
+#
+#   python -m aiosmtpd -n -l localhost:1025 &
+#   python Pipeline/send_alerts.py pipeline_output/
+#
+# Students alerted to the same mentor within the cooldown are not repeated
+
+
+def load_scored(paths):
+    frames = []
+    for path in paths:
+        if os.path.isdir(path):
+            frames.extend(pd.read_csv(p, index_col=0) for p in sorted(glob.glob(os.path.join(path, "*", RISK_FILE))))
+        else:
+            frames.append(pd.read_csv(path, index_col=0))
+    return pd.concat(frames) if frames else pd.DataFrame()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Send at-risk digests to mentors")
+    parser.add_argument("inputs", nargs="+", help=f"pipeline output directories or {RISK_FILE} files")
+    parser.add_argument("--tiers", nargs="+", default=["Red"], help="risk tiers to alert on")
+    parser.add_argument("--cooldown-hours", type=float, default=COOLDOWN_HOURS, help="hours before a student is alerted again")
+    parser.add_argument("--log", default=ALERT_LOG_PATH, help="sent-alert log used for the cooldown")
+    parser.add_argument("--concurrency", type=int, default=MAX_CONCURRENCY, help="digests in flight at once")
+    parser.add_argument("--rate", type=float, default=RATE_PER_SECOND, help="sends per second")
+    parser.add_argument("--dry-run", action="store_true", help="build the digests without sending or logging them")
+    args = parser.parse_args()
+
+    scored = load_scored(args.inputs)
+    if "mentor" not in scored.columns:
+        sys.exit("No mentor column in the input; include attendance.csv (with mentor) in the pipeline run")
+
+    transport = MemoryTransport() if args.dry_run else SMTPTransport()
+    dispatcher = AlertDispatcher(transport, max_concurrency=args.concurrency, rate_per_second=args.rate)
+    log = None if args.dry_run else AlertLog(args.log, args.cooldown_hours)
+    start = time.perf_counter()
+    results = send_alerts(scored, dispatcher, log, tiers=args.tiers)
+
+    if args.dry_run:
+        for message in transport.messages[:3]:
+            print(message, "\n")
+    failed = results[~results["sent"]] if len(results) else results
+    print(f"{len(results) - len(failed)}/{len(results)} digests sent ({int(results['students'].sum()) if len(results) else 0} "
+          f"students) in {time.perf_counter() - start:.2f}s")
+    for row in failed.itertuples():
+        print(f"FAILED {row.mentor} <{row.to}> after {row.attempts} attempts: {row.error}")
+    sys.exit(1 if len(failed) else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+import argparse
+import os
+import sys
+import time
+
+# Taken before anything else is imported, so cold-start figures include every import
+os.environ["DASHBOARD_PROCESS_START"] = str(time.time())
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from Core.startup import DEFAULT_DATASETS, HEAVY_MODULES, warm_up
+
+# Start a dashboard with an optional pre-warmed server process
+#
+#   python Server/serve.py CSV_Input/student_data_app.py --warm-up --server.port 8501
+#
+# Streamlit runs every session's script inside this process, so the modules and sample
+# datasets loaded by --warm-up are already in memory (and in the shared store) when the
+# first user connects. Cold start to first paint shows in the ?debug=1 panel
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a dashboard script, optionally warming it up first")
+    parser.add_argument("script", help="Streamlit script to serve")
+    parser.add_argument("--warm-up", action="store_true",
+                        help=f"import {', '.join(HEAVY_MODULES)} and preload the {len(DEFAULT_DATASETS)} sample datasets")
+    # Anything else (e.g. --server.port 8501) is passed on to streamlit run
+    args, streamlit_args = parser.parse_known_args()
+
+    if args.warm_up:
+        start = time.perf_counter()
+        for step, seconds in warm_up().items():
+            print(f"{step}: {seconds:.2f}s")
+        print(f"Warm-up done in {time.perf_counter() - start:.2f}s")
+
+    from streamlit.web import cli as stcli
+
+    sys.argv = ["streamlit", "run", args.script] + [a for a in streamlit_args if a != "--"]
+    sys.exit(stcli.main())
+
+
+if __name__ == "__main__":
+    main()
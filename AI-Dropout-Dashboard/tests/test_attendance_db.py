@@ -0,0 +1,34 @@
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from Core.attendance_db import AttendanceDB
+from Core.attendance_store import AttendanceStore
+
+
+def daily_frame(ids):
+    return pd.DataFrame({"ID": ids, "Name": [f"Student_{i}" for i in range(len(ids))],
+                         "2025-01-01": ["P", "A", "P"][:len(ids)], "2025-01-02": ["A", "P", "P"][:len(ids)]})
+
+
+def test_import_store_round_trips_numeric_ids(tmp_path):
+    db = AttendanceDB(str(tmp_path / "attendance.db"))
+    store = AttendanceStore.from_frame(daily_frame([3, 1, 2]))
+    assert db.import_store(store) == 6
+    window = db.window(1, 3, "2025-01-01", "2025-01-02")
+    assert list(window.ids) == [1, 2, 3]
+    assert window.present_matrix()[[2, 0, 1]].tolist() == store.present_matrix().tolist()
+    db.close()
+
+
+# Text IDs would not fit the INTEGER key; nothing is written
+def test_import_store_rejects_text_ids(tmp_path):
+    db = AttendanceDB(str(tmp_path / "attendance.db"))
+    with pytest.raises(ValueError, match="S1001"):
+        db.import_store(AttendanceStore.from_frame(daily_frame(["S1001", "S1002", "7"])))
+    assert db.dates() == []
+    assert db.id_range() == (None, None, 0)
+    db.close()
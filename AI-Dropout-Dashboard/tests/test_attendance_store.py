@@ -0,0 +1,41 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from Core.attendance_store import AttendanceStore
+
+
+def daily_frame(n_students=50, n_days=21, seed=0):
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range("2025-01-01", periods=n_days).strftime("%Y-%m-%d")
+    df = pd.DataFrame({"ID": np.arange(1001, 1001 + n_students), "Name": [f"Student_{i}" for i in range(n_students)]})
+    cells = rng.choice(np.array(["P", "A", None], dtype=object), size=(n_students, n_days), p=[0.6, 0.3, 0.1])
+    return pd.concat([df, pd.DataFrame(cells, columns=dates)], axis=1)
+
+
+def test_store_counts_match_pandas():
+    df = daily_frame()
+    dates = list(df.columns[2:])
+    store = AttendanceStore.from_frame(df)
+    present = (df[dates] == "P").to_numpy()
+    absent = (df[dates] == "A").to_numpy()
+    np.testing.assert_array_equal(store.present_counts(), present.sum(axis=1))
+    np.testing.assert_array_equal(store.absent_counts(), absent.sum(axis=1))
+    np.testing.assert_allclose(store.attendance_percent(), present.sum(axis=1) / len(dates) * 100)
+    np.testing.assert_array_equal(store.daily_present_counts(), present.sum(axis=0))
+    np.testing.assert_allclose(store.daily_average().to_numpy(), (df[dates] == "P").mean().to_numpy())
+
+
+def test_store_windows_match_pandas():
+    df = daily_frame()
+    dates = list(df.columns[2:])
+    store = AttendanceStore.from_frame(df)
+    rows = store.rows_between(1010, 1020)
+    np.testing.assert_array_equal(store.ids[rows], np.arange(1010, 1021))
+    for start, stop in [(0, 21), (3, 11), (8, 16), (20, 21)]:
+        expected = (df.iloc[rows][dates[start:stop]] == "A").to_numpy()
+        np.testing.assert_array_equal(store.absent_matrix(rows, start, stop), expected)
+    np.testing.assert_array_equal(store.rows_for([1003, 9999, 1001]), [2, -1, 0])
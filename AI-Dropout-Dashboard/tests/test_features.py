@@ -0,0 +1,90 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from Core.attendance_store import AttendanceStore
+from Core.features import RATE_WINDOWS, VELOCITY_DAYS, RollingFeatures, score_slope
+
+
+def daily_frame(n_students=40, n_days=35, seed=0, ids=None):
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range("2025-01-01", periods=n_days).strftime("%Y-%m-%d")
+    ids = np.arange(1, n_students + 1) if ids is None else ids
+    df = pd.DataFrame({"ID": ids, "Name": [f"Student_{i}" for i in range(n_students)]})
+    cells = rng.choice(np.array(["P", "A", None], dtype=object), size=(n_students, n_days), p=[0.5, 0.4, 0.1])
+    return pd.concat([df, pd.DataFrame(cells, columns=dates)], axis=1)
+
+
+# Straightforward per-student loops over the whole history
+def reference_features(df):
+    cells = df.iloc[:, 2:].to_numpy(dtype=object)
+    present = cells == "P"
+    rows = []
+    for p, c in zip(present, cells):
+        record = {f"attendance_rate_{d}d": p[-min(d, len(p)):].mean() * 100 for d in RATE_WINDOWS}
+        record["attendance_velocity_wow"] = (p[-VELOCITY_DAYS:].sum() - p[-2 * VELOCITY_DAYS:-VELOCITY_DAYS].sum()) \
+            / VELOCITY_DAYS * 100
+        current = longest = 0
+        for value in c:
+            current = current + 1 if value == "A" else 0
+            longest = max(longest, current)
+        record["current_absence_streak"] = current
+        record["longest_absence_streak"] = longest
+        rows.append(record)
+    return pd.DataFrame(rows)
+
+
+def assert_features_equal(features, expected):
+    frame = features.frame().drop(columns="ID")
+    for column in expected.columns:
+        np.testing.assert_allclose(frame[column].to_numpy(dtype=float), expected[column].to_numpy(dtype=float),
+                                   err_msg=column)
+
+
+def test_from_store_matches_reference():
+    df = daily_frame()
+    assert_features_equal(RollingFeatures.from_store(AttendanceStore.from_frame(df)), reference_features(df))
+
+
+def test_from_chunks_matches_from_store():
+    df = daily_frame(n_students=55)
+    chunks = [AttendanceStore.from_frame(df.iloc[i:i + 20]) for i in range(0, 55, 20)]
+    expected = RollingFeatures.from_store(AttendanceStore.from_frame(df)).frame()
+    pd.testing.assert_frame_equal(RollingFeatures.from_chunks(chunks).frame(), expected)
+
+
+# Appending days one at a time ends where a full rebuild does
+def test_append_day_matches_full_rebuild():
+    df = daily_frame()
+    dates = list(df.columns[2:])
+    features = RollingFeatures.from_store(AttendanceStore.from_frame(df[["ID", "Name"] + dates[:5]]))
+    for date in dates[5:]:
+        features.append_day(date, df["ID"].to_numpy(), df[date].to_numpy(dtype=object))
+    assert_features_equal(features, reference_features(df))
+    with pytest.raises(ValueError):
+        features.append_day(dates[-1], df["ID"].to_numpy(), df[dates[-1]].to_numpy(dtype=object))
+
+
+def test_short_history_has_no_velocity():
+    df = daily_frame(n_days=2 * VELOCITY_DAYS - 1)
+    frame = RollingFeatures.from_store(AttendanceStore.from_frame(df)).frame()
+    assert frame["attendance_velocity_wow"].isna().all()
+
+
+@pytest.mark.parametrize("ids", [np.arange(1, 41), np.array([f"S{i}" for i in range(1, 41)], dtype=object)])
+def test_save_load_round_trip(tmp_path, ids):
+    features = RollingFeatures.from_store(AttendanceStore.from_frame(daily_frame(ids=ids)))
+    path = tmp_path / "features.npz"
+    features.save(path)
+    loaded = RollingFeatures.load(path)
+    pd.testing.assert_frame_equal(loaded.frame(), features.frame())
+    assert loaded.dates == features.dates
+
+
+def test_score_slope_skips_missing_scores():
+    df = pd.DataFrame({"assessment_2": [20, 50, np.nan], "assessment_1": [10, 50, 30], "assessment_3": [30, np.nan, np.nan]})
+    np.testing.assert_allclose(score_slope(df).to_numpy(), [10.0, 0.0, np.nan])
@@ -0,0 +1,64 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from Core.attendance_store import AttendanceStore
+from Core.incremental import AttendanceCounts
+
+
+def daily_frame(n_students=50, n_days=21, seed=0):
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range("2025-01-01", periods=n_days).strftime("%Y-%m-%d")
+    df = pd.DataFrame({"ID": np.arange(1001, 1001 + n_students), "Name": [f"Student_{i}" for i in range(n_students)]})
+    cells = rng.choice(np.array(["P", "A", None], dtype=object), size=(n_students, n_days), p=[0.6, 0.3, 0.1])
+    return pd.concat([df, pd.DataFrame(cells, columns=dates)], axis=1)
+
+
+# Appending days one at a time gives the same counts as recomputing from the full sheet
+def test_counts_append_day_matches_full_recompute():
+    df = daily_frame()
+    dates = list(df.columns[2:])
+    counts = AttendanceCounts.from_store(AttendanceStore.from_frame(df[["ID", "Name"] + dates[:10]]))
+    for date in dates[10:]:
+        counts.append_day(date, df["ID"].to_numpy(), df[date].to_numpy(dtype=object))
+    full = AttendanceStore.from_frame(df)
+    assert counts.check_consistency(full).empty
+    pd.testing.assert_frame_equal(counts.percent_frame(), full.percent_frame())
+
+
+def test_counts_update_from_csv_and_new_students(tmp_path):
+    df = daily_frame()
+    dates = list(df.columns[2:])
+    counts = AttendanceCounts.from_store(AttendanceStore.from_frame(df[["ID", "Name"] + dates[:-1]]))
+    path = tmp_path / "attendance_daily.csv"
+    df.to_csv(path, index=False)
+    assert counts.update_from_csv(path) == [dates[-1]]
+    assert counts.update_from_csv(path) == []
+    assert counts.check_consistency(AttendanceStore.from_csv(path)).empty
+
+    # A student first seen today counts as absent on every earlier day
+    counts.append_day("2025-02-01", [1001, 5000], ["P", "P"], names=["Student_0", "New"])
+    row = counts.id_index.get_loc(5000)
+    assert counts.present[row] == 1 and counts.total[row] == len(counts.dates)
+    assert counts.names[row] == "New"
+
+
+@pytest.mark.parametrize("text_ids", [False, True])
+def test_counts_save_load_round_trip(tmp_path, text_ids):
+    df = daily_frame()
+    if text_ids:
+        df["ID"] = ("S" + df["ID"].astype(str)).astype(object)
+    counts = AttendanceCounts.from_store(AttendanceStore.from_frame(df))
+    path = tmp_path / "counts.npz"
+    counts.save(path)
+    loaded = AttendanceCounts.load(path)
+    pd.testing.assert_frame_equal(loaded.percent_frame(), counts.percent_frame())
+    assert loaded.dates == counts.dates
+    assert loaded.ids.dtype == counts.ids.dtype
+    # A later run applies a new day to the loaded state
+    loaded.append_day("2025-02-01", df["ID"].to_numpy()[:3], ["P", "A", "P"])
+    assert loaded.total.max() == len(counts.dates) + 1
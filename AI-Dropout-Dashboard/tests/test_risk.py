@@ -0,0 +1,78 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from Core.ml_model import build_features, load_model, save_model, score_probabilities, train_model
+from Core.risk import numeric_column, rules_with_thresholds, score_students
+from Core.rollup import RollupCube
+
+
+# After a merge, students missing from the daily sheet only have the summary percentage
+def mixed_sources():
+    return pd.DataFrame({
+        "course": ["CE-1", "CE-1", "ME-1"],
+        "mentor": ["mentor_0", "mentor_0", "mentor_1"],
+        "attendance_percent": [74.2, 90.0, np.nan],
+        "daily_attendance_percent": [np.nan, 60.0, 80.0],
+        "total_fee_due": [0, 0, 500],
+    }, index=pd.Index([1001, 1002, 1003], name="student_key"))
+
+
+def test_candidate_columns_coalesce_per_row():
+    values = numeric_column(mixed_sources(), ["daily_attendance_percent", "attendance_percent"])
+    np.testing.assert_allclose(values, [74.2, 60.0, 80.0])
+    assert numeric_column(mixed_sources(), ["missing"]) is None
+
+
+def test_students_with_only_summary_attendance_are_scored():
+    risk = score_students(mixed_sources())
+    assert list(risk["risk_score"]) == [3, 3, 1]
+    assert list(risk["risk_reasons"]) == ["Attendance below 75%", "Attendance below 75%", "Outstanding fees above 0"]
+
+
+def test_reasons_follow_thresholds():
+    risk = score_students(mixed_sources(), rules_with_thresholds({"attendance": 70}))
+    assert list(risk["risk_reasons"]) == ["", "Attendance below 70%", "Outstanding fees above 0"]
+
+
+def test_features_and_rollups_use_coalesced_attendance():
+    merged = mixed_sources()
+    np.testing.assert_allclose(build_features(merged, "2025-01-01")["attendance_percent"], [74.2, 60.0, 80.0])
+    cube = RollupCube()
+    cube.refresh(merged)
+    groups = cube.groups("course")
+    np.testing.assert_allclose(groups["avg_attendance"], [(74.2 + 60.0) / 2, 80.0])
+    np.testing.assert_allclose(groups["pct_below_threshold"], [100.0, 0.0])
+
+
+def cohort(n_students=400, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "attendance_percent": rng.random(n_students) * 100,
+        "total_fee_due": rng.integers(0, 3, n_students) * 500,
+    }, index=pd.Index(np.arange(1, n_students + 1), name="student_key"))
+
+
+# A recorded outcome is the label when present; students without one are left out
+def test_train_model_uses_recorded_outcome():
+    merged = cohort()
+    merged["dropped_out"] = (merged["total_fee_due"] > 0).astype(float)
+    merged.loc[merged.index[:50], "dropped_out"] = np.nan
+    model = train_model(merged, n_estimators=10)
+    assert model.n_features_in_ == len(build_features(merged).columns)
+    predicted = model.predict(build_features(merged).to_numpy())
+    assert (predicted == (merged["total_fee_due"] > 0)).all()
+
+
+# Chunks go through the spawned scoring pool and match scoring in one chunk
+def test_pooled_scoring_matches_single_chunk(tmp_path):
+    merged = cohort()
+    path, _ = save_model(train_model(merged, n_estimators=10), model_dir=str(tmp_path))
+    single, _ = score_probabilities(merged, path, chunk_rows=len(merged))
+    pooled, stats = score_probabilities(merged, path, chunk_rows=150, processes=2)
+    np.testing.assert_allclose(pooled, single)
+    assert list(stats["rows"]) == [150, 150, 100]
+    assert load_model(path) is load_model(path)
@@ -0,0 +1,143 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from Core.attendance_store import AttendanceStore
+from Core.rollup import RollupCube, group_sum
+from Core.schemas import is_daily_attendance, read_upload, upload_attendance_store
+from Core.student_join import StudentJoin
+
+
+def merged_frame(n_students=60, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "course": rng.choice(["CE-1", "ME-1", None], n_students),
+        "mentor": rng.choice(["mentor_0", "mentor_1", "mentor_2"], n_students),
+        "attendance_percent": np.where(rng.random(n_students) < 0.1, np.nan, rng.random(n_students) * 100),
+        "total_fee_due": rng.integers(0, 3, n_students) * 500,
+    }, index=pd.Index(np.arange(1, n_students + 1), name="student_key"))
+
+
+def daily_store(ids, dates, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({"ID": ids, "Name": [f"Student_{i}" for i in ids]})
+    cells = rng.choice(np.array(["P", "A", None], dtype=object), size=(len(ids), len(dates)), p=[0.6, 0.3, 0.1])
+    return AttendanceStore.from_frame(pd.concat([df, pd.DataFrame(cells, columns=dates)], axis=1))
+
+
+def dates(first, days):
+    return list(pd.date_range(first, periods=days).strftime("%Y-%m-%d"))
+
+
+def fresh(merged, store=None):
+    cube = RollupCube()
+    cube.refresh(merged, store)
+    return cube
+
+
+def assert_same_cube(cube, expected):
+    assert cube.dates == expected.dates
+    for level in ["course", "mentor", ("course", "mentor")]:
+        pd.testing.assert_frame_equal(cube.groups(level).sort_index(), expected.groups(level).sort_index(),
+                                      check_dtype=False)
+    for course, mentor in [(None, None), ("CE-1", None), ("ME-1", "mentor_1")]:
+        pd.testing.assert_series_equal(cube.daily_trend(course, mentor), expected.daily_trend(course, mentor))
+
+
+def test_group_sum_matches_add_at():
+    rng = np.random.default_rng(0)
+    groups = rng.integers(-1, 5, 200)
+    values = rng.random((200, 3))
+    expected = np.zeros((5, 3))
+    np.add.at(expected, groups[groups >= 0], values[groups >= 0])
+    np.testing.assert_allclose(group_sum(groups, values, 5), expected)
+
+
+def test_groups_match_pandas_groupby():
+    merged = merged_frame()
+    groups = fresh(merged).groups(("course", "mentor"))
+    labels = merged.assign(course=merged["course"].fillna("Unassigned"))
+    expected = labels.groupby(["course", "mentor"]).agg(students=("mentor", "size"),
+                                                        avg_attendance=("attendance_percent", "mean"))
+    pd.testing.assert_series_equal(groups["students"], expected["students"], check_dtype=False)
+    np.testing.assert_allclose(groups["avg_attendance"], expected["avg_attendance"])
+
+
+# Every kind of change is patched in incrementally and ends where a fresh build does
+@pytest.mark.parametrize("change", ["new_day", "earlier_date", "moved_group", "edited_values", "new_students",
+                                    "edited_cells", "removed_sheet"])
+def test_incremental_refresh_matches_fresh_build(change):
+    merged = merged_frame()
+    ids = merged.index.to_numpy()
+    store = daily_store(ids, dates("2025-01-05", 20))
+    cube = fresh(merged, store)
+
+    if change == "new_day":
+        store = daily_store(ids, dates("2025-01-05", 21))
+    elif change == "earlier_date":
+        store = daily_store(ids, dates("2025-01-01", 24), seed=1)
+    elif change == "moved_group":
+        merged = merged.copy()
+        merged.loc[[1, 2, 3], "mentor"] = "mentor_9"
+        merged.loc[4, "course"] = "EE-1"
+    elif change == "edited_values":
+        merged = merged.copy()
+        merged.loc[[5, 6], "attendance_percent"] = [10.0, np.nan]
+        merged.loc[7, "total_fee_due"] = 0
+    elif change == "new_students":
+        merged = pd.concat([merged, merged_frame(5, seed=3).set_axis(pd.Index(range(100, 105), name="student_key"))])
+        store = daily_store(merged.index.to_numpy(), dates("2025-01-05", 20))
+    elif change == "edited_cells":
+        store.present_bits = store.present_bits.copy()
+        store.present_bits[10:15, 1] ^= 0xFF
+        store.absent_bits = store.absent_bits.copy() & ~store.present_bits
+    elif change == "removed_sheet":
+        store = None
+
+    cube.refresh(merged, store)
+    assert_same_cube(cube, fresh(merged, store))
+
+
+def test_latest_daily_rate_uses_latest_date():
+    merged = merged_frame()
+    ids = merged.index.to_numpy()
+    cube = fresh(merged, daily_store(ids, dates("2025-01-10", 5)))
+    cube.refresh(merged, daily_store(ids, dates("2025-01-01", 14)))
+    assert cube.dates == dates("2025-01-01", 14)
+    groups = cube.groups("course")
+    for course, rate in groups["latest_daily_rate"].items():
+        assert rate == pytest.approx(cube.daily_trend(course)["2025-01-14"])
+
+
+def test_unchanged_refresh_touches_nothing():
+    merged = merged_frame()
+    store = daily_store(merged.index.to_numpy(), dates("2025-01-05", 20))
+    cube = fresh(merged, store)
+    assert cube.refresh(merged, store) == 0
+    assert cube.last_refresh == {"students_changed": 0, "groups_changed": 0}
+
+
+# The app's rollup path: a summary sheet gets no store, so the cube has no dates (the trend is hidden)
+def test_summary_sheet_builds_no_daily_store():
+    csv_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "CSV")
+    with open(os.path.join(csv_dir, "attendance.csv"), "rb") as f:
+        summary = read_upload(f.read(), ".csv", "Attendance")
+    assert not is_daily_attendance(summary)
+    assert upload_attendance_store(summary) is None
+
+    join = StudentJoin()
+    join.update_source("Attendance", summary)
+    cube = RollupCube()
+    cube.refresh(join.merged, upload_attendance_store(summary))
+    assert cube.dates == []
+    assert len(cube.groups("course")) > 0
+
+    with open(os.path.join(csv_dir, "attendance_daily.csv"), "rb") as f:
+        daily = read_upload(f.read(), ".csv", "Attendance")
+    assert is_daily_attendance(daily)
+    store = upload_attendance_store(daily)
+    assert list(store.dates) == [c for c in daily.columns if c[:2] == "20"]
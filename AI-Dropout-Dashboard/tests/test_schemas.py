@@ -0,0 +1,85 @@
+import datetime
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from Core.attendance_matrix import ATTENDANCE_CODES
+from Core.schemas import ATTENDANCE_DTYPE, SchemaError, apply_schema, date_labels, read_upload
+
+
+def test_date_labels_accept_datetime_headers():
+    columns = ["ID", pd.Timestamp("2025-01-01"), datetime.datetime(2025, 1, 2), datetime.date(2025, 1, 3),
+               "2025-01-04 00:00:00", "2025-01-05", "2025-01-06 10:30:00", "Name", 7]
+    labels = date_labels(columns)
+    assert list(labels[1:6]) == ["2025-01-01", "2025-01-02", "2025-01-03", "2025-01-04", "2025-01-05"]
+    assert labels[[0, 6, 7, 8]].isna().all()
+
+
+# Excel sheets come back with Timestamp headers; they are validated and renamed like CSV dates
+def test_excel_datetime_headers_are_attendance_dates():
+    df = pd.DataFrame({"ID": [1, 2], "Name": ["a", "b"],
+                       pd.Timestamp("2025-01-01"): ["P", "A"], datetime.datetime(2025, 1, 2): ["Absent", "Y"]})
+    result = apply_schema(df, "Attendance")
+    assert list(result.columns) == ["ID", "Name", "2025-01-01", "2025-01-02"]
+    assert result["2025-01-01"].dtype == ATTENDANCE_DTYPE
+    assert list(result["2025-01-02"]) == ["A", "P"]
+
+
+def test_csv_datetime_text_headers_are_normalized():
+    data = b"ID,Name,2025-01-01 00:00:00,2025-01-02\n1,a,P,A\n2,b,A,P\n"
+    result = read_upload(data, ".csv", "Attendance")
+    assert list(result.columns) == ["ID", "Name", "2025-01-01", "2025-01-02"]
+    assert (result.dtypes.iloc[2:] == ATTENDANCE_DTYPE).all()
+
+
+# Every bad cell is reported in one go, with spreadsheet row numbers (header = row 1)
+def test_schema_collects_every_bad_cell():
+    data = (b"student_id,course,attendance_percent,2025-01-01,2025-01-02\n"
+            b"S1001,CE-1,80,P,A\n"
+            b"XX,CE-1,abc,P,Maybe\n"
+            b"S1003,ME-1,70,late,P\n")
+    with pytest.raises(SchemaError) as error:
+        read_upload(data, ".csv", "Attendance")
+    issues = error.value.issues
+    assert list(zip(issues["row"], issues["column"], issues["problem"])) == [
+        (3, "student_id", "not a student ID"),
+        (3, "attendance_percent", "not a valid number"),
+        (3, "2025-01-02", "not a valid attendance code"),
+        (4, "2025-01-01", "not a valid attendance code"),
+    ]
+    assert "4 problem(s)" in str(error.value)
+
+
+def test_schema_requires_id_and_attendance_columns():
+    with pytest.raises(SchemaError) as error:
+        apply_schema(pd.DataFrame({"course": ["CE-1"]}), "Attendance")
+    problems = list(error.value.issues["column"])
+    assert problems == ["student ID", "attendance_percent or date columns"]
+
+
+def test_schema_types_match_declarations():
+    df = pd.DataFrame({"ID": [1, 2, 3], "total_fee_due": ["100", "0", None], "status": ["Paid", "Due", "Paid"],
+                       "last_payment_date": ["2025-01-01", None, "2025-02-01"], "notes": ["a", "b", "c"]})
+    result = apply_schema(df, "Fee Payment")
+    assert pd.api.types.is_numeric_dtype(result["total_fee_due"])
+    assert isinstance(result["status"].dtype, pd.CategoricalDtype)
+    assert pd.api.types.is_datetime64_any_dtype(result["last_payment_date"])
+    assert result["last_payment_date"].isna().tolist() == [False, True, False]
+    pd.testing.assert_series_equal(result["notes"], df["notes"])
+
+
+# Vectorized attendance conversion agrees with a per-cell ATTENDANCE_CODES lookup
+def test_attendance_codes_match_per_cell_lookup():
+    rng = np.random.default_rng(0)
+    spellings = np.array(["P", "A", "Present", "absent", " y ", "N", "1", "0", None], dtype=object)
+    cells = rng.choice(spellings, size=(50, 6))
+    df = pd.concat([pd.DataFrame({"ID": range(1, 51)}),
+                    pd.DataFrame(cells, columns=[f"2025-01-0{i}" for i in range(1, 7)])], axis=1)
+    result = apply_schema(df, "Attendance")
+    for j, column in enumerate(df.columns[1:]):
+        expected = [None if c is None else ("P" if ATTENDANCE_CODES[c.strip().upper()] else "A") for c in cells[:, j]]
+        assert [None if pd.isna(v) else v for v in result[column]] == expected
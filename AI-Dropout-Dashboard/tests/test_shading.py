@@ -0,0 +1,40 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from Core.shading import SHADE_WINDOW, absence_matrix, shade_levels, shade_window
+
+
+def random_cells(n_students, n_days, seed=0):
+    rng = np.random.default_rng(seed)
+    return rng.choice(np.array(["P", "A", None], dtype=object), size=(n_students, n_days), p=[0.6, 0.3, 0.1])
+
+
+# The per-cell loop the heatmap used before shading was vectorized: P=1, A=0, missing
+# counts as present, and each window only looks back over its own first dates
+def reference_shading(cells):
+    matrix = pd.DataFrame(cells).replace({"P": 1, "A": 0}).fillna(1).to_numpy()
+    shade = np.zeros(matrix.shape, dtype=np.uint8)
+    for i, row in enumerate(matrix):
+        for j in range(len(row)):
+            absences = (row[max(0, j - SHADE_WINDOW + 1):j + 1] == 0).sum()
+            shade[i, j] = 0 if row[j] == 1 else min(absences, 3)
+    return shade
+
+
+@pytest.mark.parametrize("start, stop", [(0, 30), (0, 1), (0, 2), (5, 15), (27, 30), (29, 30)])
+def test_shade_window_matches_reference_loop(start, stop):
+    cells = random_cells(40, 30)
+    levels = shade_levels(absence_matrix(cells))
+    rows = np.arange(5, 25)
+    expected = reference_shading(cells[rows][:, start:stop])
+    np.testing.assert_array_equal(shade_window(levels, rows, start, stop), expected)
+
+
+def test_absence_matrix_treats_missing_as_present():
+    cells = np.array([["P", "A", None, np.nan]], dtype=object)
+    np.testing.assert_array_equal(absence_matrix(cells), [[False, True, False, False]])
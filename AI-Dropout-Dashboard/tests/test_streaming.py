@@ -0,0 +1,43 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from Core.attendance_store import AttendanceStore
+from Core.streaming import iter_attendance_chunks, stream_attendance_percent
+
+
+def daily_frame(n_students=50, n_days=21, seed=0):
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range("2025-01-01", periods=n_days).strftime("%Y-%m-%d")
+    df = pd.DataFrame({"ID": np.arange(1001, 1001 + n_students), "Name": [f"Student_{i}" for i in range(n_students)]})
+    cells = rng.choice(np.array(["P", "A", None], dtype=object), size=(n_students, n_days), p=[0.6, 0.3, 0.1])
+    return pd.concat([df, pd.DataFrame(cells, columns=dates)], axis=1)
+
+
+def test_chunked_reads_match_whole_file(tmp_path):
+    df = daily_frame(n_students=103)
+    path = tmp_path / "attendance_daily.csv"
+    df.to_csv(path, index=False)
+    whole = AttendanceStore.from_csv(path)
+    chunked = AttendanceStore.from_csv(path, chunksize=10)
+    np.testing.assert_array_equal(chunked.present_bits, whole.present_bits)
+    np.testing.assert_array_equal(chunked.absent_bits, whole.absent_bits)
+    np.testing.assert_array_equal(chunked.ids, whole.ids)
+
+    out = tmp_path / "attendance_percent.csv"
+    totals = stream_attendance_percent(path, out, chunksize=10)
+    pd.testing.assert_frame_equal(pd.read_csv(out), whole.percent_frame())
+    pd.testing.assert_series_equal(totals.daily_average(), whole.daily_average())
+    assert totals.n_students == 103
+
+
+def test_iter_chunks_share_dates(tmp_path):
+    df = daily_frame(n_students=25)
+    path = tmp_path / "attendance_daily.csv"
+    df.to_csv(path, index=False)
+    stores = list(iter_attendance_chunks(path, chunksize=10))
+    assert [s.n_students for s in stores] == [10, 10, 5]
+    assert all(list(s.dates) == list(df.columns[2:]) for s in stores)
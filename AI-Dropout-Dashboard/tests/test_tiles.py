@@ -0,0 +1,64 @@
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from Core.tiles import BORDER_COLOR, SHADE_PALETTE, TileCache, cell_size, render_tile
+
+
+def test_render_tile_matches_per_cell_fill():
+    rng = np.random.default_rng(1)
+    indexes = rng.integers(0, len(SHADE_PALETTE), size=(6, 9))
+    cell_px = 8
+    image = render_tile(indexes, cell_px=cell_px)
+    assert image.shape == (6 * cell_px, 9 * cell_px, 3)
+    for i in range(6):
+        for j in range(9):
+            inner = image[i * cell_px + 1:(i + 1) * cell_px - 1, j * cell_px + 1:(j + 1) * cell_px - 1]
+            assert (inner == SHADE_PALETTE[indexes[i, j]]).all()
+    assert (image[::cell_px] == BORDER_COLOR).all()
+    assert (image[:, -1] == BORDER_COLOR).all()
+
+
+def test_render_tile_small_cells_have_no_border():
+    indexes = np.ones((3, 4), dtype=int)
+    image = render_tile(indexes, cell_px=2)
+    assert (image == SHADE_PALETTE[1]).all()
+
+
+def test_render_tile_empty_window_is_none():
+    assert render_tile(np.zeros((0, 10), dtype=int)) is None
+    assert render_tile(np.zeros((10, 0), dtype=int)) is None
+
+
+def test_cell_size_keeps_tiles_within_bounds():
+    assert cell_size(10) == 40
+    assert cell_size(400) == 4
+    assert cell_size(30, 10_000) == 1
+    for n_cols, n_rows in [(7, 10), (30, 500), (365, 100), (1, 1)]:
+        px = cell_size(n_cols, n_rows)
+        assert px >= 1
+        assert n_rows * px <= 2000 or px == 1
+
+
+def test_tile_cache_renders_once_and_evicts_oldest():
+    cache = TileCache(max_tiles=2)
+    calls = []
+    for key in ["a", "b", "a", "c", "b"]:
+        cache.get(key, lambda key=key: calls.append(key) or key)
+    assert calls == ["a", "b", "c", "b"]
+    assert (cache.hits, cache.misses) == (1, 4)
+    assert list(cache.tiles) == ["c", "b"]
+
+
+# Sessions share one cache; concurrent gets keep the LRU bounded and consistent
+def test_tile_cache_concurrent_gets():
+    cache = TileCache(max_tiles=16)
+    keys = [i % 40 for i in range(4000)]
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        tiles = list(pool.map(lambda key: cache.get(key, lambda: key * 2), keys))
+    assert tiles == [key * 2 for key in keys]
+    assert len(cache.tiles) == 16
+    assert cache.hits + cache.misses == len(keys)